@@ -0,0 +1,177 @@
+# 🇭🇷 Chat/broker.py - Pub/sub sloj za real-time chat (WebSocket)
+# ========================================================================================================
+# Svrha: send_message() objavi novu poruku na kanal razgovora → svi otvoreni WebSocketi tog razgovora
+#        je dobiju odmah, bez pollinga
+#
+# 🔌 Backendi (settings.CHAT_BROKER):
+#   - InProcessBroker (default): pretplatnici su asyncio.Queue u ovom procesu
+#       → dovoljno za jedan ASGI worker (npr. uvicorn bez --workers)
+#   - RedisBroker: objava ide kroz Redis PUBLISH, svaki worker ima JEDNU pretplatu (PSUBSCRIBE)
+#       i dalje dijeli poruke svojim lokalnim pretplatnicima
+#       → više workera / više servera; Redis server (ili kompatibilan stand-in) na CHAT_REDIS_URL
+#
+# 💼 Kako radi:
+#   - publish() se zove iz sinkronog koda (view u WSGI/ASGI threadu) → predaja u event loop
+#     pretplatnika ide kroz loop.call_soon_threadsafe
+#   - subscribe() / unsubscribe() se zovu iz event loopa (Chat/realtime.py)
+#   - Spori klijent: red je ograničen (CHAT_SUBSCRIBER_QUEUE_SIZE) - višak se odbacuje,
+#     klijent ga dohvati pollingom (fallback)
+#
+# 📝 Primjer:
+#   queue = await get_broker().subscribe(key)
+#   get_broker().publish(key, {"id": 1, ...})
+#   message = await queue.get()
+# ========================================================================================================
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+
+def conversation_key(user_id, other_id):
+    # 🔹 conversation_key() - Isti kanal za oba smjera razgovora (A→B i B→A)
+    low, high = sorted((user_id, other_id))
+    return f"chat:{low}:{high}"
+
+
+class InProcessBroker:
+    # 🔹 InProcessBroker - Pretplatnici (event loop, asyncio.Queue) po kanalu, u memoriji procesa
+    #
+    #    ⚠️ Vidi samo pretplatnike u ovom procesu - za više workera koristi RedisBroker
+    #
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size if queue_size is not None else settings.CHAT_SUBSCRIBER_QUEUE_SIZE
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    async def subscribe(self, key):
+        # 🔹 subscribe() - Novi red za kanal (poziva se iz event loopa)
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[key].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    async def unsubscribe(self, key, queue):
+        # 🔹 unsubscribe() - Makni red (WebSocket zatvoren)
+        with self._lock:
+            subscribers = self._subscribers.get(key)
+            if subscribers is None:
+                return
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                del self._subscribers[key]
+
+    def publish(self, key, message):
+        # 🔹 publish() - Pošalji poruku svim lokalnim pretplatnicima kanala (thread-safe, ne blokira)
+        self.deliver(key, message)
+
+    def deliver(self, key, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, message)
+            except RuntimeError:
+                pass  # 💤 Event loop je zatvoren (worker se gasi)
+        return len(subscribers)
+
+    @staticmethod
+    def _put(queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Chat pretplatnik ne stiže čitati - poruka %s odbačena", message.get("id"))
+
+    def subscriber_count(self, key=None):
+        with self._lock:
+            if key is not None:
+                return len(self._subscribers.get(key, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+
+class RedisBroker(InProcessBroker):
+    # 🔹 RedisBroker - Objava kroz Redis, lokalna dostava kao InProcessBroker
+    #
+    #    💼 Kako radi:
+    #       - publish(): PUBLISH <kanal> <json> (sinkroni redis klijent)
+    #       - prvi subscribe() u event loopu pokrene listener: PSUBSCRIBE chat:* → deliver()
+    #         (jedna Redis konekcija po workeru, neovisno o broju WebSocketa)
+    #
+    #    📦 Zahtijeva: pip install "instagram-clone[redis]" (ili pip install redis)
+    #       - client / async_client: gotov sinkroni klijent i tvornica async klijenta
+    #         (testovi predaju stand-in umjesto pravog Redisa)
+    #
+    def __init__(self, url=None, queue_size=None, client=None, async_client=None):
+        super().__init__(queue_size)
+        self.url = url or settings.CHAT_REDIS_URL
+        if client is None or async_client is None:
+            try:
+                import redis
+                import redis.asyncio
+            except ImportError as exc:
+                raise ImproperlyConfigured(
+                    "CHAT_BROKER = RedisBroker zahtijeva paket 'redis' (pip install \"instagram-clone[redis]\")"
+                ) from exc
+            client = client or redis.Redis.from_url(self.url)
+            async_client = async_client or (lambda: redis.asyncio.Redis.from_url(self.url))
+        self._client = client
+        self._async_client = async_client
+        self._listeners = {}
+
+    async def subscribe(self, key):
+        loop = asyncio.get_running_loop()
+        listener = self._listeners.get(loop)
+        if listener is None or listener.done():
+            self._listeners[loop] = loop.create_task(self._listen())
+        return await super().subscribe(key)
+
+    def publish(self, key, message):
+        self._client.publish(key, json.dumps(message))
+
+    async def _listen(self):
+        # 🔹 _listen() - Jedna pretplata po event loopu; ponovno spajanje nakon prekida veze
+        while True:
+            try:
+                async with self._async_client() as client, client.pubsub() as pubsub:
+                    await pubsub.psubscribe("chat:*")
+                    async for event in pubsub.listen():
+                        if event["type"] != "pmessage":
+                            continue
+                        channel = event["channel"]
+                        channel = channel.decode() if isinstance(channel, bytes) else channel
+                        self.deliver(channel, json.loads(event["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Redis chat pretplata prekinuta - ponovno spajanje za 1s")
+                await asyncio.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    # 🔹 get_broker() - Jedna instanca brokera po procesu (settings.CHAT_BROKER)
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.CHAT_BROKER)()
+    return _broker
+
+
+def reset_broker():
+    # 🔹 reset_broker() - Zaboravi instancu (promjena CHAT_BROKER u testovima / benchmarku)
+    global _broker
+    with _broker_lock:
+        _broker = None
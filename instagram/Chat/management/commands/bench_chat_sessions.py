@@ -0,0 +1,170 @@
+# 🇭🇷 Chat/management/commands/bench_chat_sessions.py - Load test: koliko chat WebSocketa drži jedan worker
+# ========================================================================================================
+# Svrha: Otvori N istovremenih chat sesija na Chat/realtime.chat_socket u JEDNOM procesu / event loopu
+#        i izmjeri cijenu spajanja, memoriju po otvorenoj sesiji i kašnjenje dostave poruka
+#
+# Kako radi:
+#   - Privremena baza (throwaway_database) s N korisnika u N/2 razgovora i pravim session zapisima
+#   - Svaka sesija je pravi ASGI poziv chat_socket (handshake, provjera sessiona, pretplata na broker);
+#     mreža se ne koristi - receive/send su asyncio redovi (mjeri se aplikacija, ne server)
+#   - Memorija: porast RSS-a procesa nakon otvaranja svih sesija / N
+#   - Fan-out: u svaki razgovor se objavi poruka iz drugog threada (kao send_message u sync view-u);
+#     mjeri se vrijeme od publish() do websocket.send oba sudionika
+#
+# ⚠️ Server (uvicorn / daphne) dodaje svoj trošak po konekciji (socket, buffer-i) - brojke su donja granica
+#
+# 📝 Primjer:
+#   python manage.py bench_chat_sessions --sessions 1000,5000,10000
+#   python manage.py bench_chat_sessions --sessions 2000 --rounds 5
+# ========================================================================================================
+
+import asyncio
+import json
+import resource
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from instagram.bench import Timer, throwaway_database
+from Chat.broker import conversation_key, get_broker
+from Chat.realtime import chat_socket
+
+
+def _rss_kb():
+    # 📎 Linux: ru_maxrss u KB (vršna vrijednost - sesije se otvaraju redom pa raste monotono)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class _Session:
+    # 🔹 _Session - Jedan "preglednik": ASGI receive/send kroz asyncio red
+    def __init__(self, session_key, target_uuid):
+        self.scope = {
+            "type": "websocket",
+            "path": f"/ws/chat/{target_uuid}/",
+            "headers": [(b"host", b"bench.local"), (b"cookie", f"{settings.SESSION_COOKIE_NAME}={session_key}".encode())],
+        }
+        self.inbox = asyncio.Queue()
+        self.accepted = asyncio.get_running_loop().create_future()
+        self.latencies = []
+        self.delivered = None
+
+    async def receive(self):
+        return await self.inbox.get()
+
+    async def send(self, event):
+        if event["type"] == "websocket.accept":
+            self.accepted.set_result(True)
+        elif event["type"] == "websocket.close":
+            self.accepted.set_result(False)
+        elif event["type"] == "websocket.send":
+            self.latencies.append(time.perf_counter() - json.loads(event["text"])["sent_at"])
+            if self.delivered is not None:
+                self.delivered.release()
+
+    def open(self):
+        self.inbox.put_nowait({"type": "websocket.connect"})
+        self.task = asyncio.ensure_future(chat_socket(self.scope, self.receive, self.send))
+        return self.accepted
+
+    async def close(self):
+        self.inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await self.task
+
+
+class Command(BaseCommand):
+    help = "Load test: istovremene chat WebSocket sesije po workeru (spajanje, memorija, fan-out)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", default="1000,5000", help="Broj sesija, zarezom odvojeni koraci")
+        parser.add_argument("--rounds", type=int, default=3, help="Broj fan-out rundi po koraku")
+
+    def handle(self, *args, **options):
+        steps = [int(n) for n in options["sessions"].split(",")]
+        with throwaway_database():
+            sessions = self._prepare(max(steps))
+            self.stdout.write(f"{'sesija':>8} {'spajanje p50':>13} {'KB/sesija':>10} {'dostava p50':>12} {'p95':>9} {'runda':>9}")
+            for n in steps:
+                # 🔁 async_to_sync → DB pozivi iz chat_socket (sync_to_async) idu u ovaj thread (baza u memoriji)
+                row = async_to_sync(self._run)(sessions[:n], options["rounds"])
+                self.stdout.write(
+                    f"{n:>8} {row['connect_ms']:>11.2f}ms {row['kb']:>10.1f} {row['p50_ms']:>10.2f}ms "
+                    f"{row['p95_ms']:>7.2f}ms {row['round_ms']:>7.1f}ms"
+                )
+
+    def _prepare(self, count):
+        # 🔹 _prepare() - count korisnika u parovima (2i, 2i+1) + prijavljeni session za svakog
+        from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+        from django.utils.module_loading import import_string
+        from Users.models import User
+
+        count += count % 2
+        User.objects.bulk_create(
+            [User(username=f"chat{i}", email=f"chat{i}@bench.local", password="!") for i in range(count)],
+            batch_size=1000,
+        )
+        users = list(User.objects.order_by("id"))
+        store = import_string(f"{settings.SESSION_ENGINE}.SessionStore")
+
+        sessions = []
+        for i, user in enumerate(users):
+            session = store()
+            session[SESSION_KEY] = str(user.pk)
+            session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+            session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+            session.create()
+            partner = users[i ^ 1]
+            sessions.append((session.session_key, partner.user_uuid, conversation_key(user.pk, partner.pk)))
+        return sessions
+
+    async def _run(self, specs, rounds):
+        broker = get_broker()
+        loop = asyncio.get_running_loop()
+
+        # 1️⃣ Spajanje (handshake + session + sugovornik) - jedno po jedno, kao pojedinačni preglednici
+        rss_before = _rss_kb()
+        connect = Timer()
+        sessions = []
+        for session_key, target_uuid, _ in specs:
+            session = _Session(session_key, target_uuid)
+            with connect:
+                accepted = await session.open()
+            if not accepted:
+                raise RuntimeError("Sesija odbijena - provjeri session / korisnike")
+            sessions.append(session)
+        kb = (_rss_kb() - rss_before) / len(sessions)
+
+        # 2️⃣ Fan-out: jedna poruka po razgovoru, objavljena iz threada (kao send_message)
+        keys = sorted({key for _, _, key in specs})
+        delivered = asyncio.Semaphore(0)
+        for session in sessions:
+            session.delivered = delivered
+        round_timer = Timer()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for n in range(rounds):
+                def publish_all(n=n):
+                    for key in keys:
+                        broker.publish(key, {"id": n, "sender_uuid": "", "sent_at": time.perf_counter()})
+                with round_timer:
+                    await loop.run_in_executor(executor, publish_all)
+                    for _ in sessions:
+                        await delivered.acquire()
+
+        # 3️⃣ Zatvaranje - svi redovi moraju nestati iz brokera
+        for session in sessions:
+            await session.close()
+        if broker.subscriber_count():
+            raise RuntimeError(f"Broker i dalje ima {broker.subscriber_count()} pretplatnika")
+
+        delivery = Timer()
+        delivery.samples = [latency for session in sessions for latency in session.latencies]
+        summary = delivery.summary()
+        return {
+            "connect_ms": connect.summary()["p50_ms"],
+            "kb": kb,
+            "p50_ms": summary["p50_ms"],
+            "p95_ms": summary["p95_ms"],
+            "round_ms": round_timer.summary()["p50_ms"],
+        }
@@ -0,0 +1,102 @@
+# Generated by Django 6.0.1 on 2026-10-16 23:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def fill_conversations(apps, schema_editor):
+    # 📥 Inbox za postojeće poruke: jedan Conversation po paru + ConversationMember za oba sudionika
+    Message = apps.get_model('Chat', 'Message')
+    Conversation = apps.get_model('Chat', 'Conversation')
+    ConversationMember = apps.get_model('Chat', 'ConversationMember')
+
+    # 1️⃣ Po smjeru (sender → recipient): zadnja poruka i broj nepročitanih (GROUP BY, bez učitavanja poruka)
+    pairs = {}
+    directions = (
+        Message.objects.order_by().values('sender', 'recipient')
+        .annotate(last_id=Max('id'), unread=Count('id', filter=Q(is_read=False)))
+    )
+    for row in directions.iterator(chunk_size=2000):
+        if row['sender'] == row['recipient']:
+            continue
+        pair = pairs.setdefault(tuple(sorted((row['sender'], row['recipient']))), {'last_id': 0, 'unread': {}})
+        pair['last_id'] = max(pair['last_id'], row['last_id'])
+        pair['unread'][row['recipient']] = row['unread']
+
+    # 2️⃣ Conversation + članovi u batch-evima
+    items = list(pairs.items())
+    for start in range(0, len(items), 1000):
+        batch = items[start:start + 1000]
+        last = Message.objects.in_bulk([pair['last_id'] for _, pair in batch])
+        conversations = Conversation.objects.bulk_create([
+            Conversation(
+                user_low_id=low, user_high_id=high, last_message_id=pair['last_id'],
+                last_message_snippet=last[pair['last_id']].content[:100],
+                last_message_at=last[pair['last_id']].created_at,
+            )
+            for (low, high), pair in batch
+        ])
+        if conversations and conversations[0].pk is None:
+            # 📎 Baze bez RETURNING kod bulk_create (MySQL) - ID-evi se čitaju naknadno
+            ids = dict(
+                ((c.user_low_id, c.user_high_id), c.pk)
+                for c in Conversation.objects.filter(last_message_id__in=[pair['last_id'] for _, pair in batch])
+            )
+            for conversation in conversations:
+                conversation.pk = ids[(conversation.user_low_id, conversation.user_high_id)]
+        members = []
+        for conversation, ((low, high), pair) in zip(conversations, batch):
+            for user_id, other_id in ((low, high), (high, low)):
+                members.append(ConversationMember(
+                    conversation_id=conversation.pk, user_id=user_id, other_id=other_id,
+                    unread_count=pair['unread'].get(user_id, 0), last_message_at=conversation.last_message_at,
+                ))
+        ConversationMember.objects.bulk_create(members)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Chat', '0002_message_pair_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_snippet', models.CharField(blank=True, default='', max_length=100)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='Chat.message')),
+                ('user_high', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user_low', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ConversationMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread_count', models.IntegerField(default=0)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='Chat.conversation')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('user_low', 'user_high'), name='conversation_pair_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='conversationmember',
+            index=models.Index(fields=['user', '-last_message_at'], name='conv_member_inbox_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversationmember',
+            constraint=models.UniqueConstraint(fields=('conversation', 'user'), name='conversation_member_unique'),
+        ),
+        migrations.RunPython(fill_conversations, migrations.RunPython.noop),
+    ]
@@ -9,11 +9,19 @@
 #   - is_read: Status je li primaoć pročitao poruku (default=False)
 #
 # 🔄 Redoslijed:
-#   - Sortirane po created_at (najstarije prvo)
+#   - Sortirane po created_at (najstarije prvo); stranice povijesti idu po id-u (indeks sender+recipient+id)
 #   - Čuva se razgovor u oba smjera (sender→recipient i recipient→sender)
+#
+# 📥 Inbox (Conversation + ConversationMember):
+#   - Jedan Conversation redak po paru korisnika: zadnja poruka (id, isječak, vrijeme)
+#   - Jedan ConversationMember redak po sudioniku: sugovornik, broj nepročitanih, vrijeme zadnje poruke
+#   - Inbox korisnika = ConversationMember WHERE user = ? ORDER BY last_message_at DESC
+#     → jedan indeksirani upit, neovisno o broju poruka
+#   - record_message() (send_message) i mark_read() (chat_with) ih održavaju u istoj transakciji
 # ========================================================================================================
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, When
 from django.utils import timezone
 from Users.models import User
 
@@ -45,8 +53,112 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['created_at']  # 📋 Sortiranje: najstarije poruke prvo
+        indexes = [
+            # ⚡ Razgovor: (sender=A AND recipient=B AND id < / > cursor) za oba smjera → range scan
+            models.Index(fields=['sender', 'recipient', 'id'], name='message_pair_id_idx'),
+        ]
 
     def __str__(self):
         # 🔹 __str__ - Prikazuje korisničko prikaz poruke
         #    Format: "sender → recipient: sadržaj (first 30 chars)"
         return f"{self.sender.username} → {self.recipient.username}: {self.content[:30]}"
+
+
+SNIPPET_LENGTH = 100
+
+
+class Conversation(models.Model):
+    # 🔹 Conversation - Razgovor između dva korisnika (jedan redak po paru)
+    #    
+    #    📝 Polja:
+    #       - user_low / user_high: Sudionici, poredani po ID-u (user_low.id < user_high.id)
+    #         → par (A, B) i (B, A) je isti redak (unique constraint)
+    #       - last_message: Zadnja poruka (SET_NULL ako se obriše)
+    #       - last_message_snippet: Prvih SNIPPET_LENGTH znakova zadnje poruke (pregled u inboxu)
+    #       - last_message_at: Vrijeme zadnje poruke
+    #    
+    #    🔗 Relacije:
+    #       - members: Dva ConversationMember retka (stanje po sudioniku)
+    #    
+    user_low = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    user_high = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    last_message = models.ForeignKey(Message, null=True, blank=True, related_name='+', on_delete=models.SET_NULL)
+    last_message_snippet = models.CharField(max_length=SNIPPET_LENGTH, blank=True, default="")
+    last_message_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_low', 'user_high'], name='conversation_pair_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_low_id} ↔ {self.user_high_id}"
+
+
+class ConversationMember(models.Model):
+    # 🔹 ConversationMember - Stanje razgovora za jednog sudionika (redak u njegovom inboxu)
+    #    
+    #    📝 Polja:
+    #       - conversation: Razgovor
+    #       - user: Vlasnik inboxa
+    #       - other: Sugovornik (za prikaz bez dodatnog JOIN-a preko Conversation)
+    #       - unread_count: Poruke od sugovornika koje user još nije otvorio
+    #       - last_message_at: Kopija Conversation.last_message_at → sortiranje inboxa po indeksu
+    #    
+    conversation = models.ForeignKey(Conversation, related_name='members', on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name='conversation_memberships', on_delete=models.CASCADE)
+    other = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    unread_count = models.IntegerField(default=0)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['conversation', 'user'], name='conversation_member_unique'),
+        ]
+        indexes = [
+            # ⚡ Inbox: WHERE user = ? ORDER BY last_message_at DESC
+            models.Index(fields=['user', '-last_message_at'], name='conv_member_inbox_idx'),
+        ]
+
+
+def conversation_for(user, other):
+    # 🔹 conversation_for() - Razgovor para (stvori ga zajedno s oba sudionika ako ne postoji)
+    #    💼 get_or_create hvata IntegrityError paralelnog stvaranja i vraća postojeći redak
+    low, high = sorted((user, other), key=lambda u: u.pk)
+    conversation, created = Conversation.objects.get_or_create(user_low=low, user_high=high)
+    if created:
+        ConversationMember.objects.bulk_create([
+            ConversationMember(conversation=conversation, user=low, other=high),
+            ConversationMember(conversation=conversation, user=high, other=low),
+        ])
+    return conversation
+
+
+def record_message(message):
+    # 🔹 record_message() - Nova poruka → zadnja poruka razgovora + nepročitano primatelju
+    #    
+    #    💼 Kako radi (u transakciji koja sprema poruku):
+    #       - UPDATE Conversation: last_message, isječak, vrijeme
+    #       - Jedan UPDATE oba sudionika: last_message_at svima, unread_count + 1 samo primatelju (F())
+    #    
+    with transaction.atomic():
+        conversation = conversation_for(message.sender, message.recipient)
+        Conversation.objects.filter(pk=conversation.pk).update(
+            last_message=message,
+            last_message_snippet=message.content[:SNIPPET_LENGTH],
+            last_message_at=message.created_at,
+        )
+        ConversationMember.objects.filter(conversation=conversation).update(
+            last_message_at=message.created_at,
+            unread_count=Case(
+                When(user=message.recipient, then=F('unread_count') + 1),
+                default=F('unread_count'),
+            ),
+        )
+
+
+def mark_read(user, other):
+    # 🔹 mark_read() - user je otvorio razgovor s other → poruke pročitane, brojač na 0
+    with transaction.atomic():
+        Message.objects.filter(sender=other, recipient=user, is_read=False).update(is_read=True)
+        ConversationMember.objects.filter(user=user, other=other, unread_count__gt=0).update(unread_count=0)
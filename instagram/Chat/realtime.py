@@ -0,0 +1,117 @@
+# 🇭🇷 Chat/realtime.py - WebSocket endpoint za chat (čisti ASGI, bez dodatnih paketa)
+# ========================================================================================================
+# Svrha: Nove poruke razgovora stižu u preglednik odmah (push), umjesto pollinga
+#
+# 📝 Ruta (instagram/asgi.py usmjerava sve "websocket" zahtjeve ovdje):
+#   - WS /ws/chat/<uuid>/ → poruke razgovora s korisnikom <uuid>
+#
+# 💼 Kako radi:
+#   1. Handshake: Origin mora odgovarati Host-u (sprječava cross-site WebSocket hijacking)
+#   2. Korisnik iz Django session cookie-ja (isti login kao za HTTP); anonimni / nepostojeći → odbijeno
+#   3. Pretplata na kanal razgovora (Chat/broker.py) → svaka poruka iz send_message() se šalje kao JSON
+#      (isti oblik kao u get_messages(), s is_from_me za ovog korisnika)
+#   4. Slanje poruka i dalje ide kroz POST /chat/<uuid>/send/ (validacija na jednom mjestu);
+#      klijent smije slati samo "ping" (keepalive) - sve ostalo se ignorira
+#
+# ⚡ Trošak po otvorenom WebSocketu: jedan asyncio task + jedan red; čekanje ne radi nijedan upit u bazu
+#
+# ⚠️ Zahtijeva ASGI server (npr. uvicorn instagram.asgi:application); bez njega room.html ostaje na long-pollu (/chat/<uuid>/poll/)
+# ========================================================================================================
+
+import asyncio
+import json
+import re
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http.cookie import parse_cookie
+
+from .broker import conversation_key, get_broker
+
+
+CHAT_PATH = re.compile(r"^/ws/chat/(?P<user_uuid>[0-9a-fA-F-]{36})/$")
+
+
+def _headers(scope):
+    return {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+
+
+def _same_origin(headers):
+    # 🔹 _same_origin() - Origin (ako ga klijent šalje) mora biti isti host kao i Host zaglavlje
+    origin = headers.get("origin")
+    if origin is None:
+        return True  # 📎 Ne-preglednički klijenti (npr. load test) ne šalju Origin
+    return urlsplit(origin).netloc == headers.get("host")
+
+
+def _authenticate(headers, user_uuid):
+    # 🔹 _authenticate() - (korisnik, sugovornik) iz session cookie-ja ili None
+    #    💼 django.contrib.auth.get_user() provjerava i hash sessiona (odjava s drugih uređaja vrijedi i ovdje)
+    from django.contrib.auth import get_user
+    from Users.models import User
+
+    session_key = parse_cookie(headers.get("cookie", "")).get(settings.SESSION_COOKIE_NAME)
+    if not session_key:
+        return None
+    session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    user = get_user(SimpleNamespace(session=session))
+    if not user.is_authenticated:
+        return None
+    target = User.objects.filter(user_uuid=user_uuid).only("pk", "user_uuid").first()
+    if target is None or target.pk == user.pk:
+        return None
+    return user, target
+
+
+async def chat_socket(scope, receive, send):
+    # 🔹 chat_socket() - ASGI aplikacija za jedan WebSocket
+    event = await receive()
+    if event["type"] != "websocket.connect":
+        return
+
+    match = CHAT_PATH.match(scope["path"])
+    headers = _headers(scope)
+    if match is None or not _same_origin(headers):
+        await send({"type": "websocket.close", "code": 4403})
+        return
+
+    participants = await sync_to_async(_authenticate)(headers, match["user_uuid"])
+    if participants is None:
+        await send({"type": "websocket.close", "code": 4403})
+        return
+    user, target = participants
+    me = str(user.user_uuid)
+
+    broker = get_broker()
+    key = conversation_key(user.pk, target.pk)
+    queue = await broker.subscribe(key)
+    await send({"type": "websocket.accept"})
+
+    incoming = asyncio.ensure_future(receive())
+    outgoing = asyncio.ensure_future(queue.get())
+    try:
+        while True:
+            done, _ = await asyncio.wait({incoming, outgoing}, return_when=asyncio.FIRST_COMPLETED)
+
+            if outgoing in done:
+                message = outgoing.result()
+                await send({
+                    "type": "websocket.send",
+                    "text": json.dumps({**message, "is_from_me": message["sender_uuid"] == me}),
+                })
+                outgoing = asyncio.ensure_future(queue.get())
+
+            if incoming in done:
+                event = incoming.result()
+                if event["type"] == "websocket.disconnect":
+                    break
+                if event.get("text") == "ping":
+                    await send({"type": "websocket.send", "text": "pong"})
+                incoming = asyncio.ensure_future(receive())
+    finally:
+        incoming.cancel()
+        outgoing.cancel()
+        await broker.unsubscribe(key, queue)
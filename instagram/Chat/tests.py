@@ -1,3 +1,307 @@
-from django.test import TestCase
+import asyncio
+import json
+from importlib import import_module
+from importlib.util import find_spec
+from unittest import skipIf
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from Users.models import User
+from .broker import RedisBroker, conversation_key, get_broker, reset_broker
+from .models import Conversation, ConversationMember, Message
+from .realtime import chat_socket
+
+
+class ChatTestCase(TestCase):
+    # 🔹 Zajednički setup: dva korisnika i svježi broker po testu
+
+    def setUp(self):
+        reset_broker()
+        self.addCleanup(reset_broker)
+        self.me = User.objects.create_user(username="ja", email="ja@example.com", password="lozinka")
+        self.other = User.objects.create_user(username="drugi", email="drugi@example.com", password="lozinka")
+        self.key = conversation_key(self.me.pk, self.other.pk)
+
+    async def _subscribed(self, count=1):
+        # ⏳ Čeka dok view / socket ne pretplati svoj red na kanal razgovora
+        while get_broker().subscriber_count(self.key) < count:
+            await asyncio.sleep(0.01)
+
+
+class ChatSocketTests(ChatTestCase):
+    # 🔹 WS /ws/chat/<uuid>/: handshake (Origin + session) i dostava objavljenih poruka
+
+    async def _connect(self, headers):
+        incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+        await incoming.put({"type": "websocket.connect"})
+        scope = {
+            "type": "websocket",
+            "path": f"/ws/chat/{self.other.user_uuid}/",
+            "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+        }
+        task = asyncio.ensure_future(chat_socket(scope, incoming.get, outgoing.put))
+        first = await asyncio.wait_for(outgoing.get(), timeout=5)
+        return task, incoming, outgoing, first
+
+    async def _session_cookie(self):
+        await self.async_client.aforce_login(self.me)
+        return f"{settings.SESSION_COOKIE_NAME}={self.async_client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    async def test_rejects_foreign_origin_and_anonymous(self):
+        cookie = await self._session_cookie()
+        _, _, _, first = await self._connect({"host": "testserver", "origin": "https://zlo.example", "cookie": cookie})
+        self.assertEqual(first, {"type": "websocket.close", "code": 4403})
+
+        _, _, _, first = await self._connect({"host": "testserver", "origin": "http://testserver"})
+        self.assertEqual(first, {"type": "websocket.close", "code": 4403})
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+    async def test_delivers_published_messages(self):
+        cookie = await self._session_cookie()
+        task, incoming, outgoing, first = await self._connect(
+            {"host": "testserver", "origin": "http://testserver", "cookie": cookie}
+        )
+        self.assertEqual(first, {"type": "websocket.accept"})
+        await self._subscribed()
+
+        for sender in (self.me, self.other):
+            get_broker().publish(self.key, {"id": sender.pk, "sender_uuid": str(sender.user_uuid), "content": "bok"})
+        received = [json.loads((await asyncio.wait_for(outgoing.get(), timeout=5))["text"]) for _ in range(2)]
+        self.assertEqual([m["is_from_me"] for m in received], [True, False])
+
+        await incoming.put({"type": "websocket.receive", "text": "ping"})
+        self.assertEqual(await asyncio.wait_for(outgoing.get(), timeout=5), {"type": "websocket.send", "text": "pong"})
+
+        await incoming.put({"type": "websocket.disconnect"})
+        await asyncio.wait_for(task, timeout=5)
+        self.assertEqual(get_broker().subscriber_count(self.key), 0)
+
+
+class FakeRedis:
+    # 🔹 Stand-in za Redis pub/sub u memoriji: publish() → svi PSUBSCRIBE slušatelji
+    #    (isti oblik događaja kao redis-py: kanal i podaci stižu kao bytes)
+
+    def __init__(self):
+        self.listeners = []
+
+    def publish(self, channel, data):
+        for loop, queue in self.listeners:
+            event = {"type": "pmessage", "channel": channel.encode(), "data": data.encode()}
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def connect(self):
+        return FakeAsyncRedis(self)
+
+
+class FakeAsyncRedis:
+    def __init__(self, server):
+        self.server = server
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def pubsub(self):
+        return FakePubSub(self.server)
+
+
+class FakePubSub(FakeAsyncRedis):
+    async def psubscribe(self, pattern):
+        self.queue = asyncio.Queue()
+        await self.queue.put({"type": "psubscribe", "channel": pattern.encode(), "data": 1})
+        self.server.listeners.append((asyncio.get_running_loop(), self.queue))
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+
+class RedisBrokerTests(ChatTestCase):
+    # 🔹 RedisBroker: objava ide kroz Redis, jedna pretplata po event loopu dijeli poruke lokalnim redovima
+
+    async def test_delivers_through_redis_subscription(self):
+        server = FakeRedis()
+        broker = RedisBroker(url="redis://stand-in", client=server, async_client=server.connect)
+        first, second = await broker.subscribe(self.key), await broker.subscribe(self.key)
+        other = await broker.subscribe(conversation_key(self.me.pk, 0))
+        while not server.listeners:
+            await asyncio.sleep(0.01)
+
+        broker.publish(self.key, {"id": 1, "content": "bok"})
+        for queue in (first, second):
+            self.assertEqual(await asyncio.wait_for(queue.get(), timeout=5), {"id": 1, "content": "bok"})
+        self.assertTrue(other.empty())
+        self.assertEqual(len(server.listeners), 1)
+
+        for listener in broker._listeners.values():
+            listener.cancel()
+
+    @skipIf(find_spec("redis"), "paket redis je instaliran")
+    def test_missing_redis_package_is_a_configuration_error(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "instagram-clone[redis]"):
+            RedisBroker(url="redis://stand-in")
+
+
+@override_settings(CHAT_PAGE_SIZE=3)
+class MessagePageTests(ChatTestCase):
+    # 🔹 GET /chat/<uuid>/get/: zadnja stranica, before_id (starije) i after_id (novije) preko obje grane razgovora
+
+    def setUp(self):
+        super().setUp()
+        stranger = User.objects.create_user(username="treci", email="treci@example.com", password="lozinka")
+        # 💬 Smjerovi se izmjenjuju (ja, drugi, drugi, ja, ...) + tuđi razgovor između njih
+        self.ids = []
+        for i, sender in enumerate([self.me, self.other, self.other, self.me, self.other, self.me, self.me]):
+            recipient = self.other if sender == self.me else self.me
+            self.ids.append(Message.objects.create(sender=sender, recipient=recipient, content=f"poruka {i}").id)
+            Message.objects.create(sender=stranger, recipient=self.me, content="tuđa")
+
+    def _page(self, user, target, **params):
+        self.client.force_login(user)
+        page = self.client.get(f"/chat/{target.user_uuid}/get/", params).json()
+        return [m["id"] for m in page["messages"]], page["has_more"]
+
+    def test_last_page_then_older_pages(self):
+        self.client.force_login(self.me)
+        with CaptureQueriesContext(connection) as captured:
+            page = self.client.get(f"/chat/{self.other.user_uuid}/get/").json()
+        # 📊 Jedan upit po grani, autor kroz select_related
+        self.assertEqual(len([q for q in captured.captured_queries if 'FROM "Chat_message"' in q["sql"]]), 2)
+        self.assertEqual([m["id"] for m in page["messages"]], self.ids[-3:])
+        self.assertEqual([m["is_from_me"] for m in page["messages"]], [False, True, True])
+
+        self.assertEqual(self._page(self.me, self.other), (self.ids[-3:], True))
+        self.assertEqual(self._page(self.me, self.other, before_id=self.ids[-3]), (self.ids[1:4], True))
+        self.assertEqual(self._page(self.me, self.other, before_id=self.ids[1]), (self.ids[:1], False))
+
+    def test_newer_pages_after_id(self):
+        self.client.force_login(self.other)
+        page = self.client.get(f"/chat/{self.me.user_uuid}/get/", {"after_id": 0}).json()
+        self.assertEqual([m["is_from_me"] for m in page["messages"]], [False, True, True])
+
+        self.assertEqual(self._page(self.other, self.me, after_id=0), (self.ids[:3], True))
+        self.assertEqual(self._page(self.other, self.me, after_id=self.ids[2]), (self.ids[3:6], True))
+        self.assertEqual(self._page(self.other, self.me, after_id=self.ids[5]), (self.ids[6:], False))
+
+
+class InboxTests(ChatTestCase):
+    # 🔹 Conversation / ConversationMember: zadnja poruka i nepročitano po sudioniku
+
+    def _unread(self):
+        members = ConversationMember.objects.values_list("user_id", "unread_count")
+        return dict(members)
+
+    def _send(self, sender, recipient, content):
+        self.client.force_login(sender)
+        response = self.client.post(f"/chat/{recipient.user_uuid}/send/", {"content": content})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["id"]
+
+    def test_send_counts_unread_and_open_resets(self):
+        self._send(self.me, self.other, "bok")
+        self._send(self.me, self.other, "jesi tu?")
+        last_id = self._send(self.other, self.me, "evo me " + "x" * 200)
+
+        conversation = Conversation.objects.get()
+        self.assertEqual((conversation.user_low_id, conversation.user_high_id), (self.me.pk, self.other.pk))
+        self.assertEqual(conversation.last_message_id, last_id)
+        self.assertEqual(len(conversation.last_message_snippet), 100)
+        self.assertEqual(self._unread(), {self.me.pk: 1, self.other.pk: 2})
+
+        self.client.force_login(self.other)
+        self.client.get(f"/chat/{self.me.user_uuid}/")
+        self.assertEqual(self._unread(), {self.me.pk: 1, self.other.pk: 0})
+        self.assertFalse(Message.objects.filter(recipient=self.other, is_read=False).exists())
+
+    def test_profile_counts_conversations_without_count_query(self):
+        third = User.objects.create_user(username="treci", email="treci@example.com", password="lozinka")
+        self._send(self.me, self.other, "bok")
+        self._send(third, self.me, "bok")
+
+        self.client.force_login(self.me)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get("/users/me/")
+        self.assertEqual((response.context["conversations_count"], len(response.context["conversations"])), (2, 2))
+        self.assertFalse([q for q in captured.captured_queries if 'COUNT(' in q["sql"] and "Conversation" in q["sql"]])
+
+    def test_migration_backfills_existing_messages(self):
+        fill_conversations = import_module("Chat.migrations.0003_conversation").fill_conversations
+        third = User.objects.create_user(username="treci", email="treci@example.com", password="lozinka")
+        # 📜 Poruke iz vremena prije inboxa (bez record_message)
+        Message.objects.create(sender=self.me, recipient=self.other, content="prva", is_read=True)
+        Message.objects.create(sender=self.other, recipient=self.me, content="druga")
+        last = Message.objects.create(sender=self.other, recipient=self.me, content="treća")
+        Message.objects.create(sender=third, recipient=self.me, content="od trećeg")
+        Message.objects.create(sender=self.me, recipient=self.me, content="sebi")
+
+        fill_conversations(apps, None)
+
+        self.assertEqual(Conversation.objects.count(), 2)
+        conversation = Conversation.objects.get(user_low=self.me, user_high=self.other)
+        self.assertEqual((conversation.last_message_id, conversation.last_message_snippet), (last.id, "treća"))
+        members = ConversationMember.objects.filter(conversation=conversation)
+        self.assertEqual(
+            {(m.user_id, m.other_id, m.unread_count, m.last_message_at) for m in members},
+            {(self.me.pk, self.other.pk, 2, last.created_at), (self.other.pk, self.me.pk, 0, last.created_at)},
+        )
+        self.assertEqual(ConversationMember.objects.get(user=third).unread_count, 0)
+
+
+@override_settings(CHAT_LONG_POLL_TIMEOUT=30)
+class LongPollTests(ChatTestCase):
+    # 🔹 poll_messages: odmah ako ima novih, budi ga send_message (nakon commit-a), prazno nakon isteka
+
+    def setUp(self):
+        super().setUp()
+        self.url = f"/chat/{self.other.user_uuid}/poll/"
+
+    def _send(self, execute=True):
+        # ✉️ Drugi korisnik šalje poruku; on_commit callbackovi (objava na broker) samo ako execute
+        self.client.force_login(self.other)
+        with self.captureOnCommitCallbacks(execute=execute):
+            return self.client.post(f"/chat/{self.me.user_uuid}/send/", {"content": "bok"}).json()["id"]
+
+    async def test_returns_immediately_when_messages_exist(self):
+        message_id = await sync_to_async(self._send)()
+        await self.async_client.aforce_login(self.me)
+        response = await asyncio.wait_for(self.async_client.get(self.url, {"after_id": 0}), timeout=5)
+        self.assertEqual([m["id"] for m in response.json()["messages"]], [message_id])
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+    async def test_wakes_on_send_after_commit(self):
+        await self.async_client.aforce_login(self.me)
+        poll = asyncio.ensure_future(self.async_client.get(self.url, {"after_id": 0}))
+        await self._subscribed()
+
+        # 📡 Objava tek nakon commit-a: dok se callbackovi ne izvrše, poll i dalje čeka
+        await sync_to_async(self._send)(execute=False)
+        await asyncio.sleep(0.1)
+        self.assertFalse(poll.done())
+
+        message_id = await sync_to_async(self._send)()
+        response = await asyncio.wait_for(poll, timeout=5)
+        self.assertEqual([m["is_from_me"] for m in response.json()["messages"]], [False, False])
+        self.assertEqual(response.json()["messages"][-1]["id"], message_id)
+
+    async def test_requires_after_id(self):
+        await self.async_client.aforce_login(self.me)
+        await sync_to_async(self._send)()
+        for params in ({}, {"after_id": "zadnja"}):
+            response = await asyncio.wait_for(self.async_client.get(self.url, params), timeout=5)
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+    @override_settings(CHAT_LONG_POLL_TIMEOUT=0.05)
+    async def test_timeout_returns_empty_page(self):
+        await self.async_client.aforce_login(self.me)
+        response = await asyncio.wait_for(self.async_client.get(self.url, {"after_id": 0}), timeout=5)
+        self.assertEqual(response.json(), {"messages": [], "has_more": False})
+        self.assertEqual(get_broker().subscriber_count(), 0)
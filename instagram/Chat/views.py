@@ -4,30 +4,63 @@
 # Funkcionalnosti:
 #   - chat_with(): Prikazuje chat stranicu s drugim korisником
 #   - send_message(): Stvara novu poruku između dva korisnika (JSON)
-#   - get_messages(): Dohvaća sve poruke razgovora (JSON)
+#   - get_messages(): Dohvaća stranicu poruka razgovora (JSON)
+#   - poll_messages(): Long-poll - čeka novu poruku (async, fallback bez WebSocketa)
 #
 # 📝 Rute:
 #   - GET /chat/<uuid>/ → Chat stranica s Javascriptom za real-time
 #   - POST /chat/<uuid>/send/ → Spremi novu poruku (AJAX)
-#   - GET /chat/<uuid>/get/ → Dohvati sve poruke (AJAX polling)
+#   - GET /chat/<uuid>/get/[?after_id=|before_id=] → Stranica poruka (AJAX)
+#   - GET /chat/<uuid>/poll/?after_id= → Čeka nove poruke do CHAT_LONG_POLL_TIMEOUT (long-poll fallback)
+#   - WS /ws/chat/<uuid>/ → Nove poruke u stvarnom vremenu (Chat/realtime.py, samo kroz ASGI)
 #
 # ⏱️ Real-time logika:
-#   - JavaScript pokreće GET /chat/<uuid>/get/ svaki 2 sekunde
-#   - Poruke se dohvaćaju kao JSON
-#   - Nove poruke se dinamički dodaju u stranicu
+#   - send_message() nakon commit-a objavi poruku na kanal razgovora (Chat/broker.py)
+#     → otvoreni WebSocketi oba sudionika je dobiju odmah
+#   - Bez WebSocketa (WSGI server, proxy bez Upgrade-a) JavaScript drži long-poll
+#     GET /chat/<uuid>/poll/ - zahtjev čeka na istom kanalu brokera i vraća se čim poruka stigne
 #
 # 🔒 Sigurnost: @login_required, @require_http_methods, ne može chat sa sobom
 # ========================================================================================================
 
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_http_methods
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from asgiref.sync import sync_to_async
+from functools import partial
+import asyncio
 import json
+import logging
 
 from Users.models import User
-from .models import Message
+from .broker import conversation_key, get_broker
+from .models import Message, mark_read, record_message
+
+
+logger = logging.getLogger(__name__)
+
+
+def _message_data(m):
+    # 🔹 _message_data() - Poruka kao dict za JSON (isti oblik za polling i WebSocket, bez is_from_me)
+    return {
+        'id': m.id,
+        'sender': m.sender.username,
+        'sender_uuid': str(m.sender.user_uuid),
+        'content': m.content,
+        'created_at': m.created_at.isoformat(),  # ISO 8601 format za parsing u JS
+    }
+
+
+def _publish(key, data):
+    # 🔹 _publish() - Push na WebSocket pretplatnike; greška brokera (npr. Redis nedostupan) ne ruši slanje
+    #    📎 Poruka je već spremljena - klijenti je dobiju pollingom
+    try:
+        get_broker().publish(key, data)
+    except Exception:
+        logger.exception("Objava chat poruke %s nije uspjela", data['id'])
 
 
 @login_required
@@ -37,22 +70,23 @@ def chat_with(request, user_uuid):
     #    💼 Kako radi:
     #       - Pronalazi korisnika po UUID-u
     #       - Proverava da li korisnik pokušava chatati sa sobom (blokirano)
-    #       - Označava sve nepročitane poruke kao pročitane (is_read=True)
+    #       - Označava sve nepročitane poruke kao pročitane (is_read=True) i nulira brojač
+    #         nepročitanih u inboxu (mark_read)
     #    
     #    📝 Što se prikazuje:
     #       - Chat stranicu s JavaScript-om za slanje/primanje poruka
     #       - Agentu se prosljeđuje `target` korisnik (podaci o drugom učesniku)
     #    
     #    🔄 Real-time refresh:
-    #       - JavaScript pokreće GET /chat/<uuid>/get/ svakih 2 sekunde
-    #       - Nove poruke se ažuriraju automatski bez osvježavanja stranice
+    #       - JavaScript učita zadnju stranicu poruka (GET /chat/<uuid>/get/), starije pri skrolanju na vrh
+    #       - Nove poruke stižu WebSocketom, ili long-pollom GET /chat/<uuid>/poll/?after_id=<zadnja>
     #    
     target = get_object_or_404(User, user_uuid=user_uuid)
     if target == request.user:
         return render(request, 'chat/room.html', {'error': 'Nije moguće chatati sa sobom'})
     
-    # ✅ Označi sve poruke od tog korisnika kao pročitane
-    Message.objects.filter(sender=target, recipient=request.user, is_read=False).update(is_read=True)
+    # ✅ Označi sve poruke od tog korisnika kao pročitane (i brojač u inboxu)
+    mark_read(request.user, target)
     
     return render(request, 'chat/room.html', {'target': target})
 
@@ -73,6 +107,10 @@ def send_message(request, user_uuid):
     #       - content = poruka
     #       - created_at = trenutno vrijeme
     #       - is_read = False (sámo-inicijazo)
+    #       - Conversation / ConversationMember: zadnja poruka, +1 nepročitano primatelju (record_message)
+    #    
+    #    📡 Real-time:
+    #       - Nakon commit-a poruka ide na kanal razgovora → WebSocketi oba sudionika
     #    
     #    📤 Odgovor:
     #       - JSON s podacima poruke (id, sender, content, created_at itd.)
@@ -93,57 +131,140 @@ def send_message(request, user_uuid):
     if len(content) > 1000:
         return JsonResponse({'success': False, 'error': 'Poruka je previše dugačka'}, status=400)
 
-    # 💾 Spremi poruku u bazu
-    msg = Message.objects.create(sender=request.user, recipient=target, content=content)
+    if target == request.user:
+        return JsonResponse({'success': False, 'error': 'Nije moguće chatati sa sobom'}, status=400)
+
+    # 💾 Spremi poruku u bazu + ažuriraj inbox oba sudionika (ista transakcija)
+    with transaction.atomic():
+        msg = Message.objects.create(sender=request.user, recipient=target, content=content)
+        record_message(msg)
+
+    # 📡 Push otvorenim WebSocketima razgovora (tek nakon commit-a - rollback ne šalje fantomsku poruku)
+    data = _message_data(msg)
+    transaction.on_commit(partial(_publish, conversation_key(request.user.pk, target.pk), data))
 
     # 📤 Vrati JSON s detaljima poruke
-    return JsonResponse({
-        'success': True,
-        'id': msg.id,
-        'sender': msg.sender.username,
-        'content': msg.content,
-        'created_at': msg.created_at.isoformat(),
-        'is_read': msg.is_read
-    })
+    return JsonResponse({'success': True, **data, 'is_read': msg.is_read})
+
+
+def _int_param(request, name):
+    try:
+        return int(request.GET[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def _message_page(user, target, after_id=None, before_id=None):
+    # 🔹 _message_page() - Stranica poruka razgovora kao dict za JSON (vidi get_messages)
+    #    💼 Razgovor = dvije grane: (sender=user, recipient=target) i obrnuto; svaka je range scan
+    #       indeksa (sender, recipient, id) od cursora, najviše CHAT_PAGE_SIZE + 1 redaka → spajanje
+    #       u Pythonu (jedan upit s OR-om bi sortirao CIJELI razgovor prije LIMIT-a)
+    limit = settings.CHAT_PAGE_SIZE
+
+    # 🔍 Poruke između user-a i target-a (oba smjera, svaki svojim dijelom indeksa)
+    branches = [
+        Message.objects.filter(sender=user, recipient=target).select_related('sender'),
+        Message.objects.filter(sender=target, recipient=user).select_related('sender'),
+    ]
+    if target == user:
+        branches = branches[:1]  # 🪞 Razgovor sa sobom - obje grane su iste
+
+    if after_id is not None:
+        # ⬇️ Novije od after_id: najstarije prve
+        rows = sorted(
+            (m for branch in branches for m in branch.filter(id__gt=after_id).order_by('id')[:limit + 1]),
+            key=lambda m: m.id,
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+    else:
+        # ⬆️ Zadnja stranica ili starije od before_id: najnovije prve, pa okreni
+        if before_id is not None:
+            branches = [branch.filter(id__lt=before_id) for branch in branches]
+        rows = sorted(
+            (m for branch in branches for m in branch.order_by('-id')[:limit + 1]),
+            key=lambda m: m.id, reverse=True,
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit][::-1]
+
+    # 📋 Pretvori u JSON-kompatibilan format
+    msgs = [
+        {**_message_data(m), 'is_from_me': m.sender_id == user.pk}  # Za CSS bubble styling
+        for m in rows
+    ]
+    return {'messages': msgs, 'has_more': has_more}
 
 
 @require_http_methods(["GET"])
 @login_required
 def get_messages(request, user_uuid):
-    # 🔹 get_messages() - Dohvaća sve poruke razgovora između dva korisnika
+    # 🔹 get_messages() - Dohvaća jednu stranicu poruka razgovora između dva korisnika
+    #    
+    #    📝 Parametri (opcionalno, najviše jedan):
+    #       - after_id: Poruke novije od ove (nadoknada nakon spajanja WebSocketa)
+    #       - before_id: Poruke starije od ove (skrolanje unatrag)
+    #       - bez parametara: zadnjih CHAT_PAGE_SIZE poruka (otvaranje razgovora)
     #    
     #    💼 Kako radi:
-    #       - Pronalazi sve poruke gdje je request.user pošiljaoc ili primaoć
-    #       - Filtrira samo poruke s targetom korisnikom
-    #       - Sortira po vremenu kreiranja (oldest first)
+    #       - _message_page(): dvije grane razgovora po indeksu (sender, recipient, id), najviše
+    #         CHAT_PAGE_SIZE + 1 redaka → višak znači da postoji još (bez COUNT-a)
+    #       - select_related('sender') → autor poruke bez upita po poruci
     #    
     #    📝 Što se vraća:
-    #       - JSON niz sa svim porukama
+    #       - messages: stranica poruka, uvijek od najstarije prema najnovijoj
+    #       - has_more: postoji još poruka u smjeru upita (starijih za before_id / zadnju stranicu,
+    #         novijih za after_id)
     #       - Svaka poruka ima: id, sender, sender_uuid, content, created_at, is_from_me
-    #       - is_from_me = True ako je poruka od request.user-a (za CSS styling)
-    #    
-    #    🔄 Korištenje:
-    #       - JavaScript pokreće ovaj endpoint svakih 2 sekunde
-    #       - Prikazuje samo nove poruke (one koje nisu već renderirene)
     #    
     target = get_object_or_404(User, user_uuid=user_uuid)
-    
-    # 🔍 Dohvati sve poruke između request.user-a i target-a (u oba smjera)
-    messages = Message.objects.filter(
-        models.Q(sender=request.user, recipient=target) | 
-        models.Q(sender=target, recipient=request.user)
-    ).order_by('created_at')  # Od najstarije prema najnovijoj
+    page = _message_page(
+        request.user, target,
+        after_id=_int_param(request, 'after_id'), before_id=_int_param(request, 'before_id'),
+    )
+    return JsonResponse(page)
 
-    # 📋 Pretvori u JSON-kompatibilan format
-    msgs = []
-    for m in messages:
-        msgs.append({
-            'id': m.id,
-            'sender': m.sender.username,
-            'sender_uuid': str(m.sender.user_uuid),
-            'content': m.content,
-            'created_at': m.created_at.isoformat(),  # ISO 8601 format za parsing u JS
-            'is_from_me': m.sender == request.user  # Za CSS bubble styling
-        })
-
-    return JsonResponse({'messages': msgs})
+
+@require_http_methods(["GET"])
+@login_required
+async def poll_messages(request, user_uuid):
+    # 🔹 poll_messages() - Long-poll: čeka novu poruku razgovora umjesto da klijent polla svake 2 sekunde
+    #    
+    #    📝 Parametri: after_id (obavezan) - zadnja poruka koju klijent ima, 0 ako nema nijednu
+    #       → bez njega 400 (inače bi odmah vratio najstariju stranicu i klijent bi vrtio zahtjeve)
+    #    
+    #    💼 Kako radi (async view - kroz instagram/asgi.py ne zauzima thread dok čeka):
+    #       1. Pretplata na kanal razgovora (Chat/broker.py) PRIJE upita → poruka spremljena između
+    #          upita i čekanja se ne gubi (čeka u redu)
+    #       2. Ima li već novijih poruka od after_id → odmah vrati stranicu
+    #       3. Inače čekaj objavu iz send_message() najviše CHAT_LONG_POLL_TIMEOUT sekundi
+    #          → čekanje ne radi nijedan upit u bazu (samo asyncio red)
+    #       4. Nova poruka → jedan upit (after_id) i odgovor; istek → prazna stranica, klijent ponovi
+    #    
+    #    📤 Odgovor: isti oblik kao get_messages ({'messages': [...], 'has_more': ...})
+    #    
+    #    ⚠️ Pod WSGI serverom radi, ali svaki čekajući zahtjev drži jedan worker thread
+    #    
+    after_id = _int_param(request, 'after_id')
+    if after_id is None:
+        return JsonResponse({'success': False, 'error': 'Nedostaje after_id'}, status=400)
+    try:
+        target = await User.objects.only('pk', 'user_uuid').aget(user_uuid=user_uuid)
+    except User.DoesNotExist:
+        raise Http404
+    user = await request.auser()
+
+    broker = get_broker()
+    key = conversation_key(user.pk, target.pk)
+    queue = await broker.subscribe(key)
+    try:
+        page = await sync_to_async(_message_page)(user, target, after_id=after_id)
+        if not page['messages']:
+            try:
+                await asyncio.wait_for(queue.get(), timeout=settings.CHAT_LONG_POLL_TIMEOUT)
+            except asyncio.TimeoutError:
+                return JsonResponse(page)
+            page = await sync_to_async(_message_page)(user, target, after_id=after_id)
+    finally:
+        await broker.unsubscribe(key, queue)
+    return JsonResponse(page)
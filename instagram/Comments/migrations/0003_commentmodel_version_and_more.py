@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-16 22:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Comments', '0002_commentmodel_parent'),
+        ('Posts', '0009_postmodel_comments_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commentmodel',
+            name='version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='commentmodel',
+            index=models.Index(fields=['post', 'version'], name='comment_post_version_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-16 22:54
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.http import int_to_base36
+
+
+def fill_paths(apps, schema_editor):
+    # 🌳 Postojeći komentari: path = path roditelja + base36(id) (roditelj uvijek ima manji ID)
+    CommentModel = apps.get_model('Comments', 'CommentModel')
+    paths = {}
+    batch = []
+    for pk, parent_id in CommentModel.objects.order_by('id').values_list('id', 'parent_id').iterator(chunk_size=2000):
+        paths[pk] = paths.get(parent_id, "") + int_to_base36(pk).zfill(8)
+        batch.append(CommentModel(pk=pk, path=paths[pk]))
+        if len(batch) >= 1000:
+            CommentModel.objects.bulk_update(batch, ['path'])
+            batch = []
+    CommentModel.objects.bulk_update(batch, ['path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Comments', '0003_commentmodel_version_and_more'),
+        ('Posts', '0010_post_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commentmodel',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='commentmodel',
+            index=models.Index(fields=['post', 'path'], name='comment_post_path_idx'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-16 22:58
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_likes(apps, schema_editor):
+    # ❤️ Inicijalno popuni CommentModel.likes iz postojećih CommentLike redova
+    CommentModel = apps.get_model('Comments', 'CommentModel')
+    CommentLike = apps.get_model('Interactions', 'CommentLike')
+    rows = CommentLike.objects.filter(comment=OuterRef('pk')).order_by().values('comment').annotate(n=Count('pk')).values('n')
+    CommentModel.objects.update(likes=Coalesce(Subquery(rows, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Comments', '0004_commentmodel_path'),
+        ('Interactions', '0002_commentlike_dislike'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_likes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='commentmodel',
+            index=models.Index(fields=['post', 'likes'], name='comment_post_likes_idx'),
+        ),
+    ]
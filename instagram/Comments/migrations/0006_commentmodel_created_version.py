@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Comments', '0005_commentmodel_likes_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commentmodel',
+            name='created_version',
+            field=models.IntegerField(default=0),
+        ),
+    ]
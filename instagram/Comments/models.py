@@ -3,36 +3,84 @@
 # Svrha: Čuvanje komentara na objavama s podrškom za nested replies
 # Polja:
 #   - content: Tekst komentara (max 300 znakova, obavezno)
-#   - likes: Brojač like-a (sadržan u CommentLike modelu)
+#   - likes: Denormalizirani broj CommentLike redova (toggle_comment_like ga atomski mijenja)
 #   - author: ForeignKey na User (pišač komentara)
 #   - post: ForeignKey na PostModel (objava na koju se komentiraj)
 #   - parent: ForeignKey na sebe (self-reference za replies/nested komentare)
 #   - created_at: Vrijeme kreiranja (automatski)
+#   - version: PostModel.comments_version u trenutku zadnje promjene (nastanak ili like/unlike)
+#   - created_version: PostModel.comments_version u trenutku nastanka (novi komentar vs. samo like u delti)
+#   - path: Materijalizirani put od korijena niti (npr. "0000002a0000002f")
 #
 # 📋 Redoslijed:
-#   - Sortirani po vremenu kreiranja
+#   - ORDER BY path = cijela nit u pre-order redoslijedu (roditelj pa njegovi odgovori, po vremenu)
+#   - ORDER BY likes DESC, id DESC = "top" komentari (indeks post+likes)
 #
-# 👶 Nested struktura:
-#   - Top-level komentar: parent=None
-#   - Reply na komentar: parent=neki drugi komentar
+# 👶 Nested struktura (proizvoljna dubina, do MAX_DEPTH):
+#   - Top-level komentar: parent=None, path = segment(id)
+#   - Reply na komentar: parent=neki drugi komentar, path = parent.path + segment(id)
+#   - Podstablo komentara = raspon [path, path + "~") → jedan range scan po indeksu (post, path)
 # ========================================================================================================
 
-from django.db import models
+from django.db import models, transaction
+from django.utils.http import int_to_base36
 
+from instagram.atomic import increment
 from Users.models import User
 from Posts.models import PostModel
 
 
+def bump_comments_version(post_id):
+    # 🔹 bump_comments_version() - Atomski poveća PostModel.comments_version i vrati novu vrijednost
+    #    
+    #    💼 Kako radi:
+    #       - UPDATE ... SET comments_version = comments_version + 1 ... RETURNING (instagram/atomic.increment)
+    #       - Poziva se unutar transakcije koja dodaje komentar ili mijenja like na komentaru
+    #       - Vraćena verzija se upisuje u CommentModel.version promijenjenog komentara
+    #    
+    version, = increment(PostModel, post_id, comments_version=1)
+    return version
+
+
+# 🌳 Materialized path: svaka razina = ID komentara u base36, nadopunjen nulama na PATH_STEP znakova
+#    → leksikografski poredak puta = pre-order obilazak stabla, braća poredana po ID-u (vremenu)
+PATH_STEP = 8
+PATH_MAX_LENGTH = 255
+MAX_DEPTH = PATH_MAX_LENGTH // PATH_STEP  # 31 razina
+PATH_END = "~"  # Veći od svih znakova segmenta (0-9, a-z) → gornja granica raspona podstabla
+
+
+def path_segment(pk):
+    # 🔹 path_segment() - Segment puta za komentar s ovim ID-em ("42" → "00000016")
+    return int_to_base36(pk).zfill(PATH_STEP)
+
+
+def subtree(comment):
+    # 🔹 subtree() - Komentar i svi njegovi odgovori na svim razinama, u pre-order redoslijedu
+    #    💼 Raspon path >= P AND path < P~ (umjesto LIKE 'P%') - index range scan na svakoj bazi
+    #    📎 Koristi ga GET comment/<id>/replies (Comments/views.py)
+    return CommentModel.objects.filter(
+        post_id=comment.post_id, path__gte=comment.path, path__lt=comment.path + PATH_END
+    ).order_by('path')
+
+
 class CommentModel(models.Model):
     # 🔹 CommentModel - Model za komentar na objavu
     #    
     #    📝 Polja:
     #       - content: Tekst komentara (max 300 znakova, obavezno)
-    #       - likes: Integer brojač (legacy polje, now computed from CommentLike model)
+    #       - likes: Broj like-a (denormalizirano, bez COUNT(*) nad CommentLike pri čitanju)
     #       - author: ForeignKey na User koji je napisao komentar
     #       - post: ForeignKey na PostModel (objava na koju se komentiraj)
     #       - parent: ForeignKey na sebe (self-reference za replies)
     #       - created_at: Vrijeme kreiranja (automatski)
+    #       - version: Verzija objave pri zadnjoj promjeni komentara (nastanak, like/unlike)
+    #       - created_version: Verzija objave pri nastanku komentara (0 = prije uvođenja polja)
+    #       - path: Put od korijena niti (puni se u save() pri prvom spremanju)
+    #    
+    #    🔄 Inkrementalni polling:
+    #       - Klijent pamti (zadnji ID komentara, verziju objave)
+    #       - Promijenjeni komentari: version > v; novi među njima: created_version > v
     #    
     #    🔗 Relacije:
     #       - author.commentmodel_set: Svi komentari od tog korisnika
@@ -42,11 +90,12 @@ class CommentModel(models.Model):
     #    
     #    👶 Struktura replies:
     #       - Top-level: parent=None
-    #       - Reply: parent={neki komentar}
+    #       - Reply: parent={neki komentar}, na bilo kojoj dubini do MAX_DEPTH
     #       - Brisanje parent-a briše sve replies (on_delete=CASCADE)
     #    
     content = models.TextField(max_length=300, null=False, blank=False)
-    # ❤️ 'likes' - legacy polje, real likes trebam pratiti u CommentLike modelu
+    # ❤️ Brojač CommentLike redova - F('likes') ± 1 u istoj transakciji kao insert/delete like-a
+    #    (drift npr. zbog kaskadnog brisanja korisnika popravlja: python manage.py reconcile_counters)
     likes = models.IntegerField(blank=False, default=0)
 
     author = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -56,9 +105,41 @@ class CommentModel(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)  # ⏰ Postavi se samo pri kreiranju
 
+    # 🔄 PostModel.comments_version kod zadnje promjene ovog komentara
+    version = models.IntegerField(default=0)
+    # 🆕 PostModel.comments_version kod nastanka (delta razlikuje novi odgovor od like-a na stari)
+    created_version = models.IntegerField(default=0)
+
+    # 🌳 Materijalizirani put (vidi path_segment / subtree)
+    path = models.CharField(max_length=PATH_MAX_LENGTH, blank=True, default="", editable=False)
+
     class Meta:
         db_table = "Comment"  # 💾 Eksplicitno ime tablice
+        indexes = [
+            # ⚡ Polling: WHERE post = ? AND (id > since OR version > v)
+            models.Index(fields=["post", "version"], name="comment_post_version_idx"),
+            # ⚡ Nit / podstablo: WHERE post = ? [AND path BETWEEN ...] ORDER BY path
+            models.Index(fields=["post", "path"], name="comment_post_path_idx"),
+            # ⚡ Top komentari: WHERE post = ? ORDER BY likes DESC, id DESC
+            models.Index(fields=["post", "likes"], name="comment_post_likes_idx"),
+        ]
 
     def __str__(self):
         # 🔹 __str__ - Prikazuje osnove komentara
         return f"{self.author.username} na {self.post.title}: {self.content[:50]}"
+
+    @property
+    def depth(self):
+        # 🔹 depth - 0 za top-level komentar, 1 za odgovor, ...
+        return max(len(self.path) // PATH_STEP - 1, 0)
+
+    def save(self, *args, **kwargs):
+        # 🔹 save() - Pri prvom spremanju upisuje path (treba ID → INSERT pa UPDATE u istoj transakciji)
+        #    ⚠️ Roditelj mora već imati path (uvijek vrijedi - roditelj je spremljen prije odgovora)
+        if self.path:
+            return super().save(*args, **kwargs)
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            parent_path = self.parent.path if self.parent_id else ""
+            self.path = parent_path + path_segment(self.pk)
+            CommentModel.objects.filter(pk=self.pk).update(path=self.path)
@@ -1,3 +1,225 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from Users.models import User
+from Posts.models import PostModel
+from Interactions.models import CommentLike
+from .models import CommentModel
+
+
+class CommentsGetQueryCountTests(TestCase):
+    # 🔹 Comments.views.get mora imati fiksan broj upita, neovisno o broju komentara
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+        self.reader = User.objects.create_user(username="citatelj", email="citatelj@example.com", password="lozinka")
+        self.post = PostModel.objects.create(title="Objava", content="Sadržaj", author=self.author)
+        self.client.force_login(self.reader)
+
+    def _add_comments(self, count):
+        for i in range(count):
+            parent = CommentModel.objects.create(author=self.author, post=self.post, content=f"komentar {i}")
+            reply = CommentModel.objects.create(author=self.reader, post=self.post, content=f"odgovor {i}", parent=parent)
+            self._like(self.reader, parent)
+            self._like(self.author, reply)
+
+    def _like(self, user, comment):
+        # ❤️ Kao toggle_comment_like: redak + brojač u istoj transakciji
+        CommentLike.objects.create(user=user, comment=comment)
+        CommentModel.objects.filter(pk=comment.pk).update(likes=F('likes') + 1)
+
+    def _queries_for_get(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(f"/{self.post.uuid_field}/comment/get")
+        self.assertEqual(response.status_code, 200)
+        return len(captured.captured_queries), response.json()
+
+    def test_query_count_does_not_depend_on_comment_volume(self):
+        self._add_comments(2)
+        few, _ = self._queries_for_get()
+
+        self._add_comments(25)
+        many, data = self._queries_for_get()
+
+        self.assertEqual(few, many)
+        self.assertEqual(len(data["comments"]), settings.COMMENTS_PAGE_SIZE)
+        self.assertIsNotNone(data["next"])
+
+    def test_pages_follow_the_cursor(self):
+        self._add_comments(27)
+        _, first = self._queries_for_get()
+        second = self.client.get(f"/{self.post.uuid_field}/comment/get", {"cursor": first["next"]}).json()
+
+        ids = [c["id"] for c in first["comments"] + second["comments"]]
+        self.assertEqual(len(ids), 27)
+        self.assertEqual(ids, sorted(ids))
+        self.assertIsNone(second["next"])
+
+    def test_replies_are_previewed_and_paged(self):
+        root = CommentModel.objects.create(author=self.author, post=self.post, content="korijen")
+        direct = [
+            CommentModel.objects.create(author=self.reader, post=self.post, content=f"odgovor {i}", parent=root).id
+            for i in range(settings.COMMENTS_PAGE_SIZE + 2)
+        ]
+        # 👶 Dublja razina je u istom rasponu path-a, ali nije izravan odgovor → ne vraća se
+        CommentModel.objects.create(author=self.author, post=self.post, content="unuk", parent_id=direct[0])
+
+        _, data = self._queries_for_get()
+        comment = data["comments"][0]
+        self.assertEqual(comment["reply_count"], settings.COMMENTS_PAGE_SIZE + 2)
+        self.assertEqual(len(comment["replies"]), settings.COMMENT_REPLIES_PREVIEW)
+
+        url = f"/comment/{root.id}/replies"
+        with CaptureQueriesContext(connection) as full_page:
+            first = self.client.get(url).json()
+        with CaptureQueriesContext(connection) as last_page:
+            second = self.client.get(url, {"cursor": first["next"]}).json()
+        self.assertEqual(len(full_page.captured_queries), len(last_page.captured_queries))
+        self.assertEqual([r["id"] for r in first["replies"] + second["replies"]], direct)
+        self.assertEqual(first["replies"][0]["reply_count"], 1)
+        self.assertIsNone(second["next"])
+
+    def test_tree_likes_and_liked_flags(self):
+        self._add_comments(1)
+        _, data = self._queries_for_get()
+
+        comment = data["comments"][0]
+        self.assertEqual(comment["likes"], 1)
+        self.assertTrue(comment["liked"])
+        self.assertEqual(len(comment["replies"]), 1)
+
+        reply = comment["replies"][0]
+        self.assertEqual(reply["parent_id"], comment["id"])
+        self.assertEqual(reply["likes"], 1)
+        self.assertFalse(reply["liked"])
+
+    def test_delta_marks_only_new_comments_as_created(self):
+        root = CommentModel.objects.create(author=self.author, post=self.post, content="korijen")
+        self.client.post(f"/{self.post.uuid_field}/comment/add", {"content": "stari", "parent_id": root.id})
+        version = self._queries_for_get()[1]["v"]
+        old_reply = CommentModel.objects.get(content="stari")
+
+        # ❤️ Like na postojeći odgovor + 🆕 novi odgovor nakon zadnjeg polla
+        self.client.post(f"/comment/{old_reply.id}/like")
+        self.client.post(f"/{self.post.uuid_field}/comment/add", {"content": "novi", "parent_id": root.id})
+
+        delta = self.client.get(f"/{self.post.uuid_field}/comment/get", {"v": version}).json()["comments"]
+        self.assertEqual(
+            [(c["content"], c["likes"], c["created"]) for c in delta], [("stari", 1, False), ("novi", 0, True)]
+        )
+
+
+class CommentLikeCounterTests(TestCase):
+    # 🔹 CommentModel.likes: brojač koji održava toggle_comment_like, "top" poredak i reconcile_counters
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+        self.post = PostModel.objects.create(title="Objava", content="Sadržaj", author=self.author)
+        self.client.force_login(self.author)
+
+    def _toggle(self, comment):
+        response = self.client.post(f"/comment/{comment.id}/like")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_toggle_keeps_counter_exact(self):
+        comment = CommentModel.objects.create(author=self.author, post=self.post, content="komentar")
+
+        self.assertEqual(self._toggle(comment), {"liked": True, "likes": 1})
+        comment.refresh_from_db()
+        self.assertEqual(comment.likes, 1)
+
+        self.assertEqual(self._toggle(comment), {"liked": False, "likes": 0})
+        comment.refresh_from_db()
+        self.assertEqual(comment.likes, 0)
+        self.assertFalse(CommentLike.objects.filter(comment=comment).exists())
+
+    def test_top_order_pages_by_likes(self):
+        comments = [
+            CommentModel.objects.create(author=self.author, post=self.post, content=f"komentar {i}", likes=likes)
+            for i, likes in enumerate([0, 5, 2] + [1] * settings.COMMENTS_PAGE_SIZE)
+        ]
+        url = f"/{self.post.uuid_field}/comment/get"
+        first = self.client.get(url, {"order": "top"}).json()
+        second = self.client.get(url, {"order": "top", "cursor": first["next"]}).json()
+
+        ids = [c["id"] for c in first["comments"] + second["comments"]]
+        self.assertEqual(ids[:2], [comments[1].id, comments[2].id])
+        self.assertEqual(ids[-1], comments[0].id)
+        self.assertEqual(sorted(ids), sorted(c.id for c in comments))
+        self.assertIsNone(second["next"])
+
+    def test_reconcile_repairs_drift(self):
+        reader = User.objects.create_user(username="citatelj", email="citatelj@example.com", password="lozinka")
+        comment = CommentModel.objects.create(author=self.author, post=self.post, content="komentar")
+        self._toggle(comment)
+        self.client.force_login(reader)
+        self._toggle(comment)
+
+        # 🗑️ Kaskadno brisanje like-a mimo view-a → brojač zaostaje
+        reader.delete()
+        comment.refresh_from_db()
+        self.assertEqual(comment.likes, 2)
+
+        call_command("reconcile_counters", stdout=StringIO())
+        comment.refresh_from_db()
+        self.assertEqual(comment.likes, 1)
+
+
+class CommentThreadTests(TestCase):
+    # 🔹 Materialized path: proizvoljna dubina, nit i podstablo u jednom upitu
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+        self.post = PostModel.objects.create(title="Objava", content="Sadržaj", author=self.author)
+        self.client.force_login(self.author)
+
+    def _reply(self, content, parent=None):
+        response = self.client.post(
+            f"/{self.post.uuid_field}/comment/add",
+            {"content": content, "parent_id": parent.id if parent else ""},
+        )
+        self.assertEqual(response.status_code, 200)
+        return CommentModel.objects.get(pk=response.json()["id"])
+
+    def test_deep_thread_is_returned_nested(self):
+        root = self._reply("korijen")
+        level = root
+        for depth in range(1, 5):
+            level = self._reply(f"razina {depth}", level)
+        sibling = self._reply("drugi odgovor", root)
+        second_root = self._reply("drugi korijen")
+
+        self.assertEqual(level.depth, 4)
+        self.assertTrue(level.path.startswith(root.path))
+
+        data = self.client.get(f"/{self.post.uuid_field}/comment/get").json()["comments"]
+        self.assertEqual([c["id"] for c in data], [root.id, second_root.id])
+        self.assertEqual([r["id"] for r in data[0]["replies"]][-1], sibling.id)
+
+        # 👶 Dublje razine se otvaraju endpointom odgovora (svaka razina ima reply_count)
+        node = data[0]["replies"][0]
+        for depth in range(2, 5):
+            self.assertEqual(node["reply_count"], 1)
+            node = self.client.get(f"/comment/{node['id']}/replies").json()["replies"][0]
+            self.assertEqual(node["content"], f"razina {depth}")
+        self.assertEqual(node["reply_count"], 0)
+
+    def test_subtree_is_one_ordered_range(self):
+        from .models import subtree
+
+        root = self._reply("korijen")
+        child = self._reply("dijete", root)
+        grandchild = self._reply("unuk", child)
+        self._reply("drugi korijen")
 
-# Create your tests here.
+        with CaptureQueriesContext(connection) as captured:
+            ids = list(subtree(child).values_list("id", flat=True))
+        self.assertEqual(ids, [child.id, grandchild.id])
+        self.assertEqual(len(captured.captured_queries), 1)
@@ -3,28 +3,37 @@
 # Svrha: AJAX API-ji za dodavanje komentara i dohvaćanje svih komentara na objavu
 # Funkcionalnosti:
 #   - add(): Stvara novi komentar na objavu (s opcionalnom reply mogućnosti)
-#   - get(): Dohvaća sve komentare na objavu sa odgovorima
+#   - get(): Stranica top-level komentara s pregledom odgovora (ili delta za polling)
+#   - replies(): Stranica odgovora jednog komentara
 #   - like(): Placeholder za like na komentar
 #
 # 📝 Rute:
 #   - POST /posts/<id>/comment/add → Dodaj komentar (JSON)
-#   - GET /posts/<id>/comment/get → Dohvati sve komentare (JSON)
+#   - GET /posts/<id>/comment/get[?order=top][&cursor=<cursor>] → Stranica komentara (JSON)
+#   - GET /posts/<id>/comment/get?v=<verzija> → Samo promjene (JSON ili 304)
+#   - GET /posts/comment/<comment_id>/replies[?cursor=<cursor>] → Stranica odgovora (JSON)
 #
 # 💬 Komentari:
-#   - Mogu biti top-level (parent=None) ili odgovori (parent=neki drugi komentar)
+#   - Mogu biti top-level (parent=None) ili odgovori (parent=neki drugi komentar) na bilo kojoj dubini
+#   - Stablo se čita jednim upitom ORDER BY path (materialized path, vidi Comments/models.py)
 #   - Max 300 znakova
-#   - Prate se like-ovi kroz CommentLike model
+#   - Prate se like-ovi kroz CommentLike model; broj je u CommentModel.likes (bez COUNT-a pri čitanju)
 #
 # 🔒 Sigurnost: @login_required za dodavanje, @require_http_methods za методе
 # ========================================================================================================
 
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber
 
-from .models import CommentModel
+from .models import MAX_DEPTH, CommentModel, bump_comments_version, subtree
 from Posts.models import PostModel
+from Posts.pagination import KeysetPaginator
 
 
 @require_http_methods(["POST"])
@@ -39,8 +48,9 @@ def add(request, id):
     #    💼 Kako radi:
     #       1. Dohvati objavu po UUID-u
     #       2. Validiraj da 'content' nije prazan
-    #       3. Ako postoji parent_id, pronađi parent komentar
-    #       4. Spremi novi komentar u bazu
+    #       3. Ako postoji parent_id, pronađi parent komentar (max MAX_DEPTH razina)
+    #       4. Spremi novi komentar u bazu (CommentModel.save() upisuje path = parent.path + segment)
+    #       5. Povećaj PostModel.comments_count i comments_version (ista transakcija)
     #    
     #    💾 Što se sprema:
     #       - author = request.user
@@ -69,9 +79,16 @@ def add(request, id):
             parent = CommentModel.objects.get(id=int(parent_id), post=post)
         except Exception:
             return JsonResponse({'error': 'Nevalidan parent komentar'}, status=400)
+        if parent.depth + 1 >= MAX_DEPTH:
+            return JsonResponse({'error': 'Previše razina odgovora'}, status=400)
 
-    # 💾 Kreiraj i spremi komentar
-    c = CommentModel.objects.create(author=request.user, content=content, post=post, parent=parent)
+    # 💾 Kreiraj i spremi komentar + atomski povećaj brojač i verziju komentara na objavi
+    with transaction.atomic():
+        version = bump_comments_version(post.pk)
+        c = CommentModel.objects.create(
+            author=request.user, content=content, post=post, parent=parent, version=version, created_version=version
+        )
+        PostModel.objects.filter(pk=post.pk).update(comments_count=F('comments_count') + 1)
 
     # 📤 Vrati JSON s detaljima
     return JsonResponse({
@@ -80,79 +97,186 @@ def add(request, id):
         'author_uuid': str(c.author.user_uuid),
         'content': c.content,
         'created_at': c.created_at.strftime('%d.%m.%Y %H:%M') if c.created_at else '',
-        'parent_id': c.parent.id if c.parent else None
+        'parent_id': c.parent.id if c.parent else None,
+        'depth': c.depth,
     })
 
 
+def _serialize(c, liked_ids):
+    # 🔹 _serialize() - Pretvara komentar u dict za JSON (bez dodatnih upita)
+    #    ⚠️ Očekuje: select_related('author') i anotaciju reply_count (_annotated)
+    return {
+        'id': c.id,
+        'author': c.author.username,
+        'author_uuid': str(c.author.user_uuid),
+        'content': c.content,
+        'created_at': c.created_at.strftime('%d.%m.%Y %H:%M') if c.created_at else '',
+        'likes': c.likes,
+        'liked': c.id in liked_ids,
+        'reply_count': c.reply_count,
+    }
+
+
+def _annotated(rows):
+    # 🔹 _annotated() - Autor (JOIN) + broj izravnih odgovora (podupit po parent_id)
+    #    📎 Broj like-a je stupac likes → nema JOIN-a ni GROUP BY nad CommentLike
+    replies = (
+        CommentModel.objects.filter(parent=OuterRef('pk')).order_by()
+        .values('parent').annotate(n=Count('pk')).values('n')
+    )
+    return rows.select_related('author').annotate(
+        reply_count=Coalesce(Subquery(replies, output_field=IntegerField()), 0),
+    )
+
+
+def _liked_ids(request, comments):
+    # 🔹 _liked_ids() - ID-evi komentara (od danih) koje je request.user lajkao - jedan upit
+    #    ⏳ Write-behind uključen: c.likes i liked_ids uključuju like-ove koji još nisu flushani
+    from Interactions.models import CommentLike
+    from Interactions.writebehind import get_buffer
+
+    liked_ids = set()
+    if request.user.is_authenticated and comments:
+        liked = CommentLike.objects.filter(user=request.user, comment_id__in=[c.id for c in comments])
+        liked_ids = set(liked.values_list('comment_id', flat=True))
+    buffer = get_buffer()
+    if buffer is not None:
+        liked_ids = buffer.overlay_comments(request.user.pk, comments, liked_ids)
+    return liked_ids
+
+
+def build_tree(rows, liked_ids):
+    # 🔹 build_tree() - Ugnježđeno stablo iz komentara poredanih po path-u, u O(n)
+    #    💼 Pre-order redoslijed → roditelj je uvijek prije djece; čvor se veže na roditelja preko dict-a
+    #    📎 Komentar čiji roditelj nije u rows (npr. podstablo) postaje korijen rezultata
+    nodes = {}
+    roots = []
+    for c in rows:
+        data = _serialize(c, liked_ids)
+        data['replies'] = []
+        parent = nodes.get(c.parent_id)
+        if parent is None:
+            roots.append(data)
+        else:
+            data['parent_id'] = c.parent_id
+            parent['replies'].append(data)
+        nodes[c.id] = data
+    return roots
+
+
+# 📋 ?order= → KeysetPaginator ordering (zadnje polje je jedinstveno)
+COMMENT_ORDERINGS = {
+    'oldest': ("id",),
+    'top': ("-likes", "-id"),
+}
+
+
+def _int_param(request, name):
+    try:
+        return int(request.GET[name])
+    except (KeyError, ValueError):
+        return None
+
+
 @require_http_methods(["GET"])
 def get(request, id):
-    # 🔹 get() - Dohvaća sve komentare na objavu (top-level + replies)
+    # 🔹 get() - Dohvaća stranicu top-level komentara ili samo promjene od zadnjeg polla
     #    
-    #    💼 Kako radi:
+    #    📝 Parametri (opcionalno):
+    #       - cursor: Keyset cursor sljedeće stranice top-level komentara (iz 'next')
+    #       - order: 'top' → top-level komentari po broju like-a (inače najstariji prvi)
+    #       - v: PostModel.comments_version koju je klijent zadnju vidio (inkrementalni polling)
+    #    
+    #    💼 Kako radi (stranica):
     #       1. Pronađi objavu po UUID-u
-    #       2. Dohvati sve top-level komentare (parent=None)
-    #       3. Za svaki top-level komentar, dohvati sve replies (nested)
-    #       4. Prebrojaj like-e za svaki komentar
+    #       2. COMMENTS_PAGE_SIZE top-level komentara iza cursora (KeysetPaginator po id-u,
+    #          ili po (likes, id) silazno za order=top - indeks post+likes)
+    #       3. Za njih prvih COMMENT_REPLIES_PREVIEW izravnih odgovora - jedan upit s
+    #          ROW_NUMBER() OVER (PARTITION BY parent_id ORDER BY path)
+    #       4. Jednim upitom ID-evi komentara na stranici koje je request.user lajkao
+    #       5. Složi stablo (build_tree); ostali odgovori → reply_count + GET comment/<id>/replies
     #    
-    #    📝 Što se vraća:
-    #       - JSON niz sa svim komentarima
-    #       - Svaki komentar ima: id, author, content, created_at, likes, liked (od trenutnog korisnika), replies
-    #       - Replies su ugnježđeni u replies array
+    #    🔄 Inkrementalni mod (v):
+    #       - Verzija nepromijenjena → 304 Not Modified (samo jedan upit - objava)
+    #       - Inače: najviše COMMENTS_DELTA_LIMIT promijenjenih komentara (novi ili like/unlike)
+    #         poredanih po verziji, ravno s parent_id; 'v' = verzija zadnjeg vraćenog
+    #       - created: komentar je nastao nakon v (samo tada klijent povećava reply_count roditelja;
+    #         like na odgovor koji klijent još nije učitao se preskače)
+    #         → ako je promjena više, klijent ih dobiva u sljedećim pollovima ('more': true)
     #    
-    #    👤 Like-ovi:
-    #       - Broj like-a prebrojava iz CommentLike modela
-    #       - 'liked' = True ako je request.user dao like (za UI button state)
+    #    ⚡ Performanse:
+    #       - Stranica: objava + top-level + odgovori + "liked by me" = 4 upita, neovisno o broju komentara
+    #       - Veličina odgovora ograničena (stranica × pregled odgovora), i za objavu s 50k komentara
+    #    
+    #    📝 Što se vraća (stranica):
+    #       - comments: top-level komentari, svaki s replies (prvih N) i reply_count (svi izravni)
+    #       - next: cursor sljedeće stranice ili null
+    #       - v: cursor za inkrementalni polling
     #    
-    # 🔌 Dinamički import za izbježivanje kružnih uvoza
-    from Interactions.models import CommentLike
-
-    # 📌 Pronađi objavu po UUID-u
     post = get_object_or_404(PostModel, uuid_field=id)
 
-    # 📝 Dohvati sve top-level komentare (parent=None), sortirane po vremenu
-    qs = CommentModel.objects.filter(post=post, parent__isnull=True).order_by('created_at')
-    comments = []
-    
-    for c in qs:
-        # 👶 Dohvati sve replies (odgovore) na ovaj top-level komentar
-        replies = []
-        for r in c.replies.all().order_by('created_at'):
-            # ❤️ Prebrojaj like-e na reply
-            r_likes = CommentLike.objects.filter(comment=r).count()
-            r_user_liked = False
-            # 🔍 Provjeri je li request.user dao like na reply
-            if request.user.is_authenticated:
-                r_user_liked = CommentLike.objects.filter(comment=r, user=request.user).exists()
-            replies.append({
-                'id': r.id,
-                'author': r.author.username,
-                'author_uuid': str(r.author.user_uuid),
-                'content': r.content,
-                'created_at': r.created_at.strftime('%d.%m.%Y %H:%M') if r.created_at else '',
-                'likes': r_likes,
-                'liked': r_user_liked,
-                'parent_id': r.parent.id if r.parent else None
-            })
-
-        # ❤️ Prebrojaj like-e na top-level komentar
-        c_likes = CommentLike.objects.filter(comment=c).count()
-        c_user_liked = False
-        # 🔍 Provjeri je li request.user dao like
-        if request.user.is_authenticated:
-            c_user_liked = CommentLike.objects.filter(comment=c, user=request.user).exists()
-
-        comments.append({
-            'id': c.id,
-            'author': c.author.username,
-            'author_uuid': str(c.author.user_uuid),
-            'content': c.content,
-            'created_at': c.created_at.strftime('%d.%m.%Y %H:%M') if c.created_at else '',
-            'likes': c_likes,
-            'liked': c_user_liked,
-            'replies': replies  # 👶 Ugnježđeni odgovori
+    version = _int_param(request, 'v')
+    if version is not None:
+        # 🔄 Ništa se nije promijenilo od zadnjeg polla → 304 bez ijednog dodatnog upita
+        if version == post.comments_version:
+            return HttpResponseNotModified()
+
+        # 📤 Delta: svaka promjena (novi komentar ili like) povećava verziju → jedan cursor je dovoljan
+        limit = settings.COMMENTS_DELTA_LIMIT
+        rows = list(_annotated(CommentModel.objects.filter(post=post, version__gt=version)).order_by('version')[:limit + 1])
+        more = len(rows) > limit
+        rows = rows[:limit]
+        liked_ids = _liked_ids(request, rows)
+        comments = [
+            {**_serialize(c, liked_ids), 'parent_id': c.parent_id, 'created': c.created_version > version}
+            for c in rows
+        ]
+        return JsonResponse({
+            'comments': comments,
+            'v': rows[-1].version if more else post.comments_version,
+            'more': more,
         })
 
-    return JsonResponse({'comments': comments})
+    # 📄 Stranica top-level komentara (najstariji prvi, isto kao ORDER BY path; ili top po like-ovima)
+    #    📎 Kod 'top' se like-ovi mijenjaju između stranica → komentar može preskočiti granicu stranice
+    #       (klijent spaja po id-u, duplikati su bezopasni)
+    order = request.GET.get('order')
+    ordering = COMMENT_ORDERINGS.get(order, COMMENT_ORDERINGS['oldest'])
+    roots = _annotated(CommentModel.objects.filter(post=post, parent__isnull=True))
+    page = KeysetPaginator(roots, settings.COMMENTS_PAGE_SIZE, ordering=ordering).get_page(request.GET.get('cursor'))
+
+    # 👶 Prvih N izravnih odgovora svakog komentara na stranici (jedan upit)
+    children = []
+    if page.object_list:
+        children = list(
+            _annotated(CommentModel.objects.filter(parent_id__in=[c.id for c in page]))
+            .annotate(position=Window(RowNumber(), partition_by=[F('parent_id')], order_by=F('path').asc()))
+            .filter(position__lte=settings.COMMENT_REPLIES_PREVIEW)
+            .order_by('path')
+        )
+
+    rows = list(page) + children
+    comments = build_tree(rows, _liked_ids(request, rows))
+    return JsonResponse({'comments': comments, 'next': page.next_cursor, 'v': post.comments_version})
+
+
+@require_http_methods(["GET"])
+def replies(request, comment_id):
+    # 🔹 replies() - Stranica izravnih odgovora jednog komentara (za "Prikaži odgovore")
+    #    
+    #    📝 Parametri: cursor (iz 'next' prethodne stranice)
+    #    📤 Vraća: {'replies': [...], 'next': cursor ili null}; svaki odgovor ima reply_count
+    #           → dublje razine se otvaraju istim endpointom
+    #    ⚡ Upiti: komentar + stranica + "liked by me" = 3, neovisno o broju odgovora
+    #       - Stranica = raspon podstabla (subtree) po indeksu (post, path), samo prva razina ispod
+    #         komentara; keyset po path-u (braća po path-u = po id-u, isto kao ORDER BY path u get())
+    #    
+    comment = get_object_or_404(CommentModel.objects.only('id', 'post_id', 'path'), pk=comment_id)
+    rows = _annotated(subtree(comment).filter(parent_id=comment.id))
+    page = KeysetPaginator(rows, settings.COMMENTS_PAGE_SIZE, ordering=("path",)).get_page(request.GET.get('cursor'))
+    liked_ids = _liked_ids(request, page.object_list)
+    data = [{**_serialize(c, liked_ids), 'parent_id': comment.id} for c in page]
+    return JsonResponse({'replies': data, 'next': page.next_cursor})
 
 
 @require_http_methods(["POST"])
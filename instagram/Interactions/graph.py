@@ -0,0 +1,277 @@
+# 🇭🇷 Interactions/graph.py - Follow graf u memoriji (CSR) za "Predloženi za tebe"
+# ========================================================================================================
+# Svrha: Prijedlozi računa "iz druge razine" (prate ih ljudi koje ti pratiš), poredani po broju
+#        zajedničkih veza - bez SQL self-joina Follow × Follow pri svakom zahtjevu
+#
+# 📦 Struktura (CSR - compressed sparse row, modul array → kompaktni C nizovi, bez Python objekata):
+#   - offsets[u] .. offsets[u + 1]: raspon u targets s ID-evima korisnika koje u prati (sortirano)
+#   - targets: svi "following" ID-evi redom po pratitelju (4 bajta po vezi)
+#   - indegree[v]: broj follower-a (za redoslijed kod istog broja zajedničkih i za hladni start)
+#   → 10M veza ≈ 40 MB + 12 B po korisniku
+#
+# 💼 Kako radi:
+#   - Učitavanje: jedan prolaz po indeksu (follower, following) - redovi već dolaze sortirani
+#   - Promjene (toggle_follow, nakon commit-a): overlay skupovi dodanih / uklonjenih veza po korisniku
+#     → CSR se ne prepisuje; nakon SUGGESTIONS_GRAPH_MAX_AGE s ili SUGGESTIONS_GRAPH_MAX_CHANGES promjena
+#       graf se ponovno učita iz baze u pozadinskom threadu (follow-ovi drugih workera, compaction)
+#   - suggest(u): za svakog koga u prati, Counter.update(njegov raspon targets) → brojanje radi C petlja
+#     nad memoryview-om (bez kopiranja); izbaci u i one koje već prati; heapq.nlargest(limit)
+#
+# ⚠️ Čvorovi su primarni ključevi korisnika (gusti niz do najvećeg pk-a)
+# ========================================================================================================
+
+import bisect
+import heapq
+import logging
+import threading
+import time
+from array import array
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max
+
+
+logger = logging.getLogger(__name__)
+
+POPULAR_SIZE = 100  # 🔥 Koliko najpraćenijih korisnika se pamti za hladni start
+
+
+class FollowGraph:
+    # 🔹 FollowGraph - Nepromjenjivi CSR + mali overlay promjena od učitavanja
+    #
+    #    📝 Primjer:
+    #       graph = FollowGraph.from_database()
+    #       graph.apply(follower_id, following_id, added=True)
+    #       graph.suggest(user_id, limit=20) → [(user_id, broj_zajedničkih), ...]
+    #
+    def __init__(self, offsets, targets, indegree):
+        self.offsets = offsets
+        self.targets = targets
+        self.indegree = indegree
+        self.built_at = time.monotonic()
+        self.changes = 0
+        self._added = {}    # follower → {following, ...} (nije u CSR-u)
+        self._removed = {}  # follower → {following, ...} (u CSR-u, ali obrisano)
+        self._lock = threading.Lock()
+        self._popular = heapq.nlargest(POPULAR_SIZE, range(len(indegree)), key=indegree.__getitem__)
+
+    @classmethod
+    def from_edges(cls, edges, max_id=0):
+        # 🔹 from_edges() - CSR iz (follower, following) parova SORTIRANIH po follower-u
+        #    📎 max_id je samo početna veličina - veći ID-evi (novi korisnici) proširuju nizove
+        offsets = array("q", bytes(8 * (max_id + 2)))
+        indegree = array("i", bytes(4 * (max_id + 1)))
+        targets = array("i")
+        append = targets.append
+        size = len(indegree)
+        for follower_id, following_id in edges:
+            if follower_id >= size or following_id >= size:
+                grow = max(follower_id, following_id) + 1 - size
+                offsets.extend(array("q", bytes(8 * grow)))
+                indegree.extend(array("i", bytes(4 * grow)))
+                size += grow
+            append(following_id)
+            offsets[follower_id + 1] += 1
+            indegree[following_id] += 1
+
+        # ➕ Brojevi po čvoru → početni indeksi (prefiksna suma)
+        running = 0
+        for node in range(len(offsets)):
+            running += offsets[node]
+            offsets[node] = running
+        return cls(offsets, targets, indegree)
+
+    @classmethod
+    def from_database(cls, chunk_size=20000):
+        # 🔹 from_database() - Učita sve Follow redove (indeks follower, following → već sortirano)
+        from Users.models import User
+        from .models import Follow
+
+        max_id = User.objects.aggregate(top=Max("pk"))["top"] or 0
+        edges = (
+            Follow.objects.order_by("follower_id", "following_id")
+            .values_list("follower_id", "following_id")
+            .iterator(chunk_size=chunk_size)
+        )
+        return cls.from_edges(edges, max_id)
+
+    # ---------------------------------------------------------------- susjedi
+
+    def _base(self, user_id):
+        # 🔹 _base() - Raspon CSR-a za korisnika (memoryview, bez kopiranja)
+        if user_id + 1 >= len(self.offsets):
+            return memoryview(self.targets)[0:0]
+        return memoryview(self.targets)[self.offsets[user_id]:self.offsets[user_id + 1]]
+
+    def _in_base(self, user_id, following_id):
+        if user_id + 1 >= len(self.offsets):
+            return False
+        start, end = self.offsets[user_id], self.offsets[user_id + 1]
+        position = bisect.bisect_left(self.targets, following_id, start, end)
+        return position < end and self.targets[position] == following_id
+
+    def following(self, user_id):
+        # 🔹 following() - Koga korisnik prati: CSR raspon ± overlay (pozivati pod self._lock)
+        base = self._base(user_id)
+        removed = self._removed.get(user_id)
+        added = self._added.get(user_id)
+        if not removed and not added:
+            return base
+        items = [v for v in base if v not in removed] if removed else list(base)
+        if added:
+            items.extend(added)
+        return items
+
+    def follower_count(self, user_id):
+        # 📎 Samo CSR (bez overlaya) - koristi se za redoslijed, ne za prikaz
+        return self.indegree[user_id] if user_id < len(self.indegree) else 0
+
+    # ---------------------------------------------------------------- promjene
+
+    def apply(self, follower_id, following_id, added):
+        # 🔹 apply() - Jedna follow / unfollow promjena (idempotentno: ponavljanje ne mijenja stanje)
+        with self._lock:
+            in_base = self._in_base(follower_id, following_id)
+            if added:
+                if in_base:
+                    self._discard(self._removed, follower_id, following_id)
+                else:
+                    self._added.setdefault(follower_id, set()).add(following_id)
+            else:
+                if in_base:
+                    self._removed.setdefault(follower_id, set()).add(following_id)
+                else:
+                    self._discard(self._added, follower_id, following_id)
+            self.changes += 1
+
+    @staticmethod
+    def _discard(overlay, user_id, other_id):
+        others = overlay.get(user_id)
+        if others is not None:
+            others.discard(other_id)
+            if not others:
+                del overlay[user_id]
+
+    # ---------------------------------------------------------------- prijedlozi
+
+    def suggest(self, user_id, limit=None, max_sources=None):
+        # 🔹 suggest() - Korisnici "druge razine" poredani po broju zajedničkih veza
+        #
+        #    💼 Zajednički = koliko ljudi koje user_id prati prati kandidata
+        #       - Redoslijed: više zajedničkih, pa više follower-a (indegree)
+        #       - Korisnik koji nikog ne prati (ili nema kandidata) → najpraćeniji korisnici (mutual 0)
+        #       - max_sources: najviše toliko praćenih se obilazi (korisnici koji prate tisuće ljudi)
+        #
+        #    📤 Vraća: [(user_id, broj_zajedničkih), ...]
+        #
+        limit = settings.SUGGESTIONS_LIMIT if limit is None else limit
+        max_sources = settings.SUGGESTIONS_MAX_SOURCES if max_sources is None else max_sources
+
+        with self._lock:
+            followed = self.following(user_id)
+            counts = Counter()
+            for source in islice(followed, max_sources):
+                counts.update(self.following(source))
+            excluded = set(followed)
+
+        excluded.add(user_id)
+        for other_id in excluded:
+            counts.pop(other_id, None)
+
+        if counts:
+            ranked = heapq.nlargest(
+                limit, counts.items(), key=lambda item: (item[1], self.follower_count(item[0]), -item[0])
+            )
+            if len(ranked) >= limit:
+                return ranked
+        else:
+            ranked = []
+
+        # 🧊 Hladni start / premalo kandidata: dopuni najpraćenijima koje korisnik još ne prati
+        seen = excluded | {candidate for candidate, _ in ranked}
+        for candidate in self._popular:
+            if len(ranked) >= limit:
+                break
+            if candidate not in seen and self.follower_count(candidate):
+                ranked.append((candidate, 0))
+        return ranked
+
+    def nbytes(self):
+        # 🔹 nbytes() - Memorija CSR nizova (bez overlaya)
+        return sum(a.itemsize * len(a) for a in (self.offsets, self.targets, self.indegree))
+
+
+# ---------------------------------------------------------------- jedan graf po procesu
+
+_graph = None
+_reload_log = None   # Promjene zabilježene dok se novi graf učitava (ponove se na njemu)
+_state_lock = threading.Lock()
+
+
+def get_graph():
+    # 🔹 get_graph() - Graf ovog procesa; prvi poziv ga učita (sinkrono), zastarjeli se osvježi u pozadini
+    global _graph
+    with _state_lock:
+        graph = _graph
+    if graph is None:
+        graph = FollowGraph.from_database()
+        with _state_lock:
+            if _graph is None:
+                _graph = graph
+            graph = _graph
+    elif (
+        time.monotonic() - graph.built_at > settings.SUGGESTIONS_GRAPH_MAX_AGE
+        or graph.changes > settings.SUGGESTIONS_GRAPH_MAX_CHANGES
+    ):
+        _start_reload()
+    return graph
+
+
+def _start_reload():
+    global _reload_log
+    with _state_lock:
+        if _reload_log is not None:
+            return  # 🔁 Učitavanje je već u tijeku
+        _reload_log = []
+    threading.Thread(target=_reload, name="follow-graph-reload", daemon=True).start()
+
+
+def _reload():
+    # 🔹 _reload() - Novi graf iz baze; promjene za vrijeme učitavanja se ponove pa se grafovi zamijene
+    global _graph, _reload_log
+    try:
+        close_old_connections()
+        graph = FollowGraph.from_database()
+    except Exception:
+        logger.exception("Ponovno učitavanje follow grafa nije uspjelo - ostaje stari graf")
+        with _state_lock:
+            _reload_log = None
+        return
+    finally:
+        close_old_connections()
+
+    with _state_lock:
+        for change in _reload_log:
+            graph.apply(*change)
+        graph.changes = 0
+        _graph, _reload_log = graph, None
+
+
+def record_follow(follower_id, following_id, added):
+    # 🔹 record_follow() - Inkrementalna promjena iz toggle_follow (poziva se nakon commit-a)
+    #    📎 Graf koji još nije učitan se ne dira - učitat će se iz baze s ovom promjenom
+    with _state_lock:
+        if _graph is not None:
+            _graph.apply(follower_id, following_id, added)
+        if _reload_log is not None:
+            _reload_log.append((follower_id, following_id, added))
+
+
+def reset_graph():
+    # 🔹 reset_graph() - Zaboravi graf (testovi, benchmark)
+    global _graph, _reload_log
+    with _state_lock:
+        _graph, _reload_log = None, None
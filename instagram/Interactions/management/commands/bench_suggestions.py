@@ -0,0 +1,110 @@
+# 🇭🇷 Interactions/management/commands/bench_suggestions.py - Benchmark "Predloženi za tebe" (follow graf)
+# ========================================================================================================
+# Svrha: Koliko brzo FollowGraph.suggest() odgovara na velikom sintetičkom grafu (milijuni veza)
+#
+# Kako radi:
+#   1. Generira sintetički follow graf s power-law raspodjelom u memoriji (bez baze)
+#   2. Gradi CSR (Interactions/graph.py) i mjeri vrijeme izgradnje i memoriju
+#   3. Mjeri suggest() za nasumične korisnike (p50 / p95)
+#   4. Opcionalno (--sql-users N): isti prijedlozi naivnim SQL self-joinom Follow × Follow
+#      na privremenoj bazi s prvih N korisnika (prava db.sqlite3 se ne dira)
+#
+# 📝 Primjer:
+#   python manage.py bench_suggestions --users 100000 --follows 30 --sql-users 3000
+# ========================================================================================================
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from instagram.bench import Timer, power_law_sampler, throwaway_database
+from Interactions.graph import FollowGraph
+
+
+class Command(BaseCommand):
+    help = "Benchmark prijedloga računa: CSR follow graf u memoriji (i opcionalno naivni SQL self-join)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000)
+        parser.add_argument("--follows", type=int, default=30, help="Prosječan broj praćenja po korisniku")
+        parser.add_argument("--alpha", type=float, default=1.1, help="Eksponent power-law raspodjele popularnosti")
+        parser.add_argument("--queries", type=int, default=500)
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--sql-users", type=int, default=0, help="Usporedba sa SQL self-joinom (0 = preskoči)")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def _edges(self, options, rng, users):
+        # 👥 ID-evi 1..users; manji ID = popularniji; svaki korisnik prati ~options["follows"] ljudi
+        sample = power_law_sampler(range(1, users + 1), alpha=options["alpha"], rng=rng)
+        for follower_id in range(1, users + 1):
+            k = max(1, int(rng.expovariate(1 / options["follows"])))
+            for following_id in sorted(set(sample(k)) - {follower_id}):
+                yield follower_id, following_id
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        users = options["users"]
+
+        start = time.perf_counter()
+        graph = FollowGraph.from_edges(self._edges(options, rng, users), users)
+        build_s = time.perf_counter() - start
+        self.stdout.write(
+            f"Graf: {users} korisnika, {len(graph.targets)} follow veza, najpopularniji ima "
+            f"{graph.follower_count(graph._popular[0])} follower-a"
+        )
+        self.stdout.write(
+            f"Generiranje + CSR: {build_s:.1f}s, memorija {graph.nbytes() / 2 ** 20:.1f} MB"
+        )
+
+        readers = [rng.randint(1, users) for _ in range(options["queries"])]
+        timer = Timer()
+        for reader in readers:
+            with timer:
+                graph.suggest(reader, limit=options["limit"])
+        s = timer.summary()
+        self.stdout.write(f"suggest():  p50 {s['p50_ms']:.2f}ms  p95 {s['p95_ms']:.2f}ms  ({s['n']} upita)")
+
+        if options["sql_users"]:
+            self._sql(options, graph, readers)
+
+    def _sql(self, options, graph, readers):
+        # 🐢 Naivni friends-of-friends: Follow (ja → x) JOIN Follow (x → kandidat), GROUP BY kandidat
+        from Users.models import User
+        from Interactions.models import Follow
+
+        users = options["sql_users"]
+        readers = [reader % users + 1 for reader in readers[:50]]
+        with throwaway_database():
+            User.objects.bulk_create(
+                [User(id=i, username=f"bench{i}", email=f"bench{i}@bench.local", password="!")
+                 for i in range(1, users + 1)],
+                batch_size=1000,
+            )
+            Follow.objects.bulk_create(
+                [
+                    Follow(follower_id=follower_id, following_id=following_id)
+                    for follower_id in range(1, users + 1)
+                    for following_id in graph.following(follower_id)
+                    if following_id <= users
+                ],
+                batch_size=2000,
+            )
+
+            timer = Timer()
+            for reader in readers:
+                with timer:
+                    list(
+                        Follow.objects.filter(follower__followers_set__follower_id=reader)
+                        .exclude(following_id=reader)
+                        .exclude(following__followers_set__follower_id=reader)
+                        .values("following_id")
+                        .annotate(mutual=Count("id"))
+                        .order_by("-mutual")[:options["limit"]]
+                    )
+            s = timer.summary()
+            self.stdout.write(
+                f"SQL self-join ({users} korisnika, {Follow.objects.count()} veza):  "
+                f"p50 {s['p50_ms']:.2f}ms  p95 {s['p95_ms']:.2f}ms  ({s['n']} upita)"
+            )
@@ -0,0 +1,29 @@
+# 🇭🇷 Interactions/management/commands/flush_like_journal.py - Ručni flush write-behind journala like-ova
+# ========================================================================================================
+# Svrha: Upiše u bazu journale like-ova koje flusher nije stigao upisati
+#
+# Kada:
+#   - Nakon pada / gašenja servera (journali mrtvih procesa ostaju u LIKE_JOURNAL_DIR)
+#   - Prije isključivanja LIKE_WRITE_BEHIND (da se ništa ne izgubi)
+#   - Iz crona, kao osigurač
+#
+# Kako radi:
+#   - Preuzme journale procesa koji više ne rade (živi procesi flushaju sami) i upiše ih u jednoj
+#     transakciji, istim kodom kao i flusher (Interactions/writebehind.py)
+#   - Radi i kad je LIKE_WRITE_BEHIND isključen
+#
+# 📝 Primjer:
+#   python manage.py flush_like_journal
+# ========================================================================================================
+
+from django.core.management.base import BaseCommand
+
+from Interactions.writebehind import LikeBuffer
+
+
+class Command(BaseCommand):
+    help = "Upiše neflushane like-ove iz journala (LIKE_JOURNAL_DIR) u bazu"
+
+    def handle(self, *args, **options):
+        flushed = LikeBuffer(interval=0).flush()
+        self.stdout.write(f"Upisano {flushed} (korisnik, cilj) parova")
@@ -0,0 +1,80 @@
+# 🇭🇷 Interactions/management/commands/reconcile_counters.py - Popravak drifta denormaliziranih brojača
+# ========================================================================================================
+# Svrha: Usporedi denormalizirane brojače s pravim brojem redaka i popravi razlike
+#
+# Zašto drift uopće nastaje:
+#   - Kaskadno brisanje (npr. obrisan korisnik → obrisani njegovi like-ovi i follow-ovi) ne prolazi kroz view-e
+#   - Ručne izmjene u bazi / admin
+#
+# Kako radi:
+#   - Za svaki brojač: jedan upit nađe retke gdje se brojač razlikuje od COUNT-a
+#   - Popravak: UPDATE ... SET brojač = (SELECT COUNT(*) ...) samo za te retke, u batch-evima
+#     (vrijednost se računa u istom UPDATE-u → ne gazi paralelne toggle-ove novijim podacima)
+#
+# 📝 Primjer:
+#   python manage.py reconcile_counters            → popravi sve
+#   python manage.py reconcile_counters --dry-run  → samo ispiši koliko redaka ima drift
+# ========================================================================================================
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+# 📊 (model, polje brojača, model redaka koji se broje, FK na model)
+COUNTERS = [
+    ("Posts.PostModel", "likes_count", "Interactions.Like", "post"),
+    ("Posts.PostModel", "dislikes_count", "Interactions.Dislike", "post"),
+    ("Posts.PostModel", "comments_count", "Comments.CommentModel", "post"),
+    ("Comments.CommentModel", "likes", "Interactions.CommentLike", "comment"),
+    ("Users.User", "followers_count", "Interactions.Follow", "following"),
+    ("Users.User", "following_count", "Interactions.Follow", "follower"),
+]
+
+
+def _actual_count(related_model, fk):
+    rows = related_model.objects.filter(**{fk: OuterRef('pk')}).order_by().values(fk).annotate(n=Count('pk')).values('n')
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+class Command(BaseCommand):
+    help = "Usporedi denormalizirane brojače s pravim brojem redaka i popravi drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Samo prijavi drift, ne mijenjaj bazu")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = 0
+        for model_label, field, related_label, fk in COUNTERS:
+            model = apps.get_model(model_label)
+            related_model = apps.get_model(related_label)
+
+            drifted = (
+                model.objects.annotate(actual=_actual_count(related_model, fk))
+                .exclude(**{field: F('actual')})
+                .values_list('pk', flat=True)
+            )
+
+            fixed = 0
+            batch = []
+            for pk in drifted.iterator(chunk_size=options["batch_size"]):
+                batch.append(pk)
+                if len(batch) >= options["batch_size"]:
+                    fixed += self._fix(model, field, related_model, fk, batch, options["dry_run"])
+                    batch = []
+            if batch:
+                fixed += self._fix(model, field, related_model, fk, batch, options["dry_run"])
+
+            total += fixed
+            verb = "ima drift" if options["dry_run"] else "popravljeno"
+            self.stdout.write(f"{model_label}.{field}: {fixed} redaka {verb}")
+
+        self.stdout.write(self.style.SUCCESS(f"Ukupno: {total}"))
+
+    def _fix(self, model, field, related_model, fk, pks, dry_run):
+        if dry_run:
+            return len(pks)
+        model.objects.filter(pk__in=pks).update(**{field: _actual_count(related_model, fk)})
+        return len(pks)
@@ -1,3 +1,353 @@
-from django.test import TestCase
+import random
+import tempfile
+import threading
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from Users.models import User
+from Posts.models import PostModel
+from Comments.models import CommentModel
+from . import graph
+from .graph import FollowGraph
+from .models import CommentLike, Dislike, Follow, Like
+from .writebehind import LikeBuffer, get_buffer, reset_buffer
+
+
+class ToggleTests(TestCase):
+    # 🔹 Toggle-i rade samo pisanja (bez SELECT-a i COUNT(*)) i vraćaju brojače iz denormaliziranih polja
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+        self.reader = User.objects.create_user(username="citatelj", email="citatelj@example.com", password="lozinka")
+        self.post = PostModel.objects.create(title="Objava", content="Sadržaj", author=self.author)
+        self.client.force_login(self.reader)
+
+    def _post(self, url):
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _counts(self, user):
+        user.refresh_from_db()
+        return user.followers_count, user.following_count
+
+    def test_like_dislike_switch_keeps_counters(self):
+        url = f"/{self.post.uuid_field}"
+        self.assertEqual(self._post(f"{url}/like"), {"liked": True, "likes": 1, "dislikes": 0})
+        self.assertEqual(self._post(f"{url}/dislike"), {"disliked": True, "likes": 0, "dislikes": 1})
+        self.assertEqual(self._post(f"{url}/dislike"), {"disliked": False, "likes": 0, "dislikes": 0})
+        self.assertEqual(self._post(f"{url}/like"), {"liked": True, "likes": 1, "dislikes": 0})
+        self.assertEqual(self._post(f"{url}/like"), {"liked": False, "likes": 0, "dislikes": 0})
+        self.assertFalse(Like.objects.exists())
+        self.assertFalse(Dislike.objects.exists())
+
+    def _statements(self, url):
+        # 📊 SVI upiti zahtjeva, po vrsti: session + korisnik + objava/korisnik iz URL-a, pa
+        #    SAVEPOINT / RELEASE (transaction.atomic unutar TestCase transakcije) oko samog toggle-a
+        with CaptureQueriesContext(connection) as captured:
+            self._post(url)
+        self.assertFalse([q for q in captured.captured_queries if "COUNT(" in q["sql"].upper()])
+        return [q["sql"].split()[0] for q in captured.captured_queries]
+
+    def test_toggle_runs_two_statements(self):
+        lookups = ["SELECT", "SELECT", "SELECT", "SAVEPOINT"]
+        url = f"/{self.post.uuid_field}"
+        self.assertEqual(self._statements(f"{url}/like"), [*lookups, "UPDATE", "INSERT", "RELEASE"])
+        self.assertEqual(self._statements(f"{url}/like"), [*lookups, "UPDATE", "DELETE", "RELEASE"])
+        self.assertEqual(self._statements(f"{url}/dislike"), [*lookups, "UPDATE", "INSERT", "RELEASE"])
+        # ⚠️ Dislike → like piše u dvije tablice (INSERT like + DELETE dislike) → jedan upit više
+        self.assertEqual(self._statements(f"{url}/like"), [*lookups, "UPDATE", "INSERT", "DELETE", "RELEASE"])
+
+        # 👥 Follow: jedan UPDATE za oba korisnika + INSERT; backfill feeda dodaje SELECT objava + INSERT
+        url = f"/users/profile/{self.author.user_uuid}/follow"
+        self.assertEqual(self._statements(url), [*lookups, "UPDATE", "INSERT", "SELECT", "INSERT", "RELEASE"])
+        self.assertEqual(self._statements(url), [*lookups, "UPDATE", "DELETE", "DELETE", "RELEASE"])
+        self.assertEqual((self._counts(self.author), self._counts(self.reader)), ((0, 0), (0, 0)))
+
+    @mock.patch.object(connection, "vendor", "postgresql")
+    def test_toggle_without_sqlite_decides_by_written_rows(self):
+        # 🐘 Ostale baze: INSERT koji preskače postojeći red / DELETE, pa UPDATE brojača po retku (redoslijed pk)
+        url = f"/{self.post.uuid_field}"
+        self.assertEqual(self._post(f"{url}/dislike"), {"disliked": True, "likes": 0, "dislikes": 1})
+        self.assertEqual(self._post(f"{url}/like"), {"liked": True, "likes": 1, "dislikes": 0})
+        self.assertEqual(self._post(f"{url}/like"), {"liked": False, "likes": 0, "dislikes": 0})
+        self.assertFalse(Like.objects.exists() or Dislike.objects.exists())
+
+        url = f"/users/profile/{self.author.user_uuid}/follow"
+        statements = self._statements(url)
+        self.assertEqual(statements[4:7], ["INSERT", "UPDATE", "UPDATE"])
+        self.assertEqual((self._counts(self.author), self._counts(self.reader)), ((1, 0), (0, 1)))
+        self.assertEqual(self._post(url), {"following": False, "followers": 0, "following_count": 0})
+        self.assertEqual(self._counts(self.reader), (0, 0))
+
+    def test_comment_like_and_follow_toggle(self):
+        comment = CommentModel.objects.create(author=self.author, post=self.post, content="komentar")
+        self.assertEqual(self._post(f"/comment/{comment.pk}/like"), {"liked": True, "likes": 1})
+        self.assertEqual(self._post(f"/comment/{comment.pk}/like"), {"liked": False, "likes": 0})
+        self.assertFalse(CommentLike.objects.exists())
+
+        url = f"/users/profile/{self.author.user_uuid}/follow"
+        self.assertTrue(self._post(url)["following"])
+        self.assertFalse(self._post(url)["following"])
+        self.assertFalse(Follow.objects.exists())
+
+
+class FollowCounterTests(TestCase):
+    # 🔹 User.followers_count / following_count prate Follow redove bez COUNT(*) pri čitanju
+
+    def setUp(self):
+        self.me = User.objects.create_user(username="ja", email="ja@example.com", password="lozinka")
+        self.other = User.objects.create_user(username="drugi", email="drugi@example.com", password="lozinka")
+        self.client.force_login(self.me)
+
+    def _counts(self, user):
+        user.refresh_from_db()
+        return user.followers_count, user.following_count
+
+    def test_toggle_moves_both_counters(self):
+        url = f"/users/profile/{self.other.user_uuid}/follow"
+        self.assertEqual(self.client.post(url).json(), {"following": True, "followers": 1, "following_count": 0})
+        self.assertEqual((self._counts(self.me), self._counts(self.other)), ((0, 1), (1, 0)))
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(f"/users/profile/{self.other.user_uuid}/")
+        self.assertEqual((response.context["followers_count"], response.context["following_count"]), (1, 0))
+        self.assertFalse([q for q in captured.captured_queries if "COUNT(" in q["sql"].upper()])
+
+        self.assertEqual(self.client.post(url).json(), {"following": False, "followers": 0, "following_count": 0})
+        self.assertEqual((self._counts(self.me), self._counts(self.other)), ((0, 0), (0, 0)))
+
+    def test_reconcile_repairs_drift_after_cascade(self):
+        third = User.objects.create_user(username="treci", email="treci@example.com", password="lozinka")
+        self.client.post(f"/users/profile/{self.other.user_uuid}/follow")
+        self.client.force_login(third)
+        self.client.post(f"/users/profile/{self.other.user_uuid}/follow")
+        self.assertEqual(self._counts(self.other), (2, 0))
+
+        third.delete()  # 🗑️ Kaskadno briše Follow red mimo toggle_follow
+        self.assertEqual(self._counts(self.other), (2, 0))
+        call_command("reconcile_counters", stdout=StringIO())
+        self.assertEqual(self._counts(self.other), (1, 0))
+
+
+class ConcurrentToggleTests(TransactionTestCase):
+    # 🔹 Mnogo threadova istovremeno klika like/dislike na istu objavu:
+    #    nijedan zahtjev ne smije pasti (IntegrityError → 500), brojači moraju odgovarati redovima
+
+    USERS = 6
+    CLIENTS_PER_USER = 2  # 🖱️ Dvoklik / dva taba istog korisnika
+    CLICKS = 15
+
+    def setUp(self):
+        author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+        self.post = PostModel.objects.create(title="Objava", content="Sadržaj", author=author)
+        self.users = [
+            User.objects.create_user(username=f"klik{i}", email=f"klik{i}@example.com", password="lozinka")
+            for i in range(self.USERS)
+        ]
+
+    def _hammer(self, client, seed, start, statuses):
+        rng = random.Random(seed)
+        start.wait()
+        try:
+            for _ in range(self.CLICKS):
+                action = rng.choice(("like", "dislike"))
+                statuses.append(client.post(f"/{self.post.uuid_field}/{action}").status_code)
+        finally:
+            connection.close()  # 🔌 Svaki thread ima svoju konekciju
+
+    def test_hammering_one_post_keeps_counters_exact(self):
+        clients = []
+        for user in self.users:
+            for _ in range(self.CLIENTS_PER_USER):
+                client = Client()
+                client.force_login(user)
+                clients.append(client)
+
+        start = threading.Barrier(len(clients))
+        statuses = []
+        threads = [
+            threading.Thread(target=self._hammer, args=(client, seed, start, statuses))
+            for seed, client in enumerate(clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses, [200] * len(clients) * self.CLICKS)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, Like.objects.filter(post=self.post).count())
+        self.assertEqual(self.post.dislikes_count, Dislike.objects.filter(post=self.post).count())
+        both = Like.objects.filter(post=self.post, user__dislike__post=self.post)
+        self.assertFalse(both.exists())
+
+
+class WriteBehindTests(TestCase):
+    # 🔹 LIKE_WRITE_BEHIND: toggle-i idu u journal, baza se mijenja tek u flush(); čitanja vide neflushano
+
+    def setUp(self):
+        journal_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(journal_dir.cleanup)
+        self.journal_dir = Path(journal_dir.name)
+        settings_override = override_settings(
+            LIKE_WRITE_BEHIND=True, LIKE_JOURNAL_DIR=self.journal_dir, LIKE_FLUSH_INTERVAL=0, LIKE_JOURNAL_FSYNC=False,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_buffer()
+        self.addCleanup(reset_buffer)
+
+        self.author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+        self.reader = User.objects.create_user(username="citatelj", email="citatelj@example.com", password="lozinka")
+        self.post = PostModel.objects.create(title="Objava", content="Sadržaj", author=self.author)
+        self.client.force_login(self.reader)
+
+    def _toggle(self, action):
+        return self.client.post(f"/{self.post.uuid_field}/{action}").json()
+
+    def test_like_is_visible_before_flush(self):
+        self.assertEqual(self._toggle("like"), {"liked": True, "likes": 1, "dislikes": 0})
+        self.assertFalse(Like.objects.exists())
+
+        response = self.client.get(f"/{self.post.uuid_field}/")
+        self.assertTrue(response.context["user_liked"])
+        self.assertEqual(response.context["likes_count"], 1)
+
+        self.assertEqual(get_buffer().flush(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+        self.assertTrue(Like.objects.filter(user=self.reader, post=self.post).exists())
+        self.assertEqual(get_buffer().pending_count(), 0)
+
+    def test_flush_coalesces_per_user_and_target(self):
+        self._toggle("like")
+        self._toggle("like")
+        self._toggle("like")
+        self.assertEqual(self._toggle("dislike"), {"disliked": True, "likes": 0, "dislikes": 1})
+
+        other = Client()
+        other.force_login(self.author)
+        other.post(f"/{self.post.uuid_field}/like")
+
+        with CaptureQueriesContext(connection) as captured:
+            get_buffer().flush()
+        counter_updates = [q for q in captured.captured_queries if q["sql"].startswith('UPDATE "Post"')]
+        self.assertEqual(len(counter_updates), 1)
+
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.dislikes_count), (1, 1))
+        self.assertEqual(list(Like.objects.values_list("user_id", flat=True)), [self.author.pk])
+        self.assertEqual(list(Dislike.objects.values_list("user_id", flat=True)), [self.reader.pk])
+
+        # ↩️ Poništavanje nakon flusha briše redak iz baze
+        self.assertEqual(self._toggle("dislike"), {"disliked": False, "likes": 1, "dislikes": 0})
+        get_buffer().flush()
+        self.assertFalse(Dislike.objects.exists())
+
+    def test_comment_likes_overlay_comment_list(self):
+        comment = CommentModel.objects.create(author=self.author, post=self.post, content="komentar")
+        self.assertEqual(self.client.post(f"/comment/{comment.pk}/like").json(), {"liked": True, "likes": 1})
+
+        data = self.client.get(f"/{self.post.uuid_field}/comment/get").json()
+        self.assertEqual((data["comments"][0]["likes"], data["comments"][0]["liked"]), (1, True))
+        self.assertFalse(CommentLike.objects.exists())
+
+        get_buffer().flush()
+        comment.refresh_from_db()
+        self.assertEqual(comment.likes, 1)
+        self.assertGreater(comment.version, 0)
+
+    def test_journal_survives_process_restart(self):
+        self._toggle("like")
+        comment = CommentModel.objects.create(author=self.author, post=self.post, content="komentar")
+        self.client.post(f"/comment/{comment.pk}/like")
+        # 💥 Prekinut upis zadnjeg retka prije pada
+        with open(next(self.journal_dir.iterdir()), "a", encoding="utf-8") as journal:
+            journal.write('{"k": "post", "u"')
+        reset_buffer()
+
+        # 🔁 Novi proces (isti pid, kao restart kontejnera) preuzme stari journal
+        with self.assertLogs("Interactions.writebehind", "WARNING"):
+            self.assertEqual(LikeBuffer().flush(), 2)
+        self.post.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertEqual((self.post.likes_count, comment.likes), (1, 1))
+        self.assertEqual(list(self.journal_dir.iterdir()), [])
+
+    def test_forked_worker_gets_its_own_journal(self):
+        self._toggle("like")
+        parent = get_buffer()
+        self.addCleanup(parent._journal.close)
+        parent_journal = parent._journal_path().read_text()
+
+        # 🍴 Dijete nakon fork-a (gunicorn --preload): drugi pid, naslijeđena instanca
+        with mock.patch("Interactions.writebehind.os.getpid", return_value=parent.pid + 1):
+            parent._flush_quietly()  # 📎 Naslijeđeni atexit ne flusha roditeljev journal
+            child = get_buffer()
+            self.assertEqual(child.pid, parent.pid + 1)
+            self.assertEqual(child.pending_count(), 0)
+            self.assertEqual(self._toggle("dislike"), {"disliked": True, "likes": 0, "dislikes": 1})
+            self.assertIs(get_buffer(), child)
+
+        self.assertEqual(
+            sorted(path.name for path in self.journal_dir.iterdir()),
+            [f"likes-{parent.pid}.log", f"likes-{parent.pid + 1}.log"],
+        )
+        self.assertEqual(parent._journal_path().read_text(), parent_journal)
+        self.assertFalse(Like.objects.exists())
+
+
+class FollowGraphTests(TestCase):
+    # 🔹 CSR follow graf: prijedlozi po broju zajedničkih veza, inkrementalne promjene iz toggle_follow
+
+    def setUp(self):
+        graph.reset_graph()
+        self.addCleanup(graph.reset_graph)
+        self.users = [
+            User.objects.create_user(username=f"u{i}", email=f"u{i}@example.com", password="lozinka")
+            for i in range(6)
+        ]
+
+    def _follow(self, follower, following):
+        self.client.force_login(follower)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/users/profile/{following.user_uuid}/follow")
+
+    def test_from_edges_ranks_by_mutual_count(self):
+        #  1 → 2, 3, 4;  2 → 5, 6;  3 → 5, 1;  4 → 5, 6, 7
+        edges = [(1, 2), (1, 3), (1, 4), (2, 5), (2, 6), (3, 1), (3, 5), (4, 5), (4, 6), (4, 7)]
+        follow_graph = FollowGraph.from_edges(edges, max_id=4)  # 📎 ID-evi veći od max_id proširuju nizove
+        self.assertEqual(list(follow_graph.following(4)), [5, 6, 7])
+        self.assertEqual(follow_graph.follower_count(5), 3)
+        self.assertEqual(follow_graph.suggest(1, limit=3), [(5, 3), (6, 2), (7, 1)])  # bez sebe i već praćenih
+
+        follow_graph.apply(1, 5, added=True)
+        follow_graph.apply(1, 5, added=True)  # 🔁 Idempotentno
+        follow_graph.apply(1, 3, added=False)
+        self.assertEqual(sorted(follow_graph.following(1)), [2, 4, 5])
+        self.assertEqual(follow_graph.suggest(1, limit=3)[0], (6, 2))
+
+    def test_toggle_follow_updates_loaded_graph(self):
+        me, a, b, c = self.users[:4]
+        self._follow(a, c)
+        self._follow(b, c)
+        self.assertEqual(graph.get_graph().suggest(me.pk, limit=1), [(c.pk, 0)])  # 🧊 Hladni start
+
+        self._follow(me, a)
+        self._follow(me, b)
+        response = self.client.get("/users/suggested/?limit=5")
+        self.assertEqual(
+            response.json()["suggestions"][0],
+            {"username": c.username, "uuid": str(c.user_uuid), "mutual": 2, "followers": 2},
+        )
+
+        self._follow(me, c)  # ✅ Sad ga prati → više nije prijedlog
+        self.assertNotIn(c.pk, [pk for pk, _ in graph.get_graph().suggest(me.pk)])
+        self.assertEqual(self.client.get("/users/suggested/?limit=x").status_code, 400)
@@ -6,12 +6,14 @@
 #   - toggle_dislike(): Dislike/undislike objavu
 #   - toggle_comment_like(): Like/unlike komentar
 #   - toggle_follow(): Follow/unfollow korisnika
+#   - suggested_users(): "Predloženi za tebe" (follow graf u memoriji)
 #
 # 📝 Rute:
 #   - POST /posts/<id>/like → Toggle like na objavu (JSON)
 #   - POST /posts/<id>/dislike → Toggle dislike na objavu (JSON)
 #   - POST /posts/comment/<id>/like → Toggle like na komentar (JSON)
 #   - POST /users/<uuid>/follow → Toggle follow korisnika (JSON)
+#   - GET /users/suggested/ → Prijedlozi računa za praćenje (JSON)
 #
 # 📊 Like/Dislike logika:
 #   - Like i Dislike su međusobno isključivi (ne možeš oba istovremeno)
@@ -23,16 +25,30 @@
 #   - Klik na follow → Kreira ili briše Follow objekt
 #   - Sprječava self-follow
 #
+# ⚡ Toggle bez čitanja (instagram/atomic.py):
+#   - toggle(): UPDATE brojača ... RETURNING odluči smjer (EXISTS po unique indeksu) → INSERT ili DELETE reda
+#     → 2 upita na SQLite-u (3 kad like briše dislike i obrnuto)
+#   - Nema zasebnog SELECT-a ni COUNT(*); istovremeni klikovi (dvoklik, više tabova) ne dižu IntegrityError
+#     i brojači ostaju točni
+#   - settings.LIKE_WRITE_BEHIND: like / dislike / like komentara idu u journal (Interactions/writebehind.py),
+#     u bazu ih skupno upisuje flusher; odgovor već uključuje neflushano stanje
+#
 # 🔒 Sigurnost: @login_required, @require_http_methods za POST
 # ========================================================================================================
 
+from functools import partial
+
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 
+from instagram.atomic import toggle
 from Posts.models import PostModel
 from .models import Like, Dislike, CommentLike, Follow
+from . import graph, writebehind
 
 
 @require_http_methods(["POST"])
@@ -40,36 +56,35 @@ from .models import Like, Dislike, CommentLike, Follow
 def toggle_like(request, id):
     # 🔹 toggle_like() - Toggle like na objavu
     #    
-    #    💼 Kako radi:
-    #       1. Ako korisnik ima dislike na ovu objavu → Obriši dislike
-    #       2. Ako korisnik ima like → Obriši ga (unlike)
-    #       3. Ako korisnik nema like → Kreiraj ga (like)
+    #    💼 Kako radi (jedna transakcija, instagram/atomic.toggle):
+    #       1. UPDATE brojača objave ... RETURNING: like postoji → likes_count - 1, inače likes_count + 1
+    #          (i dislikes_count - 1 ako je postojao dislike - međusobno isključivi)
+    #       2a. Like nije postojao → INSERT like-a (+ DELETE dislike-a ako je postojao)
+    #       2b. Like je postojao (unlike) → DELETE like-a
+    #    
+    #    ⚡ Upiti (SQLite): 2 pisanja; 3 kad like zamjenjuje dislike (SQLite ne piše u dvije tablice
+    #       jednim upitom); bez zasebnog čitanja
     #    
     #    📊 Vraćeni podaci:
     #       - liked: True/False (je li korisnik dao like)
-    #       - likes: Broj like-a na objavu
-    #       - dislikes: Broj dislike-a na objavu
+    #       - likes: Broj like-a na objavu (iz PostModel.likes_count)
+    #       - dislikes: Broj dislike-a na objavu (iz PostModel.dislikes_count)
     #    
     post = get_object_or_404(PostModel, uuid_field=id)
 
-    # ❌ Ako korisnik ima dislike, obriši ga (like i dislike su međusobno isključivi)
-    from .models import Dislike, CommentLike
-    Dislike.objects.filter(user=request.user, post=post).delete()
-
-    # ✅ Toggle like
-    existing = Like.objects.filter(user=request.user, post=post).first()
-    if existing:
-        # 👎 Korisnik već ima like → Obriši ga (unlike)
-        existing.delete()
-        liked = False
-    else:
-        # 👍 Korisnik nema like → Kreiraj ga
-        Like.objects.create(user=request.user, post=post)
-        liked = True
-
-    # 📊 Prebrojaj like-e i dislike-e na objavu
-    likes_count = Like.objects.filter(post=post).count()
-    dislikes_count = Dislike.objects.filter(post=post).count()
+    buffer = writebehind.get_buffer()
+    if buffer is not None:
+        # ⏳ Write-behind: zapis u journal, baza se mijenja u sljedećem flushu
+        state, likes_count, dislikes_count = buffer.toggle_post(request.user.pk, post.pk, writebehind.LIKE)
+        return JsonResponse({'liked': state == writebehind.LIKE, 'likes': likes_count, 'dislikes': dislikes_count})
+
+    with transaction.atomic():
+        # 👍 Like ↔ unlike; ❌ dislike se briše pri like-u (međusobno isključivi)
+        liked, counters = toggle(
+            Like, {'user': request.user, 'post': post}, PostModel, {post.pk: 'likes_count'},
+            returning=('likes_count', 'dislikes_count'), exclusive=(Dislike, 'dislikes_count'),
+        )
+        likes_count, dislikes_count = counters[post.pk]
 
     return JsonResponse({'liked': liked, 'likes': likes_count, 'dislikes': dislikes_count})
 
@@ -79,35 +94,31 @@ def toggle_like(request, id):
 def toggle_dislike(request, id):
     # 🔹 toggle_dislike() - Toggle dislike na objavu
     #    
-    #    💼 Kako radi:
-    #       1. Ako korisnik ima like na ovu objavu → Obriši like
-    #       2. Ako korisnik ima dislike → Obriši ga (undislike)
-    #       3. Ako korisnik nema dislike → Kreiraj ga (dislike)
+    #    💼 Kako radi (jedna transakcija, zrcalno toggle_like):
+    #       1. UPDATE brojača objave ... RETURNING (dislike postoji → -1, inače +1 i like se oduzme)
+    #       2a. Dislike nije postojao → INSERT dislike-a (+ DELETE like-a ako je postojao)
+    #       2b. Dislike je postojao (undislike) → DELETE dislike-a
     #    
     #    📊 Vraćeni podaci:
     #       - disliked: True/False (je li korisnik dao dislike)
-    #       - likes: Broj like-a na objavu
-    #       - dislikes: Broj dislike-a na objavu
+    #       - likes: Broj like-a na objavu (iz PostModel.likes_count)
+    #       - dislikes: Broj dislike-a na objavu (iz PostModel.dislikes_count)
     #    
     post = get_object_or_404(PostModel, uuid_field=id)
 
-    # ❌ Ako korisnik ima like, obriši ga (dislike i like su međusobno isključivi)
-    Like.objects.filter(user=request.user, post=post).delete()
-
-    # 👎 Toggle dislike
-    existing = Dislike.objects.filter(user=request.user, post=post).first()
-    if existing:
-        # Korisnik već ima dislike → Obriši ga (undislike)
-        existing.delete()
-        disliked = False
-    else:
-        # Korisnik nema dislike → Kreiraj ga
-        Dislike.objects.create(user=request.user, post=post)
-        disliked = True
+    buffer = writebehind.get_buffer()
+    if buffer is not None:
+        # ⏳ Write-behind: zapis u journal, baza se mijenja u sljedećem flushu
+        state, likes_count, dislikes_count = buffer.toggle_post(request.user.pk, post.pk, writebehind.DISLIKE)
+        return JsonResponse({'disliked': state == writebehind.DISLIKE, 'likes': likes_count, 'dislikes': dislikes_count})
 
-    # 📊 Prebrojaj like-e i dislike-e na objavu
-    likes_count = Like.objects.filter(post=post).count()
-    dislikes_count = Dislike.objects.filter(post=post).count()
+    with transaction.atomic():
+        # 👎 Dislike ↔ undislike; ❌ like se briše pri dislike-u (međusobno isključivi)
+        disliked, counters = toggle(
+            Dislike, {'user': request.user, 'post': post}, PostModel, {post.pk: 'dislikes_count'},
+            returning=('likes_count', 'dislikes_count'), exclusive=(Like, 'likes_count'),
+        )
+        likes_count, dislikes_count = counters[post.pk]
 
     return JsonResponse({'disliked': disliked, 'likes': likes_count, 'dislikes': dislikes_count})
 
@@ -119,30 +130,32 @@ def toggle_comment_like(request, comment_id):
     #    
     #    💼 Kako radi:
     #       1. Pronađi komentar po ID-u
-    #       2. Ako korisnik ima like na komentar → Obriši ga
-    #       3. Ako korisnik nema like → Kreiraj ga
+    #       2. Povećaj verziju komentara i toggle like-a (instagram/atomic.toggle): UPDATE
+    #          CommentModel.likes ... RETURNING, pa INSERT ili DELETE like-a (ista transakcija)
     #    
     #    📊 Vraćeni podaci:
     #       - liked: True/False (je li korisnik dao like)
-    #       - likes: Broj like-a na komentar
+    #       - likes: Broj like-a na komentar (iz CommentModel.likes)
     #    
     # 🔌 Dinamički import za izbježivanje kružnih uvoza
-    from Comments.models import CommentModel
+    from Comments.models import CommentModel, bump_comments_version
     comment = get_object_or_404(CommentModel, id=comment_id)
 
-    # ✅ Toggle like
-    existing = CommentLike.objects.filter(user=request.user, comment=comment).first()
-    if existing:
-        # Korisnik već ima like → Obriši ga
-        existing.delete()
-        liked = False
-    else:
-        # Korisnik nema like → Kreiraj ga
-        CommentLike.objects.create(user=request.user, comment=comment)
-        liked = True
+    buffer = writebehind.get_buffer()
+    if buffer is not None:
+        # ⏳ Write-behind: zapis u journal; verzija komentara se povećava pri flushu
+        liked, likes_count = buffer.toggle_comment(request.user.pk, comment.pk)
+        return JsonResponse({'liked': liked, 'likes': likes_count})
 
-    # 📊 Prebrojaj like-e na komentar
-    likes_count = CommentLike.objects.filter(comment=comment).count()
+    with transaction.atomic():
+        # 📊 Atomski brojač (bez COUNT(*)) i oznaka da je komentar promijenjen
+        #    (inkrementalni polling komentara ga vraća u delti)
+        version = bump_comments_version(comment.post_id)
+        liked, counters = toggle(
+            CommentLike, {'user': request.user, 'comment': comment}, CommentModel, {comment.pk: 'likes'},
+            returning=('likes',), assign={'version': version},
+        )
+        likes_count, = counters[comment.pk]
 
     return JsonResponse({'liked': liked, 'likes': likes_count})
 
@@ -155,13 +168,19 @@ def toggle_follow(request, user_uuid):
     #    💼 Kako radi:
     #       1. Pronađi korisnika po UUID-u
     #       2. Sprječava self-follow (ne možeš pratiti sebe)
-    #       3. Ako korisnik već prati → Obriši follow
-    #       4. Ako korisnik ne prati → Kreiraj follow
+    #       3. Toggle follow-a (instagram/atomic.toggle): jedan UPDATE pomakne User.following_count
+    #          (trenutni) i User.followers_count (ciljani) ... RETURNING, pa INSERT ili DELETE follow-a
+    #       4. Ažuriraj home feed: follow → backfill, unfollow → prune
+    #          (+ repush ako je autor time pao na TIMELINE_FANOUT_THRESHOLD i više se ne pull-a)
+    #       5. Nakon commit-a: promjena u follow graf za prijedloge (Interactions/graph.py)
     #    
-    #    📊 Vraćeni podaci:
+    #    ⚡ Upiti (SQLite): 2 za sam follow; home feed dodaje svoje (backfill: SELECT objava + INSERT,
+    #       prune: DELETE; repush samo pri prelasku praga) - followers_count za backfill dolazi iz RETURNING-a
+    #    
+    #    📊 Vraćeni podaci (iz denormaliziranih brojača, bez COUNT(*)):
     #       - following: True/False (je li korisnik sada following)
     #       - followers: Broj follower-a na ciljanog korisnika
-    #       - following_count: Broj korisnika koje trenutni korisnik prati
+    #       - following_count: Broj korisnika koje ciljani korisnik prati
     #    
     # 🔌 Dinamički import za izbježivanje kružnih uvoza
     from Users.models import User as AppUser
@@ -171,19 +190,68 @@ def toggle_follow(request, user_uuid):
     if target == request.user:
         return JsonResponse({'error': 'Nije moguće pratiti sebe'}, status=400)
 
+    from Posts import timeline
+
     # ✅ Toggle follow
-    existing = Follow.objects.filter(follower=request.user, following=target).first()
-    if existing:
-        # Korisnik već prati → Obriši follow (unfollow)
-        existing.delete()
-        following = False
-    else:
-        # Korisnik ne prati → Kreiraj follow
-        Follow.objects.create(follower=request.user, following=target)
-        following = True
-
-    # 📊 Prebrojaj follower-e
-    followers_count = Follow.objects.filter(following=target).count()
-    following_count = Follow.objects.filter(follower=target).count()
+    with transaction.atomic():
+        # 📊 Brojači obje strane (User.followers_count / following_count) u istom UPDATE-u
+        following, counters = toggle(
+            Follow, {'follower': request.user, 'following': target}, AppUser,
+            {target.pk: 'followers_count', request.user.pk: 'following_count'},
+            returning=('followers_count', 'following_count'),
+        )
+        followers_count, following_count = counters[target.pk]
+
+        # 🕸️ Follow graf za prijedloge (Interactions/graph.py) - tek nakon commit-a
+        transaction.on_commit(partial(graph.record_follow, request.user.pk, target.pk, following))
+
+        # 🏠 Home feed: follow → zadnje objave autora, unfollow → makni autorove objave
+        #    (backfill po novom followers_count odlučuje je li autor popularan)
+        if following:
+            timeline.backfill(request.user, target, followers_count=followers_count)
+        else:
+            timeline.prune(request.user, target)
+            # 🔀 Autor upravo pao na prag → više se ne pull-a; objave iz vremena pull-a u feedove follower-a
+            if timeline.stopped_pulling(followers_count):
+                timeline.repush(target)
 
     return JsonResponse({'following': following, 'followers': followers_count, 'following_count': following_count})
+
+
+@require_http_methods(["GET"])
+@login_required
+def suggested_users(request):
+    # 🔹 suggested_users() - "Predloženi za tebe": računi koje prate ljudi koje ti pratiš
+    #    
+    #    💼 Kako radi:
+    #       1. Follow graf u memoriji procesa (Interactions/graph.py) → ID-evi + broj zajedničkih
+    #          (prvi zahtjev nakon pokretanja učitava graf iz baze)
+    #       2. Jedan upit za korisnike (in_bulk), redoslijed iz grafa
+    #    
+    #    📝 Parametri: limit (zadano SUGGESTIONS_LIMIT, najviše 100)
+    #    
+    #    📊 Vraćeni podaci:
+    #       - suggestions: [{username, uuid, mutual, followers}] - mutual = koliko ljudi koje pratiš
+    #         prati taj račun (0 = popularan račun, za korisnike koji još nikog ne prate)
+    #    
+    from Users.models import User as AppUser
+
+    try:
+        limit = min(max(int(request.GET.get('limit', settings.SUGGESTIONS_LIMIT)), 1), 100)
+    except ValueError:
+        return JsonResponse({'error': 'Neispravan limit'}, status=400)
+
+    ranked = graph.get_graph().suggest(request.user.pk, limit=limit)
+    users = AppUser.objects.only('username', 'user_uuid', 'followers_count').in_bulk([pk for pk, _ in ranked])
+
+    suggestions = [
+        {
+            'username': users[pk].username,
+            'uuid': str(users[pk].user_uuid),
+            'mutual': mutual,
+            'followers': users[pk].followers_count,
+        }
+        for pk, mutual in ranked
+        if pk in users  # 📎 Korisnik obrisan nakon učitavanja grafa
+    ]
+    return JsonResponse({'suggestions': suggestions})
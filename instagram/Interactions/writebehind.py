@@ -0,0 +1,496 @@
+# 🇭🇷 Interactions/writebehind.py - Write-behind buffer za like / dislike / like komentara
+# ========================================================================================================
+# Svrha: Viralna objava → tisuće like-ova u sekundi na ISTI redak (PostModel.likes_count).
+#        Umjesto INSERT + UPDATE brojača po kliku, toggle se zapiše u lokalni journal, a flusher ih
+#        skupno upiše: bulk_create / bulk delete + JEDAN UPDATE brojača po objavi / komentaru
+#
+# ⚙️ Uključivanje: settings.LIKE_WRITE_BEHIND = True (isključeno → toggle-i pišu izravno, kao prije)
+#
+# 💼 Kako radi:
+#   1. toggle_*(): trenutno stanje = neflushano stanje iz memorije ili (ako ga nema) baza → novo stanje
+#      se upiše u journal (append + fsync) i u memoriju; odgovor = baza + neflushane promjene
+#   2. Journal bilježi APSOLUTNO stanje ("korisnik U na objavi P: like / dislike / ništa"), ne klik
+#      → ponovno primjenjivanje istog journala ne mijenja rezultat (idempotentno)
+#   3. flush() (thread svakih LIKE_FLUSH_INTERVAL s, ili ranije kad se nakupi LIKE_FLUSH_MAX_PENDING):
+#      - zatvori trenutni journal (rename u segment) i otvori novi → toggle-i ne čekaju flush
+#      - spoji segmente po (korisnik, cilj) - zadnje stanje pobjeđuje (like, unlike, like = jedan like)
+#      - u JEDNOJ transakciji: razlika prema bazi → bulk_create / delete po pk / increment po cilju
+#      - segment se briše tek nakon commit-a
+#   4. Čitanja (detalj objave, komentari) preklapaju neflushano stanje → korisnik odmah vidi svoj like
+#
+# 💥 Pad procesa:
+#   - Sve što je vraćeno korisniku je već u journalu (fsync prije odgovora)
+#   - Journal mrtvog procesa (likes-<pid>*) preuzme prvi flush bilo kojeg procesa; vlastiti segmenti
+#     neuspjelog flusha ostaju na disku i idu u sljedeći flush
+#   - Ručno / iz crona: python manage.py flush_like_journal
+#
+# 🍴 Fork (gunicorn --preload): buffer pripada pid-u koji ga je napravio; dijete dobije novi buffer
+#    s vlastitim journalom (likes-<pid djeteta>.log), naslijeđeni se ne koristi i ne flusha
+#
+# ⚠️ Ograničenja:
+#   - Preklapanje vidi samo neflushano stanje OVOG procesa (više workera → drugi worker vidi like
+#     tek nakon flusha, najviše LIKE_FLUSH_INTERVAL kasnije)
+#   - Brojači u listama komentara su "best effort" - točno stanje je u bazi nakon flusha
+# ========================================================================================================
+
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Exists, OuterRef
+
+from instagram.atomic import increment
+
+
+logger = logging.getLogger(__name__)
+
+POST = "post"
+COMMENT = "comment"
+LIKE = "like"
+DISLIKE = "dislike"
+
+# 📎 Svi redovi ovih imena u LIKE_JOURNAL_DIR pripadaju bufferu; <pid> određuje vlasnika
+SEGMENT_NAME = re.compile(r"^likes-(?P<pid>\d+)(-\d+\.flushing|\.log)$")
+BATCH_SIZE = 500
+
+
+def _delta(old, new):
+    # 🔹 _delta() - Pomak (likes, dislikes) brojača za prijelaz stanja old → new
+    return (new == LIKE) - (old == LIKE), (new == DISLIKE) - (old == DISLIKE)
+
+
+def _add(deltas, target, likes, dislikes):
+    old_likes, old_dislikes = deltas.get(target, (0, 0))
+    deltas[target] = (old_likes + likes, old_dislikes + dislikes)
+
+
+def _chunks(items, size=BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class LikeBuffer:
+    # 🔹 LikeBuffer - Neflushana stanja (u memoriji) + journal (na disku) za jedan proces
+    #
+    #    📦 Stanje u memoriji:
+    #       - _active: (vrsta, korisnik, cilj) → LIKE / DISLIKE / None, od zadnjeg flusha
+    #       - _flushing: isto, za segment koji se upravo upisuje u bazu
+    #       - _deltas / _flushing_deltas: (vrsta, cilj) → (likes, dislikes) pomak brojača
+    #
+    #    🔁 _epoch: raste kad flush počne commit → čitanje čija je baza pročitana prije toga se ponavlja
+    #       (inače bi se neflushani pomak brojača zbrojio s već upisanim)
+    #
+    def __init__(self, directory=None, interval=None, fsync=None, max_pending=None):
+        self.directory = Path(directory if directory is not None else settings.LIKE_JOURNAL_DIR)
+        self.interval = interval if interval is not None else settings.LIKE_FLUSH_INTERVAL
+        self.fsync = fsync if fsync is not None else settings.LIKE_JOURNAL_FSYNC
+        self.max_pending = max_pending if max_pending is not None else settings.LIKE_FLUSH_MAX_PENDING
+        self.pid = os.getpid()
+
+        self._active, self._flushing = {}, {}
+        self._deltas, self._flushing_deltas = {}, {}
+        self._epoch = 0
+        self._committing = False
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._journal = None
+        self._thread = None
+        self._wake = threading.Event()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # 💥 Journal prethodnog procesa s istim pid-om (restart u kontejneru) → segment za flush
+        leftover = self._journal_path()
+        if leftover.exists():
+            leftover.rename(self._segment_path())
+
+    # ---------------------------------------------------------------- journal
+
+    def _journal_path(self):
+        return self.directory / f"likes-{self.pid}.log"
+
+    def _segment_path(self):
+        return self.directory / f"likes-{self.pid}-{time.time_ns()}.flushing"
+
+    def _append(self, kind, user_id, target_id, state):
+        # 🔹 _append() - Jedan zapis u journal; poziva se pod self._cond (redoslijed = redoslijed toggle-a)
+        if self._journal is None:
+            self._journal = open(self._journal_path(), "a", encoding="utf-8")
+        self._journal.write(json.dumps({"k": kind, "u": user_id, "t": target_id, "s": state}) + "\n")
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    def _claim_segments(self):
+        # 🔹 _claim_segments() - Zatvori trenutni journal i vrati sve segmente za ovaj flush (najstariji prvi)
+        #    💼 Tuđi segmenti (mrtav proces) se preimenuju u naše ime - rename je atomski, pa ih
+        #       ni dva procesa koja istovremeno flushaju ne mogu oba preuzeti
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+            self._journal_path().rename(self._segment_path())
+
+        segments = []
+        for path in self.directory.iterdir():
+            match = SEGMENT_NAME.match(path.name)
+            if match is None:
+                continue
+            pid = int(match["pid"])
+            if pid != self.pid:
+                if _process_alive(pid):
+                    continue
+                claimed = self._segment_path()
+                try:
+                    path.rename(claimed)
+                except FileNotFoundError:
+                    continue  # 📎 Drugi proces ga je preuzeo prije nas
+                path = claimed
+            elif path.suffix != ".flushing":
+                continue
+            segments.append(path)
+        return sorted(segments, key=lambda path: path.stat().st_mtime_ns)
+
+    @staticmethod
+    def _read(segments):
+        # 🔹 _read() - Spoji segmente: (vrsta, korisnik, cilj) → zadnje stanje
+        states = {}
+        for path in segments:
+            with open(path, encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning("Nepotpun zapis u %s preskočen (prekinut upis)", path.name)
+                        continue
+                    states[(record["k"], record["u"], record["t"])] = record["s"]
+        return states
+
+    # ---------------------------------------------------------------- stanje u memoriji
+
+    def _pending(self, key):
+        if key in self._active:
+            return True, self._active[key]
+        if key in self._flushing:
+            return True, self._flushing[key]
+        return False, None
+
+    def _pending_delta(self, target):
+        likes, dislikes = self._deltas.get(target, (0, 0))
+        flushing_likes, flushing_dislikes = self._flushing_deltas.get(target, (0, 0))
+        return likes + flushing_likes, dislikes + flushing_dislikes
+
+    def _consistent(self, read, apply):
+        # 🔹 _consistent() - read() čita bazu bez locka, apply(db) preklapa memoriju pod lockom
+        #    💼 Ako je flush u međuvremenu počeo commit, baza je možda već sadržavala neflushane
+        #       promjene → ponovi čitanje
+        while True:
+            with self._cond:
+                while self._committing:
+                    self._cond.wait()
+                epoch = self._epoch
+            db = read()
+            with self._cond:
+                if self._epoch == epoch:
+                    return apply(db)
+
+    def _set(self, kind, user_id, target_id, old, new):
+        # 🔹 _set() - Zapiši novo stanje (journal + memorija); pod self._cond
+        self._append(kind, user_id, target_id, new)
+        self._active[(kind, user_id, target_id)] = new
+        _add(self._deltas, (kind, target_id), *_delta(old, new))
+        if self._thread is None and self.interval:
+            self._start()
+        if len(self._active) >= self.max_pending:
+            self._wake.set()
+
+    # ---------------------------------------------------------------- toggle-i i čitanja
+
+    def _post_read(self, user_id, post_id):
+        from Posts.models import PostModel
+        from .models import Dislike, Like
+
+        rows = PostModel.objects.filter(pk=post_id)
+        if user_id is not None:
+            rows = rows.annotate(
+                liked=Exists(Like.objects.filter(user_id=user_id, post=OuterRef("pk"))),
+                disliked=Exists(Dislike.objects.filter(user_id=user_id, post=OuterRef("pk"))),
+            )
+            return rows.values_list("likes_count", "dislikes_count", "liked", "disliked").first()
+        return rows.values_list("likes_count", "dislikes_count").first()
+
+    def post_state(self, user_id, post_id):
+        # 🔹 post_state() - (stanje korisnika, likes_count, dislikes_count) s neflushanim promjenama
+        #    📎 user_id=None (anonimni) → stanje je None, brojači i dalje uključuju neflushano
+        def apply(db):
+            if db is None:
+                return None, 0, 0
+            likes, dislikes = db[0], db[1]
+            state = None
+            if user_id is not None:
+                pending, state = self._pending((POST, user_id, post_id))
+                if not pending:
+                    state = LIKE if db[2] else DISLIKE if db[3] else None
+            extra_likes, extra_dislikes = self._pending_delta((POST, post_id))
+            return state, likes + extra_likes, dislikes + extra_dislikes
+
+        return self._consistent(lambda: self._post_read(user_id, post_id), apply)
+
+    def toggle_post(self, user_id, post_id, reaction):
+        # 🔹 toggle_post() - Toggle LIKE / DISLIKE na objavu (međusobno isključivi)
+        #    📤 Vraća: (novo stanje, likes_count, dislikes_count) - kao da je već upisano
+        def apply(db):
+            likes, dislikes, liked, disliked = db
+            pending, old = self._pending((POST, user_id, post_id))
+            if not pending:
+                old = LIKE if liked else DISLIKE if disliked else None
+            new = None if old == reaction else reaction
+            self._set(POST, user_id, post_id, old, new)
+            extra_likes, extra_dislikes = self._pending_delta((POST, post_id))
+            return new, likes + extra_likes, dislikes + extra_dislikes
+
+        return self._consistent(lambda: self._post_read(user_id, post_id), apply)
+
+    def toggle_comment(self, user_id, comment_id):
+        # 🔹 toggle_comment() - Toggle like na komentar
+        #    📤 Vraća: (liked, likes) - kao da je već upisano
+        from Comments.models import CommentModel
+        from .models import CommentLike
+
+        def read():
+            return (
+                CommentModel.objects.filter(pk=comment_id)
+                .annotate(liked=Exists(CommentLike.objects.filter(user_id=user_id, comment=OuterRef("pk"))))
+                .values_list("likes", "liked")
+                .get()
+            )
+
+        def apply(db):
+            likes, liked = db
+            pending, old = self._pending((COMMENT, user_id, comment_id))
+            if not pending:
+                old = LIKE if liked else None
+            new = None if old == LIKE else LIKE
+            self._set(COMMENT, user_id, comment_id, old, new)
+            return new == LIKE, likes + self._pending_delta((COMMENT, comment_id))[0]
+
+        return self._consistent(read, apply)
+
+    def overlay_comments(self, user_id, comments, liked_ids):
+        # 🔹 overlay_comments() - Neflushani like-ovi na već učitanim komentarima
+        #    💼 c.likes += neflushani pomak; liked_ids (skup iz baze) dopunjen / umanjen stanjem korisnika
+        #    📤 Vraća: novi skup liked_ids
+        liked_ids = set(liked_ids)
+        with self._cond:
+            for c in comments:
+                c.likes += self._pending_delta((COMMENT, c.id))[0]
+                if user_id is None:
+                    continue
+                pending, state = self._pending((COMMENT, user_id, c.id))
+                if pending:
+                    (liked_ids.add if state == LIKE else liked_ids.discard)(c.id)
+        return liked_ids
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._active) + len(self._flushing)
+
+    # ---------------------------------------------------------------- flush
+
+    def flush(self):
+        # 🔹 flush() - Upiše sve neflushane toggle-e (i journale mrtvih procesa) u bazu
+        #    📤 Vraća: broj (korisnik, cilj) parova upisanih u ovom flushu
+        with self._flush_lock:
+            with self._cond:
+                segments = self._claim_segments()
+                self._flushing, self._active = self._active, {}
+                self._flushing_deltas, self._deltas = self._deltas, {}
+            if not segments:
+                return 0
+
+            try:
+                states = self._read(segments)
+                with transaction.atomic():
+                    self._apply(states)
+                    with self._cond:
+                        self._committing = True
+                        self._epoch += 1
+            except BaseException:
+                # ↩️ Baza nije promijenjena - neflushano se vraća u memoriju, segmenti ostaju na disku
+                with self._cond:
+                    self._committing = False
+                    self._active = {**self._flushing, **self._active}
+                    for target, (likes, dislikes) in self._flushing_deltas.items():
+                        _add(self._deltas, target, likes, dislikes)
+                    self._flushing, self._flushing_deltas = {}, {}
+                    self._cond.notify_all()
+                raise
+
+            with self._cond:
+                self._committing = False
+                self._flushing, self._flushing_deltas = {}, {}
+                self._cond.notify_all()
+            for path in segments:
+                path.unlink()
+            return len(states)
+
+    def _apply(self, states):
+        posts = {(user_id, target): state for (kind, user_id, target), state in states.items() if kind == POST}
+        comments = {(user_id, target): state for (kind, user_id, target), state in states.items() if kind == COMMENT}
+        if posts:
+            self._apply_posts(posts)
+        if comments:
+            self._apply_comments(comments)
+
+    @staticmethod
+    def _existing(model, target_field, wanted):
+        # 🔹 _existing() - (korisnik, cilj) → pk postojećih redova, samo za tražene parove
+        rows = model.objects.filter(
+            user_id__in={user_id for user_id, _ in wanted},
+            **{f"{target_field}_id__in": {target for _, target in wanted}},
+        ).values_list("pk", "user_id", f"{target_field}_id")
+        return {(user_id, target): pk for pk, user_id, target in rows if (user_id, target) in wanted}
+
+    @staticmethod
+    def _valid(wanted, target_model):
+        # 🔹 _valid() - Izbaci parove čiji korisnik ili cilj više ne postoji (obrisan prije flusha)
+        #    🔒 Ciljevi se zaključavaju (SELECT ... FOR UPDATE, po pk) → dva procesa koja flushaju isti
+        #       cilj ne čitaju "postojeće" redove istovremeno (SQLite: cijela baza je već zaključana)
+        from Users.models import User
+
+        users = set(User.objects.filter(pk__in={u for u, _ in wanted}).values_list("pk", flat=True))
+        targets = set(
+            target_model.objects.select_for_update()
+            .filter(pk__in={t for _, t in wanted})
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        return {key: state for key, state in wanted.items() if key[0] in users and key[1] in targets}
+
+    @staticmethod
+    def _write(model, target_field, wanted, existing, state):
+        # 🔹 _write() - bulk_create nedostajućih + delete suvišnih redova jednog modela
+        #    📤 Vraća: cilj → pomak broja redova
+        created = [key for key, wanted_state in wanted.items() if wanted_state == state and key not in existing]
+        removed = [key for key in existing if wanted[key] != state]
+
+        model.objects.bulk_create(
+            [model(user_id=user_id, **{f"{target_field}_id": target}) for user_id, target in created],
+            batch_size=BATCH_SIZE,
+        )
+        for chunk in _chunks(existing[key] for key in removed):
+            model.objects.filter(pk__in=chunk).delete()
+
+        deltas = {}
+        for (_, target), step in [(key, 1) for key in created] + [(key, -1) for key in removed]:
+            deltas[target] = deltas.get(target, 0) + step
+        return deltas
+
+    def _apply_posts(self, wanted):
+        from Posts.models import PostModel
+        from .models import Dislike, Like
+
+        wanted = self._valid(wanted, PostModel)
+        likes = self._write(Like, "post", wanted, self._existing(Like, "post", wanted), LIKE)
+        dislikes = self._write(Dislike, "post", wanted, self._existing(Dislike, "post", wanted), DISLIKE)
+        for post_id in likes.keys() | dislikes.keys():
+            like_delta, dislike_delta = likes.get(post_id, 0), dislikes.get(post_id, 0)
+            if like_delta or dislike_delta:
+                increment(PostModel, post_id, likes_count=like_delta, dislikes_count=dislike_delta)
+
+    def _apply_comments(self, wanted):
+        from Comments.models import CommentModel, bump_comments_version
+        from .models import CommentLike
+
+        wanted = self._valid(wanted, CommentModel)
+        deltas = {
+            comment_id: delta
+            for comment_id, delta in self._write(
+                CommentLike, "comment", wanted, self._existing(CommentLike, "comment", wanted), LIKE
+            ).items()
+            if delta
+        }
+        # 🔄 Jedna nova verzija po objavi za sve promijenjene komentare (inkrementalni polling)
+        by_post = {}
+        for comment_id, post_id in CommentModel.objects.filter(pk__in=deltas).values_list("pk", "post_id"):
+            by_post.setdefault(post_id, []).append(comment_id)
+        for post_id, comment_ids in by_post.items():
+            version = bump_comments_version(post_id)
+            for comment_id in comment_ids:
+                increment(CommentModel, comment_id, assign={"version": version}, likes=deltas[comment_id])
+
+    # ---------------------------------------------------------------- flusher thread
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="like-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self._flush_quietly)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            close_old_connections()
+            self._flush_quietly()
+
+    def _flush_quietly(self):
+        if os.getpid() != self.pid:
+            return  # 🍴 Naslijeđen atexit u forkanom procesu - journal i stanje pripadaju roditelju
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Flush like journala nije uspio - ponovni pokušaj u sljedećem intervalu")
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    # 🔹 get_buffer() - LikeBuffer ovog procesa ili None ako je write-behind isključen
+    #    🍴 Buffer napravljen prije fork-a (drugi pid) se zamijeni novim → svaki worker piše svoj journal
+    global _buffer
+    if not settings.LIKE_WRITE_BEHIND:
+        return None
+    if _buffer is None or _buffer.pid != os.getpid():
+        with _buffer_lock:
+            if _buffer is None or _buffer.pid != os.getpid():
+                _buffer = LikeBuffer()
+    return _buffer
+
+
+def reset_buffer():
+    # 🔹 reset_buffer() - Zaboravi instancu (promjena postavki u testovima); journal ostaje na disku
+    global _buffer
+    with _buffer_lock:
+        if _buffer is not None and _buffer._journal is not None:
+            _buffer._journal.close()
+        _buffer = None
+
+
+def _forget_after_fork():
+    # 🔹 _forget_after_fork() - U djetetu nakon fork-a: novi lock (roditeljev je mogao biti zaključan)
+    #    i bez naslijeđenog buffera; journal roditelja ostaje njegov
+    global _buffer, _buffer_lock
+    _buffer_lock = threading.Lock()
+    _buffer = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_after_fork)
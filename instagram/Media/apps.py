@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class MediaConfig(AppConfig):
+    name = 'Media'
+
+    def ready(self):
+        # 🔌 Spajanje signala za modele sa slikama (vidi Media/images.py → IMAGE_FIELDS)
+        from . import signals
+
+        signals.connect()
@@ -0,0 +1,142 @@
+# 🇭🇷 Media/gc.py - Brisanje datoteka koje više nitko ne koristi
+# ========================================================================================================
+# Svrha: Zamijenjene i obrisane slike (i njihove varijante) se brišu s diska umjesto da ostaju zauvijek
+#
+# 🔄 Dva mehanizma:
+#   1. Inkrementalno (Media/signals.py):
+#        - nova profilna slika / slika objave → stara slika + njene varijante se otpuštaju
+#        - brisanje retka (i kaskadno: korisnik → objave) → sve njegove datoteke se otpuštaju
+#        - otpuštanje = ContentAddressedStorage.delete() (refcount - 1, datoteka ide tek na 0)
+#        - tek NAKON commit-a (transaction.on_commit) → rollback ne briše datoteku koja je još u upotrebi
+#   2. Mark-and-sweep (python manage.py gc_media): čisti siročad nastalu prije ovoga ili nakon pada
+#        - mark:  skup imena na koja pokazuju redovi registriranih modela (Media/images.py IMAGE_FIELDS)
+#        - sweep: os.scandir kroz MEDIA_ROOT (generator, bez listanja cijelog stabla u memoriju)
+#
+# ⚠️ Default slike (egg.png) se nikad ne brišu - dijeli ih svaki redak bez vlastite slike
+# ========================================================================================================
+
+import logging
+import os
+import time
+from functools import partial
+
+from django.db import transaction
+from django.db.models import TextField
+from django.db.models.functions import Cast
+
+from . import images
+from .storage import HASHED_NAME, SHARD, is_content_addressed
+
+
+logger = logging.getLogger(__name__)
+
+
+def _default(instance_or_model, field):
+    return instance_or_model._meta.get_field(field).get_default()
+
+
+def referenced_names(instance):
+    # 🔹 referenced_names() - Imena datoteka koje redak drži: slika + varijante TE slike
+    #    📎 Varijante nastale iz neke druge (stare) slike ne računaju se kao reference
+    field, variants_field, _ = images.spec_for(instance)
+    name = instance.__dict__.get(field)
+    name = getattr(name, "name", name)
+    if not name or name == _default(instance, field):
+        return set()
+
+    names = {name}
+    data = instance.__dict__.get(variants_field) or {}
+    if data.get("src") == name:
+        names.update(variant[0] for variant in data.get("sizes", {}).values())
+    return names
+
+
+def release(storage, names):
+    # 🔹 release() - Otpušta po jednu referencu za svako ime (storage.delete)
+    for name in sorted(names):
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception("Datoteka %s nije obrisana", name)
+
+
+def release_on_commit(storage, names):
+    # 🔹 release_on_commit() - release() nakon uspješnog commit-a trenutne transakcije
+    if names:
+        transaction.on_commit(partial(release, storage, set(names)))
+
+
+# ────────────────────────────────────────────────────────────────────────────────────────────────────
+# Mark-and-sweep
+# ────────────────────────────────────────────────────────────────────────────────────────────────────
+
+def file_key(name):
+    # 🔹 file_key() - Content-addressed datoteke se prepoznaju po hashu (pokriva i .avif / .webp alternative)
+    return HASHED_NAME.search(name)["digest"] if is_content_addressed(name) else name
+
+
+def mark(chunk_size=2000):
+    # 🔹 mark() - Skup ključeva (file_key) svih datoteka na koje pokazuje neki redak + default slike
+    #    💼 values_list + iterator → redovi se ne drže u memoriji, samo imena
+    live = set()
+    for model, (field, variants_field, _) in images.registered_models():
+        live.add(_default(model, field))
+        rows = model._base_manager.values_list(field, variants_field).order_by()
+        for name, data in rows.iterator(chunk_size=chunk_size):
+            if not name:
+                continue
+            live.add(file_key(name))
+            if data and data.get("src") == name:
+                live.update(file_key(variant[0]) for variant in data.get("sizes", {}).values())
+    return live
+
+
+def is_referenced(name):
+    # 🔹 is_referenced() - Provjera u bazi neposredno prije brisanja (redak dodan nakon mark faze)
+    key = file_key(name)
+    for model, (field, variants_field, _) in images.registered_models():
+        rows = model._base_manager.all()
+        if rows.filter(**{f"{field}__contains": key}).exists():
+            return True
+        variants = Cast(variants_field, TextField())
+        if rows.annotate(variants_text=variants).filter(variants_text__contains=key).exists():
+            return True
+    return False
+
+
+def walk(root, relative=""):
+    # 🔹 walk() - Generator (relativno ime, os.DirEntry) za sve datoteke ispod root-a
+    #    💼 os.scandir + rekurzija po direktoriju → memorija ovisi o dubini, ne o broju datoteka
+    try:
+        entries = os.scandir(os.path.join(root, relative))
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            name = f"{relative}/{entry.name}" if relative else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk(root, name)
+            elif entry.is_file(follow_symlinks=False):
+                yield name, entry
+
+
+def empty_shards(root, relative=""):
+    # 🔹 empty_shards() - Prazni shard direktoriji (<ab>/<cd>) odozdo prema gore
+    #    📤 Generator relativnih imena; direktorij roditelja dolazi nakon djece
+    try:
+        with os.scandir(os.path.join(root, relative)) as entries:
+            directories = [entry.name for entry in entries if entry.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        return
+    for directory in directories:
+        name = f"{relative}/{directory}" if relative else directory
+        yield from empty_shards(root, name)
+        if SHARD.fullmatch(directory):
+            with os.scandir(os.path.join(root, name)) as entries:
+                if next(entries, None) is None:
+                    yield name
+
+
+def is_older(entry, min_age):
+    # 🔹 is_older() - Datoteka nije mijenjana zadnjih min_age sekundi (upload / worker možda još radi)
+    return time.time() - entry.stat(follow_symlinks=False).st_mtime >= min_age
@@ -0,0 +1,285 @@
+# 🇭🇷 Media/images.py - Izvedenice slika (responzivne varijante objava i avatari)
+# ========================================================================================================
+# Svrha: Iz originalne slike generira fiksni skup smanjenih, ponovno kodiranih JPEG varijanti
+#        (+ AVIF / WebP kopija svake varijante - preglednik dobiva najbolji format koji podržava)
+# Funkcionalnosti:
+#   - IMAGE_FIELDS: Registar modela sa slikama (ImageField + JSON polje s varijantama)
+#   - render_variants(): Pillow → smanji / izreži / kodiraj (bez diranja baze i storage-a)
+#   - generate(): Generira varijante za jedan redak i upisuje ih u bazu
+#   - variant_url() / srcset(): Odabir varijante za prikaz (template filteri: templatetags/media_images.py)
+#   - is_processing(): Slika čeka obradu u redu (Media/jobs.py) → placeholder umjesto slike
+#   - placeholder(): Mutni ~20px JPEG kao data URI (LQIP) - feed se iscrta odmah, bez dodatnih zahtjeva
+#
+# ⚡ Zašto:
+#   - Original (do 50MB) se prije slao za svaku karticu u feedu visine 300px
+#   - Feed, grid profila i avatari dobivaju varijantu primjerenu veličini (srcset → preglednik bira)
+#   - Original ostaje samo za detalje objave
+#   - AVIF / WebP su za fotografije znatno manji od JPEG-a; URL u HTML-u ostaje .jpg, a Media/views.py
+#     po Accept zaglavlju šalje <hash>.avif / <hash>.webp iz istog direktorija (Vary: Accept)
+#
+# 📦 Format JSON polja (npr. PostModel.image_variants):
+#   {"src": "posts/images/<uuid>.png",                                   ← original iz kojeg su nastale
+#    "sizes": {"w320": ["posts/images/<uuid>_w320.jpg", 320, 213], ...},  ← [ime, širina, visina]
+#    "formats": [".avif", ".webp"],                                        ← alternative uz svaki .jpg
+#    "placeholder": "data:image/jpeg;base64,..."}                          ← LQIP (~20px, < 1KB)
+#   - "src" različit od trenutnog imena slike → varijante su zastarjele, prikazuje se original
+# ========================================================================================================
+
+import base64
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+
+logger = logging.getLogger(__name__)
+
+JPEG_QUALITY = 82
+
+# 🌫️ LQIP: najveća stranica i kvaliteta placeholdera (preglednik ga razvuče → izgleda kao zamućenje)
+PLACEHOLDER_SIZE = 20
+PLACEHOLDER_QUALITY = 40
+
+# 🆕 Moderni formati uz svaku JPEG varijantu: (ekstenzija, Pillow format, opcije kodiranja)
+#    Redoslijed = prioritet pri odabiru po Accept zaglavlju (vidi storage.ALTERNATE_TYPES)
+MODERN_FORMATS = (
+    (".avif", "AVIF", {"quality": 55, "speed": 6}),
+    (".webp", "WEBP", {"quality": 80, "method": 4}),
+)
+
+# 📐 Varijante po vrsti: (oznaka, veličina u px, kvadratni izrez)
+VARIANTS = {
+    # 📰 Objave: zadana širina, visina prati omjer (grid profila, kartica u feedu, retina)
+    "post": (("w320", 320, False), ("w640", 640, False), ("w1080", 1080, False)),
+    # 👤 Avatari: kvadratni izrez po sredini (zaglavlje 40px, liste 80px, profil 150px + retina)
+    "avatar": (("s40", 40, True), ("s80", 80, True), ("s150", 150, True), ("s300", 300, True)),
+}
+
+# 🗂️ Registar: model → (ImageField, JSON polje s varijantama, vrsta varijanti)
+IMAGE_FIELDS = {
+    "Posts.PostModel": ("post_image", "image_variants", "post"),
+    "Users.User": ("profile_image", "profile_image_variants", "avatar"),
+}
+
+
+def spec_for(model):
+    # 🔹 spec_for() - (polje slike, polje varijanti, vrsta) za model ili objekt; None ako nije registriran
+    return IMAGE_FIELDS.get(model._meta.label)
+
+
+def registered_models():
+    # 🔹 registered_models() - Lista (model, spec) za sve registrirane modele
+    return [(apps.get_model(label), spec) for label, spec in IMAGE_FIELDS.items()]
+
+
+def needs_variants(instance):
+    # 🔹 needs_variants() - Treba li objektu (ponovno) generirati varijante
+    #    ⚠️ Default slike (egg.png) se preskaču - dijeli ih svaki redak, prikazuje se original
+    field, variants_field, _ = spec_for(instance)
+    fieldfile = getattr(instance, field)
+    if not fieldfile or fieldfile.name == fieldfile.field.get_default():
+        return False
+    return (getattr(instance, variants_field) or {}).get("src") != fieldfile.name
+
+
+def is_processing(instance):
+    # 🔹 is_processing() - Nova slika još čeka worker (vidi Media/jobs.py) → template prikazuje placeholder
+    return needs_variants(instance)
+
+
+def _flatten(image):
+    # 🔹 _flatten() - JPEG nema alfa kanal → prozirni dijelovi idu na bijelu pozadinu
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def modern_formats():
+    # 🔹 modern_formats() - MODERN_FORMATS koje ova Pillow instalacija zna kodirati (AVIF nije uvijek)
+    return [spec for spec in MODERN_FORMATS if features.check(spec[1].lower())]
+
+
+def _encode(image, fmt="JPEG", **options):
+    buffer = BytesIO()
+    if fmt == "JPEG":
+        options = {"quality": JPEG_QUALITY, "optimize": True, "progressive": True}
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def render_placeholder(image):
+    # 🔹 render_placeholder() - PIL slika → data URI malog JPEG-a (omjer stranica kao i slika)
+    small = image.copy()
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    small.convert("RGB").save(buffer, "JPEG", quality=PLACEHOLDER_QUALITY, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def render_variants(source, kind):
+    # 🔹 render_variants() - Iz datoteke slike vraća (varijante, placeholder)
+    #    📎 varijante = lista (oznaka, jpeg_bajtovi, širina, visina, alternative)
+    #       alternative = {".avif": bajtovi, ".webp": bajtovi} (samo formati iz modern_formats())
+    #    📎 placeholder = data URI iz najmanje varijante (render_placeholder)
+    #
+    #    💼 Kako radi:
+    #       - draft(): JPEG dekoder odmah smanjuje (1/2, 1/4, 1/8) → brže i manje memorije
+    #       - exif_transpose(): Ispravna orijentacija fotografija s mobitela
+    #       - Varijante se rade od najveće prema najmanjoj, svaka iz prethodne (kaskada)
+    #       - Slika se nikad ne povećava (manji original → varijanta u originalnoj veličini)
+    #       - Varijanta istih dimenzija kao prethodna se ne kodira ponovno
+    #
+    #    ⚠️ Baca OSError / DecompressionBombError za neispravne ili prevelike slike
+    #
+    specs = sorted(VARIANTS[kind], key=lambda spec: spec[1], reverse=True)
+    largest = specs[0][1]
+
+    with Image.open(source) as image:
+        image.draft("RGB", (largest, largest))
+        current = _flatten(ImageOps.exif_transpose(image))
+
+    formats = modern_formats()
+    rendered = []
+    for label, size, square in specs:
+        if square:
+            edge = min(size, current.width, current.height)
+            current = ImageOps.fit(current, (edge, edge), Image.Resampling.LANCZOS)
+        elif current.width > size:
+            height = max(1, round(current.height * size / current.width))
+            current = current.resize((size, height), Image.Resampling.LANCZOS)
+
+        if rendered and rendered[-1][2:4] == (current.width, current.height):
+            rendered.append((label, *rendered[-1][1:]))
+            continue
+        alternates = {ext: _encode(current, fmt, **options) for ext, fmt, options in formats}
+        rendered.append((label, _encode(current), current.width, current.height, alternates))
+    return rendered, render_placeholder(current)
+
+
+def build_variants(fieldfile, kind):
+    # 🔹 build_variants() - Generira i sprema varijante za FieldFile, vraća JSON za polje varijanti
+    #
+    #    💼 Kako radi:
+    #       - Predloženo ime varijante: <ime originala bez ekstenzije>_<oznaka>.jpg; konačno ime
+    #         (hash sadržaja) određuje storage → ista slika uploadana dvaput dijeli i varijante
+    #       - Varijante istih dimenzija (mali original) dijele jednu datoteku
+    #       - AVIF / WebP se spremaju uz JPEG pod istim hashom (storage.save_alternate)
+    #       - Neispravna slika → prazan "sizes" (prikazuje se original, nema ponovnih pokušaja)
+    #
+    data = {"src": fieldfile.name, "sizes": {}, "formats": []}
+    try:
+        with fieldfile.storage.open(fieldfile.name, "rb") as source:
+            rendered, placeholder_uri = render_variants(source, kind)
+    except (OSError, Image.DecompressionBombError) as exc:
+        logger.warning("Varijante za %s nisu generirane: %s", fieldfile.name, exc)
+        return data
+
+    data["placeholder"] = placeholder_uri
+    stem = os.path.splitext(fieldfile.name)[0]
+    storage = fieldfile.storage
+    previous = None
+    for label, content, width, height, alternates in rendered:
+        if previous is None or previous[1:] != [width, height]:
+            name = storage.save(f"{stem}_{label}.jpg", ContentFile(content))
+            previous = [name, width, height]
+            if hasattr(storage, "save_alternate"):
+                for ext, alternate in alternates.items():
+                    storage.save_alternate(name, ext, ContentFile(alternate))
+        data["sizes"][label] = previous
+    if hasattr(storage, "save_alternate"):
+        data["formats"] = [ext for ext, _, _ in modern_formats()]
+    return data
+
+
+def _variant_names(data):
+    return {variant[0] for variant in (data or {}).get("sizes", {}).values()}
+
+
+def generate(model, pk, force=False):
+    # 🔹 generate() - Generira varijante za jedan redak i upisuje ih u bazu
+    #
+    #    💼 Kako radi:
+    #       - Učitava samo polje slike i polje varijanti
+    #       - UPDATE je uvjetan (slika = ona iz koje su varijante nastale) → ako je korisnik
+    #         u međuvremenu uploadao novu sliku, stare varijante se ne upisuju preko nje
+    #       - force=True: ponovno generira i postojeće varijante (build_image_variants --force)
+    #
+    #    🗑️ Reference (Media/gc.py):
+    #       - UPDATE nije prošao → upravo spremljene varijante se otpuštaju
+    #       - Zamijenjene varijante iste slike (force) se otpuštaju; varijante stare slike
+    #         je već otpustio signal pri zamjeni slike
+    #
+    #    📤 Vraća: JSON varijanti ili None ako ništa nije generirano
+    #
+    from .gc import release
+
+    field, variants_field, kind = spec_for(model)
+    instance = model._base_manager.filter(pk=pk).only("pk", field, variants_field).first()
+    if instance is None:
+        return None
+    fieldfile = getattr(instance, field)
+    if not needs_variants(instance):
+        if not force or not fieldfile or fieldfile.name == fieldfile.field.get_default():
+            return None
+
+    previous = getattr(instance, variants_field) or {}
+    data = build_variants(fieldfile, kind)
+    updated = model._base_manager.filter(pk=pk, **{field: data["src"]}).update(**{variants_field: data})
+    if not updated:
+        release(fieldfile.storage, _variant_names(data))
+        return None
+    if previous.get("src") == data["src"]:
+        release(fieldfile.storage, _variant_names(previous))
+    return data
+
+
+def _current_sizes(instance):
+    # 🔹 _current_sizes() - (FieldFile, varijante poredane po širini) - prazno ako su varijante zastarjele
+    field, variants_field, _ = spec_for(instance)
+    fieldfile = getattr(instance, field)
+    data = getattr(instance, variants_field) or {}
+    if not fieldfile or data.get("src") != fieldfile.name:
+        return fieldfile, []
+    return fieldfile, sorted(data.get("sizes", {}).values(), key=lambda variant: variant[1])
+
+
+def placeholder(instance):
+    # 🔹 placeholder() - LQIP data URI trenutne slike ili "" (nema varijanti / zastarjele)
+    field, variants_field, _ = spec_for(instance)
+    fieldfile = getattr(instance, field)
+    data = getattr(instance, variants_field) or {}
+    if not fieldfile or data.get("src") != fieldfile.name:
+        return ""
+    return data.get("placeholder", "")
+
+
+def variant_url(instance, width):
+    # 🔹 variant_url() - URL najmanje varijante široke barem `width` px
+    #    📤 Fallback: najveća varijanta → original (varijante još ne postoje / default slika)
+    fieldfile, sizes = _current_sizes(instance)
+    if not fieldfile:
+        return ""
+    for name, variant_width, _ in sizes:
+        if variant_width >= width:
+            return fieldfile.storage.url(name)
+    if sizes:
+        return fieldfile.storage.url(sizes[-1][0])
+    return fieldfile.url
+
+
+def srcset(instance):
+    # 🔹 srcset() - Vrijednost srcset atributa ("url 320w, url 640w, ...") ili "" ako nema varijanti
+    fieldfile, sizes = _current_sizes(instance)
+    candidates = []
+    seen = set()
+    for name, variant_width, _ in sizes:
+        if name not in seen:
+            seen.add(name)
+            candidates.append(f"{fieldfile.storage.url(name)} {variant_width}w")
+    return ", ".join(candidates)
@@ -0,0 +1,100 @@
+# 🇭🇷 Media/jobs.py - Lokalni red poslova za obradu slika (DB-backed, bez brokera)
+# ========================================================================================================
+# Svrha: Dekodiranje i kodiranje slika (do 50MB) izvan HTTP zahtjeva
+# Funkcionalnosti:
+#   - enqueue(): Dodaje posao u red (poziva se iz post_save, u istoj transakciji kao i redak)
+#   - claim(): Worker preuzima najstariji pending posao
+#   - run(): Obrađuje preuzeti posao (generiranje varijanti) i ažurira njegov status
+#   - requeue_stale(): Vraća u red poslove worker-a koji je pao usred obrade
+#
+# ⚡ Zašto:
+#   - Gunicorn worker je prije bio blokiran sekundama dok Pillow obrađuje sliku
+#   - Sada zahtjev samo spremi redak + ImageJob i odmah vrati odgovor
+#   - Dok varijante ne postoje, template-i prikazuju placeholder (filter image_processing)
+#
+# 🔒 Preuzimanje posla:
+#   - Uvjetni UPDATE ... WHERE id = X AND status = 'pending'
+#   - Ako dva worker-a pokušaju isti posao, samo jednom UPDATE vrati 1 redak
+#   - Radi na SQLite-u (nema SELECT ... FOR UPDATE SKIP LOCKED) i na Postgres-u
+# ========================================================================================================
+
+import logging
+from datetime import timedelta
+
+from django.apps import apps
+from django.db.models import F
+from django.utils import timezone
+
+from . import images
+from .models import ImageJob
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+
+
+def enqueue(model, pk):
+    # 🔹 enqueue() - Dodaje (ili vraća u pending) posao za redak
+    #    💼 Postojeći posao (npr. nova slika prije obrade stare) se resetira umjesto dupliciranja
+    ImageJob.objects.update_or_create(
+        model_label=model._meta.label,
+        object_id=pk,
+        defaults={'status': ImageJob.PENDING, 'attempts': 0, 'last_error': "", 'locked_at': None},
+    )
+
+
+def requeue_stale(max_age):
+    # 🔹 requeue_stale() - Poslovi "running" duže od max_age sekundi → natrag u pending
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    return ImageJob.objects.filter(status=ImageJob.RUNNING, locked_at__lt=cutoff).update(
+        status=ImageJob.PENDING, locked_at=None
+    )
+
+
+def claim(lookahead=10):
+    # 🔹 claim() - Preuzima najstariji pending posao; vraća ImageJob ili None ako je red prazan
+    #    💼 lookahead: Koliko kandidata probati ako su ih drugi worker-i u međuvremenu preuzeli
+    candidates = ImageJob.objects.filter(status=ImageJob.PENDING).order_by('id').values_list('id', flat=True)
+    for job_id in candidates[:lookahead]:
+        taken = ImageJob.objects.filter(id=job_id, status=ImageJob.PENDING).update(
+            status=ImageJob.RUNNING, locked_at=timezone.now(), attempts=F('attempts') + 1
+        )
+        if taken:
+            return ImageJob.objects.get(id=job_id)
+    return None
+
+
+def _give_up(model, pk):
+    # 🔹 _give_up() - Zadnji pokušaj nije uspio → zapiši prazne varijante da template prikaže original
+    field, variants_field, _ = images.spec_for(model)
+    instance = model._base_manager.filter(pk=pk).only('pk', field).first()
+    if instance is not None:
+        name = getattr(instance, field).name
+        model._base_manager.filter(pk=pk, **{field: name}).update(**{variants_field: {'src': name, 'sizes': {}}})
+
+
+def run(job, max_attempts=MAX_ATTEMPTS):
+    # 🔹 run() - Obrađuje preuzeti posao; vraća True ako je uspio
+    #
+    #    💼 Kako radi:
+    #       - Uspjeh → posao se briše (ali samo ako je još "running": ako je u međuvremenu
+    #         uploadana nova slika, enqueue() ga je vratio u pending i ostaje za sljedeći krug)
+    #       - Greška → pending (ponovni pokušaj) ili failed nakon max_attempts pokušaja
+    #
+    running = ImageJob.objects.filter(pk=job.pk, status=ImageJob.RUNNING)
+    try:
+        model = apps.get_model(job.model_label)
+        images.generate(model, job.object_id)
+    except Exception as exc:
+        logger.exception("Obrada slike %s nije uspjela", job)
+        failed = job.attempts >= max_attempts
+        running.update(
+            status=ImageJob.FAILED if failed else ImageJob.PENDING, last_error=repr(exc), locked_at=None
+        )
+        if failed and job.model_label in images.IMAGE_FIELDS:
+            _give_up(apps.get_model(job.model_label), job.object_id)
+        return False
+
+    running.delete()
+    return True
@@ -0,0 +1,133 @@
+# 🇭🇷 Media/management/commands/bench_feed_bytes.py - Benchmark: bajtovi slika po stranici feeda
+# ========================================================================================================
+# Svrha: Koliko bajtova slika preglednik skine za jednu stranicu feeda (list.html) prije i poslije
+#        varijanti i modernih formata
+#
+# Kako radi:
+#   - Privremena baza (throwaway_database) + privremeni MEDIA_ROOT → prava baza i uploadi se ne diraju
+#   - Sintetičke "fotografije" (gradijent + šum + oblici) uploadane kao JPEG, prolaze pravi pipeline:
+#     ContentAddressedStorage → build_variants (JPEG + AVIF / WebP)
+#   - Svaka slika stranice se dohvaća kroz Media/views.serve s Accept zaglavljem pravog preglednika
+#   - Stranica feeda = KeysetPaginator po 3 objave: slika objave (variant_url:640) + avatar autora (:40)
+#
+# Stupci:
+#   - original:     prije varijanti - feed je slao uploadanu sliku i avatar
+#   - JPEG:         preglednik bez AVIF/WebP (Accept: */*)
+#   - WebP / AVIF:  Accept kakav šalju Safari 14-15 / Chrome, Firefox
+#
+# 📝 Primjer:
+#   python manage.py bench_feed_bytes --pages 4
+#   python manage.py bench_feed_bytes --width 4032 --height 3024   ← veličina fotografije s mobitela
+# ========================================================================================================
+
+import random
+import tempfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from PIL import Image, ImageDraw, ImageFilter
+
+from instagram.bench import Timer, throwaway_database
+from Media.images import build_variants, modern_formats, variant_url
+from Media.views import serve
+
+PAGE_SIZE = 3
+
+# 🌐 Accept zaglavlja za <img> zahtjeve
+CLIENTS = (
+    ("JPEG", "*/*"),
+    ("WebP", "image/webp,*/*"),
+    ("AVIF", "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8"),
+)
+
+
+def _photo(rng, width, height):
+    # 🔹 _photo() - Sintetička fotografija: gradijent neba, šum senzora i nekoliko mutnih oblika
+    image = Image.merge("RGB", [
+        Image.linear_gradient("L").resize((width, height)).point(lambda v, k=k: int(v * k))
+        for k in (rng.uniform(0.3, 1.0), rng.uniform(0.3, 1.0), rng.uniform(0.3, 1.0))
+    ])
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(width), rng.randrange(height)
+        r = rng.randrange(width // 20, width // 4)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+    image = image.filter(ImageFilter.GaussianBlur(width / 200))
+    noise = Image.effect_noise((width, height), 24).convert("RGB")
+    return Image.blend(image, noise, 0.08)
+
+
+def _upload(image, quality=92):
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=quality)
+    return ContentFile(buffer.getvalue(), name="upload.jpg")
+
+
+class Command(BaseCommand):
+    help = "Benchmark: bajtovi slika po stranici feeda (original / JPEG / WebP / AVIF)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=2, help="Broj stranica feeda (po 3 objave)")
+        parser.add_argument("--width", type=int, default=3000)
+        parser.add_argument("--height", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Formati: JPEG + " + (", ".join(fmt for _, fmt, _ in modern_formats()) or "-"))
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with throwaway_database():
+                self._run(options)
+
+    def _run(self, options):
+        from Posts.models import PostModel
+        from Users.models import User
+
+        rng = random.Random(options["seed"])
+        count = options["pages"] * PAGE_SIZE
+        timer = Timer()
+
+        # 1️⃣ Autori i objave (kroz storage i build_variants, kao worker)
+        posts = []
+        for i in range(count):
+            author = User(username=f"bench{i}", email=f"bench{i}@example.com")
+            author.profile_image = default_storage.save(
+                "users/images/avatar.jpg", _upload(_photo(rng, 800, 800))
+            )
+            post = PostModel(author=author, title=f"bench {i}", content="")
+            post.post_image = default_storage.save(
+                "posts/images/post.jpg", _upload(_photo(rng, options["width"], options["height"]))
+            )
+            with timer:
+                author.profile_image_variants = build_variants(author.profile_image, "avatar")
+                post.image_variants = build_variants(post.post_image, "post")
+            posts.append(post)
+        summary = timer.summary()
+        self.stdout.write(f"Obrada: {count} objava, p50 {summary['p50_ms']:.0f}ms po objavi (avatar + objava)")
+
+        # 2️⃣ Što stranica feeda dohvaća (URL-ovi iz istih funkcija koje koriste template filteri)
+        originals = sum(p.post_image.size + p.author.profile_image.size for p in posts)
+        urls = [url for p in posts for url in (variant_url(p, 640), variant_url(p.author, 40))]
+
+        factory = RequestFactory()
+        totals = {}
+        for client, accept in CLIENTS:
+            total = 0
+            for url in urls:
+                path = url.split("/media/", 1)[1]
+                response = serve(factory.get(url, HTTP_ACCEPT=accept), path)
+                total += int(response["Content-Length"])
+                response.close()
+            totals[client] = total
+
+        # 3️⃣ Izvještaj po stranici
+        pages = options["pages"]
+        self.stdout.write(f"\n{'po stranici feeda':<20} {'bajtova':>12} {'vs original':>12} {'vs JPEG':>9}")
+        self.stdout.write(f"{'original':<20} {originals / pages / 1024:>10.1f}KB {'100.0%':>12} {'':>9}")
+        for client, total in totals.items():
+            self.stdout.write(
+                f"{client:<20} {total / pages / 1024:>10.1f}KB {total / originals:>11.1%} "
+                f"{total / totals['JPEG']:>8.1%}"
+            )
@@ -0,0 +1,209 @@
+# 🇭🇷 Media/management/commands/bench_uploads.py - Benchmark: klasični upload vs streaming provjera
+# ========================================================================================================
+# Svrha: Koliko bajtova, vremena i memorije troši odbijanje zlonamjernog / neispravnog upload-a
+#
+# Kako radi:
+#   - Tijelo multipart zahtjeva se generira "u letu" (ne drži se u memoriji) i broji se pročitano
+#   - klasično:  Memory/TemporaryFile handleri primaju SVE, tek onda provjera veličine i Pillow
+#                (kao PostForm.clean_post_image / validate_size / forms.ImageField)
+#   - streaming: upload_limit_middleware + ImageUploadHandler (Media/uploads.py)
+#   - Mjeri: pročitane bajtove tijela, bajtove zapisane u temp datoteku, p50 vremena (--repeat)
+#     i vršnu Python alokaciju (tracemalloc)
+#
+# 📝 Primjer:
+#   python manage.py bench_uploads --repeat 3
+#   python manage.py bench_uploads --scale 0.25     ← manje datoteke za brzu provjeru
+# ========================================================================================================
+
+import io
+import random
+import struct
+import tracemalloc
+import zlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from PIL import Image
+
+from instagram.bench import Timer
+from Media.middleware import upload_limit_middleware
+from Media.uploads import ImageUploadHandler, field_limits, upload_errors
+
+MB = 1024 * 1024
+BOUNDARY = "benchBoundary7MA4YWxkTrZu0gW"
+
+
+class _SpoolCounter(TemporaryFileUploadHandler):
+    # 🔹 _SpoolCounter - TemporaryFileUploadHandler koji broji bajtove zapisane na disk
+    spooled = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        _SpoolCounter.spooled += len(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+
+class _SyntheticBody:
+    # 🔹 _SyntheticBody - wsgi.input koji vraća segmente (bajtovi ili broj bajtova paddinga) i broji pročitano
+    def __init__(self, segments, block):
+        self.segments = list(segments)
+        self.block = block
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        out = []
+        wanted = size if size is not None and size >= 0 else float("inf")
+        while self.segments and wanted > 0:
+            segment = self.segments[0]
+            if isinstance(segment, int):
+                n = int(min(segment, wanted, len(self.block)))
+                out.append(self.block[:n])
+                self.segments[0] = segment - n
+                if self.segments[0] == 0:
+                    self.segments.pop(0)
+            else:
+                n = int(min(len(segment), wanted))
+                out.append(segment[:n])
+                self.segments[0] = segment[n:]
+                if not self.segments[0]:
+                    self.segments.pop(0)
+            wanted -= n
+        data = b"".join(out)
+        self.bytes_read += len(data)
+        return data
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
+def _jpeg(size=256):
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), (200, 120, 40)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _png_header(width, height):
+    # 🔹 _png_header() - PNG potpis + IHDR koji tvrdi da je slika width × height (decompression bomb)
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    chunk = struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    idat = struct.pack(">I", 1 << 30) + b"IDAT"  # početak (lažno ogromnog) IDAT bloka
+    return b"\x89PNG\r\n\x1a\n" + chunk + idat
+
+
+def _segments(field, head, padding):
+    # 🔹 _segments() - tekstualno polje + jedna datoteka (head + padding bajtova) kao multipart tijelo
+    prefix = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="title"\r\n\r\nbench\r\n'
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="upload.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode()
+    suffix = f"\r\n--{BOUNDARY}--\r\n".encode()
+    return [prefix, head, padding, suffix], len(prefix) + len(head) + padding + len(suffix)
+
+
+class Command(BaseCommand):
+    help = "Benchmark odbijanja upload-a: klasična provjera nakon primanja vs streaming handler"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--scale", type=float, default=1.0, help="Množitelj veličina datoteka")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def _scenarios(self, scale):
+        jpeg = _jpeg()
+        post_limit = settings.POST_IMAGE_MAX_SIZE
+        mb = lambda n: int(n * MB * scale)
+        return [
+            ("post, 1.6× limit", "post_image", jpeg, int(post_limit * 1.6)),
+            ("avatar 20MB", "profile_image", jpeg, mb(20)),
+            ("post 30MB, nije slika", "post_image", b"", mb(30)),
+            ("post, 40000×40000 PNG", "post_image", _png_header(40000, 40000), mb(10)),
+            ("post 3MB, ispravna", "post_image", jpeg, mb(3)),
+        ]
+
+    def _request(self, field, head, padding, block):
+        segments, total = _segments(field, head, padding)
+        body = _SyntheticBody(segments, block)
+        environ = RequestFactory()._base_environ(
+            REQUEST_METHOD="POST",
+            PATH_INFO="/create/",
+            CONTENT_TYPE=f"multipart/form-data; boundary={BOUNDARY}",
+            CONTENT_LENGTH=str(total),
+            **{"wsgi.input": body},
+        )
+        return WSGIRequest(environ), body
+
+    def _classic(self, request, field):
+        # 🔹 _classic() - Primi sve, pa provjeri (kao forma / validate_size)
+        request.upload_handlers = [MemoryFileUploadHandler(request), _SpoolCounter(request)]
+        upload = request.FILES.get(field)
+        try:
+            if upload is None:
+                return "nema datoteke"
+            if upload.size > field_limits()[field]:
+                return "odbijeno: veličina"
+            try:
+                with Image.open(upload) as image:
+                    image.verify()
+            except Exception:
+                return "odbijeno: slika"
+            return "prihvaćeno"
+        finally:
+            if upload is not None:
+                upload.close()
+
+    def _streaming(self, request, field):
+        # 🔹 _streaming() - upload_limit_middleware → ImageUploadHandler → Memory/TemporaryFile
+        def view(request):
+            request.upload_handlers = [
+                ImageUploadHandler(request),
+                MemoryFileUploadHandler(request),
+                _SpoolCounter(request),
+            ]
+            upload = request.FILES.get(field)
+            if upload is not None:
+                upload.close()
+            errors = upload_errors(request)
+            return HttpResponse("odbijeno: " + "; ".join(errors.values()) if errors else "prihvaćeno")
+
+        response = upload_limit_middleware(view)(request)
+        if response.status_code == 413:
+            return "413 prije čitanja"
+        return response.content.decode()
+
+    def _measure(self, mode, scenario, repeat, block):
+        _, field, head, padding = scenario
+        timer = Timer()
+        outcome = read = None
+        for _ in range(repeat):
+            request, body = self._request(field, head, padding, block)
+            _SpoolCounter.spooled = 0
+            with timer:
+                outcome = mode(request, field)
+            read, spooled = body.bytes_read, _SpoolCounter.spooled
+
+        # 🧠 Zasebno mjerenje memorije (tracemalloc usporava pa ne ulazi u vrijeme)
+        request, _ = self._request(field, head, padding, block)
+        tracemalloc.start()
+        mode(request, field)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return read, spooled, timer.summary()["p50_ms"], peak, outcome
+
+    def handle(self, *args, **options):
+        block = random.Random(options["seed"]).randbytes(64 * 1024)
+        self.stdout.write(
+            f"{'scenarij':<24} {'način':<10} {'pročitano':>11} {'na disk':>11} {'p50':>10} {'peak mem':>10}  ishod"
+        )
+        for scenario in self._scenarios(options["scale"]):
+            for name, mode in (("klasično", self._classic), ("streaming", self._streaming)):
+                read, spooled, p50, peak, outcome = self._measure(mode, scenario, options["repeat"], block)
+                self.stdout.write(
+                    f"{scenario[0]:<24} {name:<10} {read / MB:>9.2f}MB {spooled / MB:>9.2f}MB {p50:>8.1f}ms "
+                    f"{peak / MB:>8.2f}MB  {outcome[:60]}"
+                )
@@ -0,0 +1,31 @@
+# 🇭🇷 Media/management/commands/build_image_variants.py - Generiranje varijanti za postojeće slike
+# ========================================================================================================
+# Svrha: Backfill varijanti za slike uploadane prije derivative pipeline-a
+#        (i ponovno generiranje nakon promjene VARIANTS u Media/images.py)
+#
+# 📝 Primjer:
+#   python manage.py build_image_variants
+#   python manage.py build_image_variants --force     ← ponovno generira i postojeće varijante
+# ========================================================================================================
+
+from django.core.management.base import BaseCommand
+
+from Media import images
+
+
+class Command(BaseCommand):
+    help = "Generira responzivne varijante za sve slike koje ih još nemaju"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Ponovno generiraj i postojeće varijante")
+
+    def handle(self, *args, **options):
+        for model, (field, variants_field, _) in images.registered_models():
+            done = 0
+            rows = model._base_manager.only("pk", field, variants_field).order_by("pk")
+            for instance in rows.iterator(chunk_size=500):
+                if not (options["force"] or images.needs_variants(instance)):
+                    continue
+                if images.generate(model, instance.pk, force=options["force"]) is not None:
+                    done += 1
+            self.stdout.write(f"{model._meta.label}: generirano {done}")
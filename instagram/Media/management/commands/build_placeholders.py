@@ -0,0 +1,71 @@
+# 🇭🇷 Media/management/commands/build_placeholders.py - Backfill LQIP placeholdera za postojeće slike
+# ========================================================================================================
+# Svrha: Redovi s varijantama generiranim prije LQIP-a dobivaju "placeholder" u JSON polju varijanti
+#
+# Kako radi:
+#   - Redovi se čitaju u batch-evima po primarnom ključu (pk > zadnji) → memorija ne raste s tablicom
+#   - Placeholder se radi iz NAJMANJE varijante (npr. w320 / s40), ne iz originala → brzo
+#   - Svaki batch se upisuje u jednoj transakciji; UPDATE je uvjetan (slika se nije promijenila)
+#   - Redovi bez varijanti (još u redu za obradu) se preskaču - worker ih generira zajedno s placeholderom
+#
+# 📝 Primjer:
+#   python manage.py build_placeholders
+#   python manage.py build_placeholders --batch-size 500
+# ========================================================================================================
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from PIL import Image
+
+from Media import images
+
+
+class Command(BaseCommand):
+    help = "Generira LQIP placeholder (data URI) za slike koje ga još nemaju"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def _render(self, data):
+        # 🔹 _render() - data URI iz najmanje varijante; None ako datoteka nije čitljiva
+        name = min(data["sizes"].values(), key=lambda variant: variant[1])[0]
+        try:
+            with default_storage.open(name, "rb") as source, Image.open(source) as image:
+                image.draft("RGB", (images.PLACEHOLDER_SIZE * 2, images.PLACEHOLDER_SIZE * 2))
+                return images.render_placeholder(image)
+        except (OSError, Image.DecompressionBombError):
+            return None
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        for model, (field, variants_field, _) in images.registered_models():
+            done = skipped = 0
+            last_pk = 0
+            while True:
+                batch = list(
+                    model._base_manager.filter(pk__gt=last_pk)
+                    .order_by("pk")
+                    .values_list("pk", field, variants_field)[:batch_size]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1][0]
+
+                updates = []
+                for pk, name, data in batch:
+                    data = data or {}
+                    if data.get("src") != name or not data.get("sizes") or data.get("placeholder"):
+                        continue
+                    uri = self._render(data)
+                    if uri is None:
+                        skipped += 1
+                        continue
+                    updates.append((pk, name, {**data, "placeholder": uri}))
+
+                with transaction.atomic():
+                    for pk, name, data in updates:
+                        done += model._base_manager.filter(pk=pk, **{field: name}).update(**{variants_field: data})
+                self.stdout.write(f"{model._meta.label}: do pk={last_pk}, generirano {done}")
+
+            self.stdout.write(f"{model._meta.label}: generirano {done}, nečitljivo {skipped}")
@@ -0,0 +1,82 @@
+# 🇭🇷 Media/management/commands/gc_media.py - Mark-and-sweep čišćenje MEDIA_ROOT-a
+# ========================================================================================================
+# Svrha: Briše datoteke na koje ne pokazuje nijedan redak (siročad iz vremena prije Media/gc.py,
+#        prekinuti uploadi, pad procesa između spremanja datoteke i commit-a)
+#
+# Kako radi (vidi Media/gc.py):
+#   1. mark:  imena svih slika i varijanti iz baze + default slike
+#   2. sweep: os.scandir kroz MEDIA_ROOT; datoteka koja nije označena, starija je od --min-age
+#             i ni ponovna provjera u bazi je ne nalazi → briše se (zajedno sa StoredFile retkom)
+#   3. .part datoteke (prekinuti zapisi storage-a) starije od --min-age
+#   4. StoredFile redovi bez datoteke i prazni shard direktoriji (<ab>/<cd>)
+#
+# 📝 Primjer:
+#   python manage.py gc_media --dry-run            ← samo ispiše što bi obrisao
+#   python manage.py gc_media --min-age 3600       ← ne dira datoteke mlađe od sat vremena
+# ========================================================================================================
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Media import gc
+from Media.models import StoredFile
+
+
+class Command(BaseCommand):
+    help = "Briše upload-ane datoteke na koje ne pokazuje nijedan redak u bazi"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Samo ispiši, ništa ne briši")
+        parser.add_argument(
+            "--min-age", type=int, default=86400,
+            help="Ne diraj datoteke mijenjane unutar zadnjih N sekundi (default: 1 dan)",
+        )
+
+    def handle(self, *args, **options):
+        root = settings.MEDIA_ROOT
+        dry_run, min_age = options["dry_run"], options["min_age"]
+        prefix = "[dry-run] " if dry_run else ""
+
+        live = gc.mark()
+        self.stdout.write(f"Označeno: {len(live)} referenciranih datoteka")
+
+        orphans = orphan_bytes = parts = 0
+        for name, entry in gc.walk(root):
+            if entry.name.startswith(".") and entry.name.endswith(".part"):
+                if gc.is_older(entry, min_age):
+                    parts += 1
+                    if not dry_run:
+                        os.remove(entry.path)
+                continue
+            if gc.file_key(name) in live or not gc.is_older(entry, min_age) or gc.is_referenced(name):
+                continue
+
+            orphans += 1
+            orphan_bytes += entry.stat(follow_symlinks=False).st_size
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{prefix}{name}")
+            if not dry_run:
+                StoredFile.objects.filter(name=name).delete()
+                os.remove(entry.path)
+
+        # 🧾 StoredFile redovi čija datoteka više ne postoji (i nitko ih ne koristi)
+        rows = 0
+        for pk, name in StoredFile.objects.values_list("pk", "name").iterator(chunk_size=2000):
+            if gc.file_key(name) in live or os.path.exists(os.path.join(root, name)) or gc.is_referenced(name):
+                continue
+            rows += 1
+            if not dry_run:
+                StoredFile.objects.filter(pk=pk).delete()
+
+        directories = 0
+        if not dry_run:
+            for name in gc.empty_shards(root):
+                os.rmdir(os.path.join(root, name))
+                directories += 1
+
+        self.stdout.write(
+            f"{prefix}Siročad: {orphans} ({orphan_bytes / (1024 * 1024):.1f}MB), .part: {parts}, "
+            f"StoredFile bez datoteke: {rows}, prazni direktoriji: {directories}"
+        )
@@ -0,0 +1,73 @@
+# 🇭🇷 Media/management/commands/process_image_jobs.py - Worker za red obrade slika
+# ========================================================================================================
+# Svrha: Prazni ImageJob red (generiranje varijanti) izvan web procesa
+#
+# 💼 Kako radi:
+#   - --workers N: N niti, svaka preuzima i obrađuje jedan po jedan posao
+#     (Pillow otpušta GIL pri dekodiranju / smanjivanju / kodiranju → niti rade paralelno)
+#   - Bez --loop: završava kad je red prazan (cron, deploy skripta)
+#   - S --loop: radi trajno i provjerava red svakih --poll sekundi (systemd / supervisor)
+#   - Poslovi "running" stariji od --stale-after sekundi (pad worker-a) vraćaju se u red
+#
+# 📝 Primjer:
+#   python manage.py process_image_jobs --workers 4
+#   python manage.py process_image_jobs --workers 2 --loop --poll 1
+# ========================================================================================================
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from Media import jobs
+
+
+class Command(BaseCommand):
+    help = "Obrađuje red poslova za slike (varijante) s konfigurabilnim brojem worker niti"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Broj paralelnih worker niti")
+        parser.add_argument("--loop", action="store_true", help="Ne završavaj kad je red prazan")
+        parser.add_argument("--poll", type=float, default=2.0, help="Pauza (s) kad je red prazan (uz --loop)")
+        parser.add_argument("--max-attempts", type=int, default=jobs.MAX_ATTEMPTS)
+        parser.add_argument("--stale-after", type=int, default=600, help="Sekunde nakon kojih se 'running' posao vraća u red")
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        requeued = jobs.requeue_stale(options["stale_after"])
+        if requeued:
+            self.stdout.write(f"Vraćeno u red: {requeued}")
+
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            futures = [pool.submit(self._worker, options, stop) for _ in range(max(1, options["workers"]))]
+            try:
+                results = [future.result() for future in futures]
+            except KeyboardInterrupt:
+                stop.set()
+                results = [future.result() for future in futures]
+
+        done = sum(ok for ok, _ in results)
+        failed = sum(bad for _, bad in results)
+        self.stdout.write(self.style.SUCCESS(f"Obrađeno: {done}, neuspjelo: {failed}"))
+
+    def _worker(self, options, stop):
+        # 🔹 _worker() - Petlja jedne niti: claim → run, dok red nije prazan (ili do stop-a uz --loop)
+        done = failed = 0
+        try:
+            while not stop.is_set():
+                job = jobs.claim()
+                if job is None:
+                    if not options["loop"]:
+                        break
+                    jobs.requeue_stale(options["stale_after"])
+                    stop.wait(options["poll"])
+                    continue
+                if jobs.run(job, max_attempts=options["max_attempts"]):
+                    done += 1
+                else:
+                    failed += 1
+        finally:
+            # 🔌 Svaka nit ima svoju konekciju na bazu - zatvori je
+            connection.close()
+        return done, failed
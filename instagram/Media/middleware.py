@@ -0,0 +1,41 @@
+# 🇭🇷 Media/middleware.py - Odbijanje prevelikih upload-a prije čitanja tijela zahtjeva
+# ========================================================================================================
+# Svrha: multipart zahtjev čiji Content-Length premašuje max_request_size() → 413 odmah
+#
+# 💼 Kako radi:
+#   - Stoji prije CsrfViewMiddleware (CSRF provjera bi inače pročitala request.POST = cijelo tijelo)
+#   - Zahtjevi bez Content-Length-a (chunked) prolaze - njih zaustavlja ImageUploadHandler
+#     (Media/uploads.py) čim pojedino polje premaši svoj limit
+#   - Podržava sync i async lanac (pod ASGI-jem ne prisiljava async view-e u thread)
+# ========================================================================================================
+
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+
+from .uploads import field_limits, max_request_size, size_message
+
+
+def _too_large(request):
+    if request.content_type != "multipart/form-data":
+        return None
+    try:
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > max_request_size():
+        return HttpResponse(size_message(max(field_limits().values())), status=413)
+    return None
+
+
+@sync_and_async_middleware
+def upload_limit_middleware(get_response):
+    # 🔹 upload_limit_middleware() - Sync i async (ASGI: async view-i poput long-polla ne dobivaju thread)
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return _too_large(request) or await get_response(request)
+    else:
+        def middleware(request):
+            return _too_large(request) or get_response(request)
+
+    return middleware
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-16 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Čeka'), ('running', 'U obradi'), ('failed', 'Neuspjelo')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'ImageJob',
+                'indexes': [models.Index(fields=['status', 'id'], name='imagejob_status_idx')],
+                'unique_together': {('model_label', 'object_id')},
+            },
+        ),
+    ]
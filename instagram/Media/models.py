@@ -0,0 +1,81 @@
+# 🇭🇷 Media/models.py - Red poslova za obradu slika i evidencija pohranjenih datoteka
+# ========================================================================================================
+# Svrha: Obrada slika (varijante) izvan HTTP zahtjeva + brojanje referenci na datoteke
+# Modeli:
+#   - ImageJob: Jedan posao = "generiraj varijante za sliku ovog retka"
+#   - StoredFile: Jedna datoteka u content-addressed storage-u s brojem referenci (Media/storage.py)
+#
+# 🔄 Životni ciklus ImageJob-a:
+#   pending → running → (obrisan)     ← uspjeh
+#                     → pending        ← greška, pokušava se ponovno
+#                     → failed         ← greška nakon zadnjeg pokušaja
+#
+# ⚙️ Worker: python manage.py process_image_jobs --workers 4   (vidi Media/jobs.py)
+# ========================================================================================================
+
+from django.db import models
+
+
+class ImageJob(models.Model):
+    # 🔹 ImageJob - Posao obrade slike za jedan redak registriranog modela (IMAGE_FIELDS)
+    #
+    #    📝 Polja:
+    #       - model_label / object_id: Koji redak (npr. "Posts.PostModel", 42)
+    #       - status: pending / running / failed
+    #       - attempts: Broj dosadašnjih pokušaja
+    #       - last_error: Zadnja greška (za dijagnostiku)
+    #       - locked_at: Kad je worker preuzeo posao (za oporavak nakon pada worker-a)
+    #
+    #    🔒 Jedan posao po retku (unique) - nova slika prije obrade samo vraća posao u pending,
+    #       worker uvijek obrađuje TRENUTNU sliku retka
+    #
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Čeka"),
+        (RUNNING, "U obradi"),
+        (FAILED, "Neuspjelo"),
+    ]
+
+    model_label = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "ImageJob"
+        unique_together = ('model_label', 'object_id')  # 🔒 Jedan posao po retku
+        indexes = [
+            # ⚡ Worker: WHERE status = 'pending' ORDER BY id
+            models.Index(fields=["status", "id"], name="imagejob_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label}#{self.object_id} ({self.status})"
+
+
+class StoredFile(models.Model):
+    # 🔹 StoredFile - Datoteka u ContentAddressedStorage-u (ime = SHA-256 sadržaja)
+    #
+    #    📝 Polja:
+    #       - name: Ime u storage-u (npr. "posts/images/3f/a2/3fa2...e9.jpg")
+    #       - size: Veličina u bajtovima
+    #       - refcount: Koliko save() poziva dijeli ovu datoteku (delete() ga smanjuje)
+    #       - created_at: Vrijeme prvog upload-a
+    #
+    #    ⚠️ Datoteka se briše s diska tek kad refcount padne na 0
+    #
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "StoredFile"
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
@@ -0,0 +1,89 @@
+# 🇭🇷 Media/signals.py - Automatsko stavljanje nove slike u red za obradu i otpuštanje starih datoteka
+# ========================================================================================================
+# Svrha: Signali na registriranim modelima (IMAGE_FIELDS)
+#   - post_save → ImageJob za generiranje varijanti
+#   - zamjena slike / brisanje retka → stare datoteke se brišu nakon commit-a (Media/gc.py)
+#
+# 💼 Kako radi:
+#   - Spremanje bez promjene slike (npr. last_login, naslov objave) ne radi ništa
+#   - ImageJob se upisuje u istoj transakciji kao i redak:
+#       → rollback (npr. neuspjeli fan-out) ne ostavlja posao bez retka
+#       → zahtjev ne čeka Pillow - obradu radi: python manage.py process_image_jobs
+#   - post_init pamti ime učitane slike (bez upita); pre_save čita stare datoteke iz baze SAMO ako
+#     se ime slike promijenilo
+#   - pre_delete čita datoteke retka iz baze (jedan upit po obrisanom retku)
+# ========================================================================================================
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+
+from . import gc, images, jobs
+
+
+def remember_image(sender, instance, **kwargs):
+    # 🔹 remember_image() - post_init: ime slike kakvo je učitano iz baze (None ako je polje odgođeno)
+    field, _, _ = images.spec_for(sender)
+    value = instance.__dict__.get(field)
+    instance._media_loaded = getattr(value, "name", value)
+
+
+def collect_replaced(sender, instance, raw=False, update_fields=None, **kwargs):
+    # 🔹 collect_replaced() - pre_save: datoteke stare slike ako se slika mijenja
+    field, variants_field, _ = images.spec_for(sender)
+    instance._media_replaced = set()
+    if raw or instance._state.adding or (update_fields is not None and field not in update_fields):
+        return
+    if field not in instance.__dict__:
+        return  # 📎 Polje odgođeno (only/defer) i nije dodijeljeno → slika se nije mijenjala
+    current = getattr(instance, field).name
+    if current == getattr(instance, "_media_loaded", None):
+        return
+    previous = sender._base_manager.filter(pk=instance.pk).only("pk", field, variants_field).first()
+    if previous is not None:
+        instance._media_replaced = gc.referenced_names(previous)
+
+
+def enqueue_variants(sender, instance, update_fields=None, raw=False, **kwargs):
+    # 🔹 enqueue_variants() - post_save handler za modele iz IMAGE_FIELDS
+    if raw:
+        return  # 📦 loaddata - fixture-i se ne obrađuju
+    field, _, _ = images.spec_for(sender)
+
+    # 🗑️ Stara slika i njene varijante (osim ako ih redak i dalje koristi)
+    replaced = getattr(instance, "_media_replaced", set()) - gc.referenced_names(instance)
+    gc.release_on_commit(getattr(instance, field).storage, replaced)
+    instance._media_replaced = set()
+    instance._media_loaded = getattr(instance, field).name
+
+    if update_fields is not None and field not in update_fields:
+        return
+    if images.needs_variants(instance):
+        jobs.enqueue(sender, instance.pk)
+
+
+def collect_deleted(sender, instance, **kwargs):
+    # 🔹 collect_deleted() - pre_delete: datoteke retka kakve su U BAZI
+    #    📎 Objekt u memoriji može biti zastario (varijante upisuje worker UPDATE-om, mimo objekta)
+    field, variants_field, _ = images.spec_for(sender)
+    current = sender._base_manager.filter(pk=instance.pk).only("pk", field, variants_field).first()
+    instance._media_deleted = gc.referenced_names(current) if current is not None else set()
+
+
+def release_deleted(sender, instance, **kwargs):
+    # 🔹 release_deleted() - post_delete (i kaskadno): sve datoteke retka + posao obrade
+    from .models import ImageJob
+
+    field, _, _ = images.spec_for(sender)
+    names = getattr(instance, "_media_deleted", None)
+    gc.release_on_commit(getattr(instance, field).storage, gc.referenced_names(instance) if names is None else names)
+    ImageJob.objects.filter(model_label=sender._meta.label, object_id=instance.pk).delete()
+
+
+def connect():
+    # 🔹 connect() - Spaja handlere za svaki registrirani model (poziva MediaConfig.ready)
+    for model, _ in images.registered_models():
+        label = model._meta.label
+        post_init.connect(remember_image, sender=model, dispatch_uid=f"media_loaded_{label}")
+        pre_save.connect(collect_replaced, sender=model, dispatch_uid=f"media_replaced_{label}")
+        post_save.connect(enqueue_variants, sender=model, dispatch_uid=f"media_variants_{label}")
+        pre_delete.connect(collect_deleted, sender=model, dispatch_uid=f"media_collect_deleted_{label}")
+        post_delete.connect(release_deleted, sender=model, dispatch_uid=f"media_deleted_{label}")
@@ -0,0 +1,169 @@
+# 🇭🇷 Media/storage.py - Content-addressed storage s deduplikacijom i brojanjem referenci
+# ========================================================================================================
+# Svrha: Datoteke se imenuju po SHA-256 hashu sadržaja → isti bajtovi = ista datoteka na disku
+# Funkcionalnosti:
+#   - ContentAddressedStorage: FileSystemStorage koji pri save() računa hash i dijeli datoteke
+#   - StoredFile (Media/models.py): Broj referenci po datoteci (save = +1, delete = -1)
+#   - image_extension(): Stvarna ekstenzija uploada (umjesto uvijek .png)
+#   - is_content_addressed(): Je li ime hash (→ sadržaj se nikad ne mijenja, smije se cache-ati zauvijek)
+#   - save_alternate(): AVIF / WebP kopija datoteke pod istim hashom (<hash>.jpg → <hash>.avif)
+#
+# 📁 Raspored (sharding po prefiksu hasha):
+#   posts/images/3f/a2/3fa2...e9.jpg
+#   users/images/07/c1/07c1...4b.png
+#   - Najviše 256 × 256 poddirektorija po prostoru imena → listanje direktorija ostaje brzo
+#
+# ⚡ Zašto:
+#   - Repost iste slike / ponovni upload iste profilne slike više ne troši novi prostor na disku
+#   - Varijante iste slike (Media/images.py) su također identični bajtovi → dijele se
+#   - Ime se mijenja čim se sadržaj promijeni → Cache-Control: immutable (vidi Media/views.py)
+# ========================================================================================================
+
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from PIL import Image
+
+
+# 🧾 Kanonska ekstenzija po formatu (isti sadržaj uploadan kao .JPG / .jpeg / .png → isto ime)
+FORMAT_EXTENSIONS = {
+    "JPEG": ".jpg",
+    "MPO": ".jpg",   # 📱 Multi-picture JPEG (kamere mobitela) - Pillow ga prijavljuje kao MPO
+    "PNG": ".png",
+    "GIF": ".gif",
+    "WEBP": ".webp",
+    "AVIF": ".avif",
+    "BMP": ".bmp",
+    "TIFF": ".tiff",
+}
+
+# 🆕 Alternativni formati uz content-addressed datoteku, po prioritetu (Media/images.py, Media/views.py)
+ALTERNATE_TYPES = {
+    ".avif": "image/avif",
+    ".webp": "image/webp",
+}
+
+HASHED_NAME = re.compile(r"(?:^|/)(?P<a>[0-9a-f]{2})/(?P<b>[0-9a-f]{2})/(?P<digest>[0-9a-f]{64})\.[0-9a-z]+$")
+SHARD = re.compile(r"[0-9a-f]{2}")
+
+
+def image_extension(filename, default=".png"):
+    # 🔹 image_extension() - Ekstenzija uploadane slike (samo formati koje Pillow poznaje)
+    #    ⚠️ Nepoznata ekstenzija (npr. .html) → default, da se korisnički sadržaj ne servira kao HTML
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if ext in Image.registered_extensions() else default
+
+
+def is_content_addressed(name):
+    # 🔹 is_content_addressed() - Ime je oblika <a>/<b>/<hash>.<ext> i shard odgovara hashu
+    match = HASHED_NAME.search(name)
+    return bool(match) and match["digest"].startswith(match["a"] + match["b"])
+
+
+def alternate_name(name, ext):
+    # 🔹 alternate_name() - Ime alternative u drugom formatu ("ab/cd/<hash>.jpg" → "ab/cd/<hash>.webp")
+    return os.path.splitext(name)[0] + ext
+
+
+def _namespace(name):
+    # 🔹 _namespace() - Direktorij imena bez shard dijelova ("posts/images/3f/a2/x.jpg" → "posts/images")
+    parts = os.path.dirname(name).split("/")
+    if len(parts) >= 2 and all(SHARD.fullmatch(part) for part in parts[-2:]):
+        parts = parts[:-2]
+    return "/".join(parts)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    # 🔹 ContentAddressedStorage - Default storage za sve FileField/ImageField upload-e
+    #
+    #    💼 Kako radi save():
+    #       1. SHA-256 sadržaja (streaming, u chunk-ovima - bez učitavanja cijele datoteke)
+    #       2. Ime = <direktorij iz upload_to>/<hash[0:2]>/<hash[2:4]>/<hash><ekstenzija formata>
+    #       3. StoredFile red: novi → refcount 1 i zapiši datoteku; postojeći → refcount + 1
+    #
+    #    💼 Kako radi delete():
+    #       - refcount > 1 → samo refcount - 1 (netko drugi još koristi datoteku)
+    #       - zadnja referenca → obriši red, datoteku i njene alternative (save_alternate)
+    #       - Datoteke bez StoredFile reda (stari uploadi s uuid imenima) → obriši odmah
+    #
+    #    🔒 Brojač i datoteka mijenjaju se u istoj transakciji (select_for_update na Postgres-u,
+    #       write lock na SQLite-u) → paralelni save/delete istog sadržaja ne gube datoteku
+    #
+    def get_available_name(self, name, max_length=None):
+        # 📛 Konačno ime određuje hash u _save() - isto ime = isti sadržaj, nema sufiksa
+        return name
+
+    def _digest(self, content):
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def _extension(self, name, content):
+        # 🔹 _extension() - Ekstenzija po stvarnom formatu slike (Pillow čita samo zaglavlje)
+        #    💼 Nije slika / nepoznat format → ekstenzija iz imena
+        try:
+            content.seek(0)
+            with Image.open(content) as image:
+                fmt = image.format
+        except (OSError, ValueError, Image.DecompressionBombError):
+            fmt = None
+        finally:
+            content.seek(0)
+        return FORMAT_EXTENSIONS.get(fmt) or os.path.splitext(name)[1].lower()
+
+    def hashed_name(self, name, digest, ext):
+        return "/".join(filter(None, [_namespace(name), digest[:2], digest[2:4], f"{digest}{ext}"]))
+
+    def _write(self, name, content):
+        # 🔹 _write() - Zapisuje u privremenu datoteku pa atomski preimenuje (os.replace)
+        #    💼 Veliki uploadi (TemporaryUploadedFile) se premještaju, ne kopiraju (FileSystemStorage._save)
+        tmp_name = f"{os.path.dirname(name)}/.{uuid.uuid4().hex}.part"
+        tmp_name = super()._save(tmp_name, content)
+        os.replace(self.path(tmp_name), self.path(name))
+
+    def _save(self, name, content):
+        from .models import StoredFile
+
+        name = self.hashed_name(name, self._digest(content), self._extension(name, content))
+        with transaction.atomic():
+            stored, created = StoredFile.objects.select_for_update().get_or_create(
+                name=name, defaults={'size': content.size, 'refcount': 1}
+            )
+            if not created:
+                StoredFile.objects.filter(pk=stored.pk).update(refcount=F('refcount') + 1)
+            if created or not self.exists(name):
+                self._write(name, content)
+        return name
+
+    def save_alternate(self, name, ext, content):
+        # 🔹 save_alternate() - Sprema isti sadržaj u drugom formatu uz postojeću datoteku
+        #    💼 Alternativa nema svoj StoredFile red - živi dok i datoteka `name` (briše je delete())
+        #    📎 Hash u imenu je hash JPEG-a iz kojeg je nastala → ime je i dalje nepromjenjivo
+        alternate = alternate_name(name, ext)
+        if not self.exists(alternate):
+            self._write(alternate, content)
+        return alternate
+
+    def delete(self, name):
+        from .models import StoredFile
+
+        if not name:
+            raise ValueError("The name must be given to delete().")
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(name=name).first()
+            if stored is not None and stored.refcount > 1:
+                StoredFile.objects.filter(pk=stored.pk).update(refcount=F('refcount') - 1)
+                return
+            if stored is not None:
+                stored.delete()
+            super().delete(name)
+            if is_content_addressed(name):
+                for ext in ALTERNATE_TYPES:
+                    if alternate_name(name, ext) != name:
+                        super().delete(alternate_name(name, ext))
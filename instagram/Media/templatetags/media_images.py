@@ -0,0 +1,45 @@
+# 🇭🇷 Media/templatetags/media_images.py - Template filteri za responzivne slike
+# ========================================================================================================
+# 📝 Primjer:
+#   {% load media_images %}
+#   <img src="{{ post|variant_url:640 }}" srcset="{{ post|srcset }}" sizes="(max-width: 640px) 100vw, 600px">
+#   <img src="{{ user|variant_url:40 }}" srcset="{{ user|srcset }}" sizes="40px">
+#
+#   {% if post|image_processing %}<div class="...">⏳</div>{% else %}<img ...>{% endif %}
+#
+#   <img ... style="background: #efefef url('{{ post|placeholder }}') center / cover no-repeat;">
+#   ← LQIP se iscrta odmah (inline data URI), slika ga prekrije kad stigne
+#
+# ⚠️ Bez varijanti (default slika, neuspjela obrada) src je original, a srcset prazan
+# ========================================================================================================
+
+from django import template
+
+from Media import images
+
+
+register = template.Library()
+
+
+@register.filter
+def variant_url(instance, width):
+    # 🔹 variant_url - URL najmanje varijante široke barem `width` px
+    return images.variant_url(instance, int(width))
+
+
+@register.filter
+def srcset(instance):
+    # 🔹 srcset - Sve varijante s w-deskriptorima
+    return images.srcset(instance)
+
+
+@register.filter
+def image_processing(instance):
+    # 🔹 image_processing - True dok worker ne generira varijante nove slike
+    return images.is_processing(instance)
+
+
+@register.filter
+def placeholder(instance):
+    # 🔹 placeholder - LQIP data URI (~20px JPEG) ili "" ako još ne postoji
+    return images.placeholder(instance)
@@ -0,0 +1,459 @@
+import base64
+import io
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from Users.models import User
+from Posts.models import PostModel
+from . import images, jobs
+from .models import ImageJob, StoredFile
+from .uploads import upload_errors
+
+
+def image_bytes(fmt="JPEG", size=(400, 300), **options):
+    # 🖼️ Šum se loše komprimira → datoteka veća od jednog upload chunk-a (64KB)
+    image = Image.effect_noise(size, 60).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, quality=95, **options)
+    return buffer.getvalue()
+
+
+def use_temporary_media_root(testcase):
+    # 📁 Prazan MEDIA_ROOT za test (prava media/uploads/ se ne dira)
+    media_root = tempfile.TemporaryDirectory()
+    testcase.addCleanup(media_root.cleanup)
+    settings_override = override_settings(MEDIA_ROOT=media_root.name)
+    settings_override.enable()
+    testcase.addCleanup(settings_override.disable)
+
+
+class MediaRootTestCase(TestCase):
+    # 🔹 Svaki test dobije prazan MEDIA_ROOT i autora objava
+
+    def setUp(self):
+        use_temporary_media_root(self)
+        self.author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+
+    def _post(self, data, name="slika.jpg"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return PostModel.objects.create(
+                title="Objava", content="Sadržaj", author=self.author, post_image=SimpleUploadedFile(name, data)
+            )
+
+    def _refcount(self, name):
+        return StoredFile.objects.filter(name=name).values_list("refcount", flat=True).first()
+
+
+class VariantTests(MediaRootTestCase):
+    # 🔹 Varijante: širine se ne povećavaju iznad originala, srcset / variant_url biraju iz njih
+
+    def _render(self, template, **context):
+        return Template("{% load media_images %}" + template).render(Context(context))
+
+    def test_post_variants_and_srcset(self):
+        post = self._post(image_bytes(size=(800, 600)))
+        images.generate(PostModel, post.pk)
+        post.refresh_from_db()
+
+        sizes = post.image_variants["sizes"]
+        self.assertEqual(
+            {label: variant[1:] for label, variant in sizes.items()},
+            {"w320": [320, 240], "w640": [640, 480], "w1080": [800, 600]},  # 📏 1080 → original (800px)
+        )
+        with default_storage.open(sizes["w320"][0]) as variant, Image.open(variant) as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (320, 240)))
+
+        url = {label: default_storage.url(variant[0]) for label, variant in sizes.items()}
+        self.assertEqual(
+            self._render("{{ post|srcset }}", post=post),
+            f"{url['w320']} 320w, {url['w640']} 640w, {url['w1080']} 800w",
+        )
+        self.assertEqual(self._render("{{ post|variant_url:400 }}", post=post), url["w640"])
+        self.assertEqual(self._render("{{ post|variant_url:2000 }}", post=post), url["w1080"])
+
+    def test_small_avatar_shares_one_file_for_equal_sizes(self):
+        self.author.profile_image = SimpleUploadedFile("avatar.png", image_bytes("PNG", size=(120, 90)))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.save()
+        images.generate(User, self.author.pk)
+        self.author.refresh_from_db()
+
+        sizes = self.author.profile_image_variants["sizes"]
+        self.assertEqual({label: variant[1:] for label, variant in sizes.items()}, {
+            "s40": [40, 40], "s80": [80, 80], "s150": [90, 90], "s300": [90, 90],
+        })
+        self.assertEqual(sizes["s150"][0], sizes["s300"][0])
+        self.assertEqual(images.srcset(self.author).count("w"), 3)
+
+    def test_without_variants_falls_back_to_original(self):
+        post = PostModel.objects.create(title="Objava", content="Sadržaj", author=self.author)
+        self.assertEqual(self._render("{{ post|srcset }}", post=post), "")
+        self.assertEqual(self._render("{{ post|variant_url:320 }}", post=post), post.post_image.url)
+
+
+class ImageJobTests(MediaRootTestCase):
+    # 🔹 Red poslova: claim preuzima svaki posao samo jednom, greška → ponovni pokušaj, zatim failed
+
+    def _job(self, post):
+        return ImageJob.objects.get(model_label="Posts.PostModel", object_id=post.pk)
+
+    def test_save_enqueues_one_job_per_row(self):
+        post = self._post(image_bytes(size=(64, 48)))
+        self.assertEqual(self._job(post).status, ImageJob.PENDING)
+        self.assertTrue(images.is_processing(post))
+
+        post.title = "Novi naslov"
+        post.save()  # 📝 Slika se nije mijenjala → nema novog posla
+        self.assertEqual(ImageJob.objects.count(), 1)
+
+    def test_claim_takes_each_job_once_oldest_first(self):
+        first, second = self._post(image_bytes(size=(64, 48))), self._post(image_bytes(size=(32, 24)))
+
+        claimed = [jobs.claim(), jobs.claim(), jobs.claim()]
+        self.assertEqual([job.object_id for job in claimed[:2]], [first.pk, second.pk])
+        self.assertIsNone(claimed[2])
+        job = self._job(first)
+        self.assertEqual((job.status, job.attempts), (ImageJob.RUNNING, 1))
+        self.assertIsNotNone(job.locked_at)
+
+    def test_run_deletes_job_and_writes_variants(self):
+        post = self._post(image_bytes(size=(64, 48)))
+        self.assertTrue(jobs.run(jobs.claim()))
+        self.assertFalse(ImageJob.objects.exists())
+        post.refresh_from_db()
+        self.assertFalse(images.is_processing(post))
+        self.assertEqual(post.image_variants["sizes"]["w320"][1:], [64, 48])
+
+    def test_failure_retries_then_gives_up(self):
+        post = self._post(image_bytes(size=(64, 48)))
+        with mock.patch.object(images, "generate", side_effect=RuntimeError("pukla obrada")), \
+                self.assertLogs("Media.jobs", "ERROR"):
+            for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+                job = jobs.claim()
+                self.assertEqual(job.attempts, attempt)
+                self.assertFalse(jobs.run(job))
+
+                job.refresh_from_db()
+                self.assertIn("pukla obrada", job.last_error)
+                self.assertIsNone(job.locked_at)
+                expected = ImageJob.FAILED if attempt == jobs.MAX_ATTEMPTS else ImageJob.PENDING
+                self.assertEqual(job.status, expected)
+
+        self.assertIsNone(jobs.claim())  # 🛑 Failed se više ne preuzima
+        post.refresh_from_db()
+        self.assertEqual(post.image_variants, {"src": post.post_image.name, "sizes": {}})
+        self.assertFalse(images.is_processing(post))  # 🖼️ Template prikazuje original
+
+    def test_requeue_stale_only_touches_old_running_jobs(self):
+        stale, fresh = self._post(image_bytes(size=(64, 48))), self._post(image_bytes(size=(32, 24)))
+        jobs.claim(), jobs.claim()
+        ImageJob.objects.filter(object_id=stale.pk).update(locked_at=timezone.now() - timedelta(seconds=700))
+
+        self.assertEqual(jobs.requeue_stale(600), 1)
+        self.assertEqual(
+            (self._job(stale).status, self._job(stale).locked_at, self._job(fresh).status),
+            (ImageJob.PENDING, None, ImageJob.RUNNING),
+        )
+        self.assertEqual(jobs.claim().object_id, stale.pk)
+
+
+class ProcessImageJobsCommandTests(TransactionTestCase):
+    # 🔹 process_image_jobs: worker nit (sa svojom konekcijom, zato TransactionTestCase) isprazni red i završi
+
+    def test_workers_drain_the_queue(self):
+        use_temporary_media_root(self)
+        author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+        posts = [
+            PostModel.objects.create(
+                title="Objava", content="Sadržaj", author=author,
+                post_image=SimpleUploadedFile("slika.jpg", image_bytes(size=(64, 48 + i))),
+            )
+            for i in range(3)
+        ]
+        output = StringIO()
+        call_command("process_image_jobs", "--workers", "1", stdout=output)
+
+        self.assertIn("Obrađeno: 3, neuspjelo: 0", output.getvalue())
+        self.assertFalse(ImageJob.objects.exists())
+        for post in posts:
+            post.refresh_from_db()
+            self.assertFalse(images.is_processing(post))
+
+
+class ContentAddressedStorageTests(MediaRootTestCase):
+    # 🔹 Isti bajtovi = jedna datoteka; datoteka živi dok je drži barem jedan redak
+
+    def test_same_bytes_share_one_file(self):
+        data = image_bytes(size=(64, 48))
+        first, second = self._post(data, "a.JPEG"), self._post(data, "b.png")
+        name = first.post_image.name
+        self.assertEqual(second.post_image.name, name)
+        self.assertRegex(name, r"^posts/images/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$")
+        self.assertEqual(self._refcount(name), 2)
+        self.assertEqual(StoredFile.objects.count(), 1)
+
+    def test_file_survives_until_last_owner_is_gone(self):
+        data = image_bytes(size=(64, 48))
+        first, second = self._post(data), self._post(data)
+        name = first.post_image.name
+        alternates = [default_storage.save_alternate(name, ext, ContentFile(b"alt")) for ext in (".avif", ".webp")]
+
+        # 🔁 Zamjena slike jednog vlasnika → drugi je i dalje drži
+        first.post_image = SimpleUploadedFile("nova.jpg", image_bytes(size=(32, 32)))
+        with self.captureOnCommitCallbacks(execute=True):
+            first.save()
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(self._refcount(name), 1)
+
+        # 🗑️ Zadnji vlasnik obrisan → datoteka i AVIF / WebP alternative idu s diska, nova slika ostaje
+        replacement = first.post_image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(default_storage.exists(name))
+        self.assertIsNone(self._refcount(name))
+        for alternate in alternates:
+            self.assertFalse(default_storage.exists(alternate))
+        self.assertTrue(default_storage.exists(replacement))
+
+    def test_rollback_keeps_file(self):
+        post = self._post(image_bytes(size=(64, 48)))
+        name = post.post_image.name
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            post.delete()
+        self.assertEqual(len(callbacks), 1)  # 📎 Briše se tek nakon commit-a
+        self.assertTrue(default_storage.exists(name))
+
+
+class UploadHandlerTests(TestCase):
+    # 🔹 ImageUploadHandler provjerava zaglavlje dok se datoteka prima (FILE_UPLOAD_HANDLERS)
+
+    def _upload(self, name, data):
+        request = RequestFactory().post("/create/", {"post_image": SimpleUploadedFile(name, data)})
+        return upload_errors(request), request.FILES
+
+    def test_multi_picture_jpeg_from_phone_is_accepted(self):
+        second = Image.new("RGB", (400, 300), "blue")
+        data = image_bytes("MPO", save_all=True, append_images=[second])
+        self.assertEqual(Image.open(io.BytesIO(data)).format, "MPO")
+        self.assertGreater(len(data), 64 * 1024)
+
+        errors, files = self._upload("IMG_0001.JPG", data)
+        self.assertEqual(errors, {})
+        self.assertEqual(files["post_image"].read(), data)
+
+    def test_non_image_is_rejected(self):
+        errors, files = self._upload("slika.jpg", b"<html>" + b"x" * 1024)
+        self.assertEqual(errors, {"post_image": "Datoteka nije podržana slika."})
+
+
+class ServeTests(MediaRootTestCase):
+    # 🔹 GET /media/<ime>: Range, If-Range, ETag / 304, HEAD i offload na nginx / Apache
+
+    def setUp(self):
+        super().setUp()
+        self.data = image_bytes(size=(64, 48))
+        self.name = default_storage.save("posts/images/slika.jpg", ContentFile(self.data))
+        self.url = f"/media/{self.name}"
+
+    def _get(self, **headers):
+        return self.client.get(self.url, headers=headers)
+
+    def _body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_full_response_headers(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._body(response), self.data)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["ETag"], f'"{os.path.basename(self.name)}"')
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+
+        head = self.client.head(self.url)
+        self.assertEqual((head.status_code, head["Content-Length"]), (200, str(len(self.data))))
+
+    def test_single_and_suffix_ranges(self):
+        size = len(self.data)
+        for header, (start, end) in {
+            "bytes=0-9": (0, 9),
+            "bytes=10-": (10, size - 1),
+            "bytes=-5": (size - 5, size - 1),
+            f"bytes=100-{size * 2}": (100, size - 1),  # ✂️ Kraj iza datoteke se skraćuje
+        }.items():
+            response = self._get(Range=header)
+            self.assertEqual(response.status_code, 206, header)
+            self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{size}")
+            self.assertEqual(self._body(response), self.data[start:end + 1])
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        size = len(self.data)
+        response = self._get(Range=f"bytes={size}-")
+        self.assertEqual((response.status_code, response["Content-Range"]), (416, f"bytes */{size}"))
+
+        self.assertEqual(self._get(Range="bytes=-0").status_code, 416)
+
+        for header in ("bytes=10-5", "bytes=0-1,5-9", "items=0-9", "bytes=-"):
+            response = self._get(Range=header)
+            self.assertEqual((response.status_code, self._body(response)), (200, self.data), header)
+
+    def test_if_range(self):
+        etag = self._get()["ETag"]
+        self.assertEqual(self._get(Range="bytes=0-9", If_Range=etag).status_code, 206)
+        stale = self._get(Range="bytes=0-9", If_Range='"staro.jpg"')
+        self.assertEqual((stale.status_code, self._body(stale)), (200, self.data))
+        stale_date = self._get(Range="bytes=0-9", If_Range="Mon, 01 Jan 2001 00:00:00 GMT")
+        self.assertEqual(stale_date.status_code, 200)
+
+    def test_conditional_requests(self):
+        first = self._get()
+        for headers in ({"If-None-Match": first["ETag"]}, {"If-Modified-Since": first["Last-Modified"]}):
+            response = self._get(**headers)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], first["ETag"])
+        self.assertEqual(self._get(**{"If-None-Match": '"drugo.jpg"'}).status_code, 200)
+
+    def test_legacy_name_revalidates(self):
+        with default_storage.open(self.name) as source, open(default_storage.path("stara.jpg"), "wb") as target:
+            target.write(source.read())
+        response = self.client.get("/media/stara.jpg")
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+        self.assertRegex(response["ETag"], r'^"[0-9a-f]+-[0-9a-f]+"$')
+        self.assertEqual(self.client.get("/media/../settings.py").status_code, 404)
+
+    def test_offload_headers(self):
+        with override_settings(MEDIA_SENDFILE="x-accel-redirect", MEDIA_ACCEL_REDIRECT_PREFIX="/_protected_media/"):
+            response = self._get(Range="bytes=0-9")
+        self.assertEqual((response.status_code, response.content), (200, b""))
+        self.assertEqual(response["X-Accel-Redirect"], f"/_protected_media/{self.name}")
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+
+        with override_settings(MEDIA_SENDFILE="x-sendfile"):
+            response = self._get()
+        self.assertEqual(response["X-Sendfile"], os.path.abspath(default_storage.path(self.name)))
+
+
+class NegotiationTests(MediaRootTestCase):
+    # 🔹 <hash>.jpg + <hash>.avif / .webp: format po Accept, Vary: Accept i zaseban ETag po formatu
+
+    def setUp(self):
+        super().setUp()
+        self.name = default_storage.save("posts/images/slika.jpg", ContentFile(image_bytes(size=(64, 48))))
+        for ext in (".avif", ".webp"):
+            default_storage.save_alternate(self.name, ext, ContentFile(ext.encode()))
+        self.url = f"/media/{self.name}"
+
+    def _get(self, accept):
+        response = self.client.get(self.url, headers={"Accept": accept})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_format_follows_accept(self):
+        stem = os.path.splitext(os.path.basename(self.name))[0]
+        for accept, (content_type, ext) in {
+            "image/avif,image/webp,image/apng,*/*;q=0.8": ("image/avif", ".avif"),
+            "image/webp,*/*": ("image/webp", ".webp"),
+            "image/avif;q=0, image/webp;q=0.5": ("image/webp", ".webp"),
+            "*/*": ("image/jpeg", ".jpg"),
+            "image/*,*/*;q=0.8": ("image/jpeg", ".jpg"),
+            "": ("image/jpeg", ".jpg"),
+        }.items():
+            response = self._get(accept)
+            self.assertEqual(response["Content-Type"], content_type, accept)
+            self.assertEqual(response["Vary"], "Accept")
+            self.assertEqual(response["ETag"], f'"{stem}{ext}"')
+
+    def test_etag_matches_only_its_format(self):
+        avif = self._get("image/avif")["ETag"]
+        response = self.client.get(self.url, headers={"Accept": "image/avif", "If-None-Match": avif})
+        self.assertEqual((response.status_code, response["Vary"]), (304, "Accept"))
+        self.assertEqual(self.client.get(self.url, headers={"Accept": "*/*", "If-None-Match": avif}).status_code, 200)
+
+    def test_no_vary_without_alternates(self):
+        name = default_storage.save("posts/images/druga.jpg", ContentFile(image_bytes(size=(32, 24))))
+        response = self.client.get(f"/media/{name}", headers={"Accept": "image/avif,image/webp"})
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertFalse(response.has_header("Vary"))
+
+
+class GarbageCollectionTests(MediaRootTestCase):
+    # 🔹 gc_media briše samo siročad starija od --min-age
+
+    def _file(self, name, age):
+        name = default_storage.save(name, ContentFile(image_bytes(size=(8, 8 + len(name)))))
+        old = time.time() - age
+        os.utime(default_storage.path(name), (old, old))
+        return name
+
+    def test_sweep_spares_referenced_and_recent_files(self):
+        post = self._post(image_bytes(size=(64, 48)))
+        referenced = post.post_image.name
+        os.utime(default_storage.path(referenced), (time.time() - 7200,) * 2)
+        orphan = self._file("posts/images/siroce.jpg", age=7200)
+        recent = self._file("posts/images/novo.jpg", age=0)
+
+        call_command("gc_media", "--min-age", "3600", stdout=StringIO())
+
+        self.assertTrue(default_storage.exists(referenced))
+        self.assertTrue(default_storage.exists(recent))
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertIsNone(self._refcount(orphan))
+        self.assertEqual(self._refcount(referenced), 1)
+        self.assertFalse(os.path.exists(os.path.dirname(default_storage.path(orphan))))  # 🧹 Prazan shard
+
+    def test_dry_run_deletes_nothing(self):
+        orphan = self._file("posts/images/siroce.jpg", age=7200)
+        call_command("gc_media", "--min-age", "3600", "--dry-run", stdout=StringIO())
+        self.assertTrue(default_storage.exists(orphan))
+
+
+class PlaceholderTests(MediaRootTestCase):
+    # 🔹 LQIP: mali JPEG kao data URI u JSON-u varijanti; bez varijanti filter vraća ""
+
+    PREFIX = "data:image/jpeg;base64,"
+
+    def _placeholder(self, post):
+        return Template("{% load media_images %}{{ post|placeholder }}").render(Context({"post": post}))
+
+    def test_placeholder_is_small_inline_jpeg(self):
+        post = self._post(image_bytes(size=(800, 400)))
+        self.assertEqual(self._placeholder(post), "")  # ⏳ Još u redu za obradu
+        images.generate(PostModel, post.pk)
+        post.refresh_from_db()
+
+        uri = self._placeholder(post)
+        self.assertTrue(uri.startswith(self.PREFIX))
+        data = base64.b64decode(uri[len(self.PREFIX):], validate=True)
+        self.assertLess(len(data), 1024)
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (images.PLACEHOLDER_SIZE, 10)))
+
+    def test_stale_variants_and_default_image_have_none(self):
+        post = self._post(image_bytes(size=(64, 48)))
+        images.generate(PostModel, post.pk)
+        PostModel.objects.filter(pk=post.pk).update(post_image="posts/images/druga.jpg")
+        post.refresh_from_db()
+        self.assertEqual(self._placeholder(post), "")
+        self.assertEqual(self._placeholder(PostModel(author=self.author)), "")
+
+    def test_backfill_command(self):
+        post = self._post(image_bytes(size=(64, 48)))
+        data = images.generate(PostModel, post.pk)
+        del data["placeholder"]
+        PostModel.objects.filter(pk=post.pk).update(image_variants=data)
+
+        call_command("build_placeholders", stdout=StringIO())
+        post.refresh_from_db()
+        self.assertTrue(images.placeholder(post).startswith(self.PREFIX))
@@ -0,0 +1,136 @@
+# 🇭🇷 Media/uploads.py - Upload handler koji odbija prevelike / neispravne slike DOK se primaju
+# ========================================================================================================
+# Svrha: Provjera limita i formata slike za vrijeme streaminga, a ne nakon što je cijela datoteka primljena
+#
+# ⚡ Zašto:
+#   - PostForm.clean_post_image i validate_size vide sliku tek kad ju je Django već primio i spremio
+#     u temp datoteku (50MB+ upload = worker zauzet i disk pun dok forma ne javi grešku)
+#   - Ovaj handler prekida zahtjev čim je limit prekoračen (StopUpload(connection_reset=True))
+#     → ostatak tijela se ni ne čita
+#
+# 🛡️ Provjere (po polju, vidi field_limits()):
+#   1. Content-Length cijelog zahtjeva > max_request_size() → 413 bez čitanja tijela (Media/middleware.py)
+#   2. Primljeni bajtovi > limit polja (post_image: POST_IMAGE_MAX_SIZE, profile_image: PROFILE_IMAGE_MAX_SIZE)
+#   3. Zaglavlje slike (Pillow čita samo header iz prvih chunk-ova):
+#        - nije slika / nepodržan format → odbij
+#        - širina × visina > IMAGE_MAX_PIXELS → odbij (decompression bomb)
+#
+# 📤 Greške se zapisuju u request.upload_errors = {'post_image': 'poruka', ...}
+#    Pogledi ih prikazuju kroz add_upload_errors(form, request) ili status 413
+# ========================================================================================================
+
+import io
+import warnings
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from PIL import Image
+
+from .storage import FORMAT_EXTENSIONS
+
+
+# 🔍 Koliko bajtova smije proći prije nego Pillow prepozna zaglavlje (JPEG s velikim EXIF-om ~64KB+)
+SNIFF_LIMIT = 512 * 1024
+
+
+def field_limits():
+    # 🔹 field_limits() - Maksimalna veličina (bajtovi) po imenu polja s datotekom
+    return {
+        'post_image': settings.POST_IMAGE_MAX_SIZE,
+        'profile_image': settings.PROFILE_IMAGE_MAX_SIZE,
+    }
+
+
+def max_request_size():
+    # 🔹 max_request_size() - Najveće dozvoljeno tijelo multipart zahtjeva (najveća slika + ostala polja)
+    return max(field_limits().values()) + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+
+
+def size_message(limit):
+    # 🔹 size_message() - Ista poruka za handler, PostForm i validate_size
+    return f"Slika je prevelika! Maksimalno {limit / (1024 * 1024):g}MB."
+
+
+def upload_errors(request):
+    # 🔹 upload_errors() - Greške koje je handler zabilježio za ovaj zahtjev ({} ako ih nema)
+    #    📎 request.FILES pokreće parsiranje tijela (handler se izvršava tek tada)
+    request.FILES
+    return getattr(request, 'upload_errors', None) or {}
+
+
+def add_upload_errors(form, request):
+    # 🔹 add_upload_errors() - Prenosi greške handlera u formu (polje ili non-field greška)
+    #    📤 Vraća: True ako je bilo grešaka
+    errors = upload_errors(request)
+    for field, message in errors.items():
+        form.add_error(field if field in form.fields else None, message)
+    return bool(errors)
+
+
+class ImageUploadHandler(FileUploadHandler):
+    # 🔹 ImageUploadHandler - Prvi u FILE_UPLOAD_HANDLERS; propušta chunk-ove dalje (Memory/TemporaryFile)
+    #
+    #    💼 Kako radi:
+    #       - Polja koja nisu u field_limits() prolaze netaknuta
+    #       - Za praćena polja broji bajtove i skuplja početak datoteke dok Pillow ne prepozna zaglavlje
+    #       - Prva povreda limita → zabilježi grešku i prekini upload bez čitanja ostatka
+    #
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.limit = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.limit = field_limits().get(field_name)
+        self.received = 0
+        self.head = b""
+        self.sniffed = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.limit is None:
+            return raw_data
+
+        self.received += len(raw_data)
+        if self.received > self.limit:
+            self._reject(size_message(self.limit))
+        if not self.sniffed:
+            self.head += raw_data
+            self._sniff()
+        return raw_data
+
+    def file_complete(self, file_size):
+        # 📎 Datoteku gradi sljedeći handler; ovdje samo bilježimo male datoteke čije zaglavlje nije slika
+        #    (sve je već primljeno pa nema smisla prekidati - pogled odbija zahtjev zbog greške)
+        if self.limit is not None and not self.sniffed:
+            self._record(self.field_name, "Datoteka nije podržana slika.")
+        return None
+
+    def _sniff(self):
+        # 🔹 _sniff() - Pokušava pročitati zaglavlje slike iz dosad primljenih bajtova
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+                with Image.open(io.BytesIO(self.head)) as image:
+                    fmt, (width, height) = image.format, image.size
+        except Image.DecompressionBombError:
+            self._reject("Slika ima previše piksela.")
+        except (OSError, ValueError, SyntaxError):
+            if len(self.head) >= SNIFF_LIMIT:
+                self._reject("Datoteka nije podržana slika.")
+            return  # ⏳ Još nema dovoljno podataka za zaglavlje
+
+        if fmt not in FORMAT_EXTENSIONS:
+            self._reject("Datoteka nije podržana slika.")
+        if width * height > settings.IMAGE_MAX_PIXELS:
+            self._reject(f"Slika ima previše piksela ({width}×{height}).")
+        self.sniffed = True
+        self.head = b""
+
+    def _record(self, field, message):
+        errors = upload_errors(self.request)
+        errors[field] = message
+        self.request.upload_errors = errors
+
+    def _reject(self, message):
+        self._record(self.field_name, message)
+        raise StopUpload(connection_reset=True)
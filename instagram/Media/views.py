@@ -0,0 +1,227 @@
+# 🇭🇷 Media/views.py - Serviranje upload-anih datoteka (i u produkciji, ne samo uz DEBUG)
+# ========================================================================================================
+# Svrha: Zamjena za django.views.static.serve koja je sigurna i brza i za velike slike
+#
+# ⚡ Cache:
+#   - Content-addressed imena (<ab>/<cd>/<sha256>.<ext>): sadržaj se NIKAD ne mijenja
+#     → Cache-Control: public, max-age=1 godina, immutable (preglednik ne šalje ni revalidaciju)
+#   - Ostala imena (egg.png, stari uuid uploadi): kratki cache + revalidacija
+#   - ETag (ime s hashom ili mtime-veličina) + Last-Modified → If-None-Match / If-Modified-Since = 304
+#
+# 🆕 Format po Accept zaglavlju (varijante iz Media/images.py):
+#   - URL u HTML-u je uvijek <hash>.jpg; ako uz njega postoji <hash>.avif / <hash>.webp i preglednik
+#     ih izričito navodi u Accept (image/avif, image/webp), šalje se manji format
+#   - "*/*" i "image/*" se ne računaju - stari preglednici šalju to i ne znaju dekodirati AVIF
+#   - Vary: Accept → cache (preglednik, CDN) čuva zasebnu kopiju po formatu
+#
+# 📦 Slanje sadržaja (MEDIA_SENDFILE u settings.py):
+#   - "x-accel-redirect": nginx šalje datoteku (MEDIA_ACCEL_REDIRECT_PREFIX = internal location)
+#   - "x-sendfile": Apache mod_xsendfile / lighttpd šalju datoteku po apsolutnoj putanji
+#   - None: FileResponse nad otvorenom datotekom → WSGI server koristi wsgi.file_wrapper (sendfile),
+#     sadržaj nikad ne prolazi kroz Python stringove
+#
+# ✂️ Range (samo kod FileResponse - nginx/Apache sami obrađuju Range kod offload-a):
+#   - "bytes=0-1023", "bytes=500-", "bytes=-500" → 206 + Content-Range
+#   - If-Range koji ne odgovara ETag-u/Last-Modified → cijela datoteka (200)
+#   - Početak iza kraja datoteke → 416; neispravan raspon ("bytes=10-5") ili više raspona odjednom
+#     → zaglavlje se ignorira i šalje se cijela datoteka (RFC 9110)
+# ========================================================================================================
+
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from .storage import ALTERNATE_TYPES, alternate_name, is_content_addressed
+
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=3600"
+
+# 📏 Blok čitanja kad WSGI server nema wsgi.file_wrapper (Django default je 4KB)
+BLOCK_SIZE = 64 * 1024
+
+RANGE = re.compile(r"^bytes=(?P<start>\d*)-(?P<end>\d*)$")
+
+
+class _RangeFile:
+    # 🔹 _RangeFile - Otvorena datoteka ograničena na [start, start + length)
+    #    📎 Namjerno bez fileno()/tell() - file_wrapper tada čita blokove umjesto sendfile do kraja datoteke
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _resolve(path, document_root):
+    # 🔹 _resolve() - Apsolutna putanja datoteke unutar document_root (ili 404)
+    #    ⚠️ "../", skrivene datoteke (.part od storage-a) i direktoriji se ne serviraju
+    path = posixpath.normpath(path).lstrip("/")
+    if any(part.startswith(".") for part in path.split("/")):
+        raise Http404("Datoteka ne postoji.")
+    try:
+        fullpath = safe_join(document_root or settings.MEDIA_ROOT, path)
+        st = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404("Datoteka ne postoji.")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("Datoteka ne postoji.")
+    return path, fullpath, st
+
+
+def _accepted_types(request):
+    # 🔹 _accepted_types() - Skup MIME tipova koje Accept izričito navodi s q > 0
+    accepted = set()
+    for item in request.META.get("HTTP_ACCEPT", "").split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        quality = next((param[2:] for param in params if param.startswith("q=")), "1")
+        try:
+            if float(quality) > 0:
+                accepted.add(media_type.lower())
+        except ValueError:
+            continue
+    return accepted
+
+
+def _negotiate(request, path, fullpath, st):
+    # 🔹 _negotiate() - Bira AVIF / WebP alternativu ako postoji i preglednik je prihvaća
+    #    📤 Vraća: (path, fullpath, st, vary) - vary=True ako datoteka ima alternative
+    if not is_content_addressed(path) or os.path.splitext(path)[1] in ALTERNATE_TYPES:
+        return path, fullpath, st, False
+
+    accepted = None
+    vary = False
+    for ext, content_type in ALTERNATE_TYPES.items():
+        try:
+            alternate_st = os.stat(alternate_name(fullpath, ext))
+        except OSError:
+            continue
+        vary = True
+        accepted = _accepted_types(request) if accepted is None else accepted
+        if content_type in accepted:
+            return alternate_name(path, ext), alternate_name(fullpath, ext), alternate_st, True
+    return path, fullpath, st, vary
+
+
+def _etag(path, st):
+    # 🔹 _etag() - Jaki ETag: ime content-addressed datoteke (<hash>.<ext>), inače mtime + veličina
+    #    📎 Ekstenzija je dio ETag-a - JPEG i AVIF istog hasha su različite reprezentacije
+    if is_content_addressed(path):
+        return quote_etag(posixpath.basename(path))
+    return quote_etag(f"{st.st_mtime_ns:x}-{st.st_size:x}")
+
+
+def _byte_range(request, size, etag, last_modified):
+    # 🔹 _byte_range() - (start, end) iz Range zaglavlja, None = cijela datoteka, False = 416
+    header = request.META.get("HTTP_RANGE", "").strip()
+    match = RANGE.match(header)
+    if not match or size == 0:
+        return None
+
+    # 🔄 If-Range: raspon vrijedi samo ako se datoteka nije promijenila (inače šalji cijelu)
+    if_range = request.META.get("HTTP_IF_RANGE", "").strip()
+    if if_range:
+        if if_range.startswith('"'):
+            if if_range != etag:
+                return None
+        elif parse_http_date_safe(if_range) != last_modified:
+            return None
+
+    start, end = match["start"], match["end"]
+    if not start and not end:
+        return None
+    if not start:
+        # "bytes=-500" → zadnjih 500 bajtova ("bytes=-0" je nezadovoljiv)
+        if int(end) == 0:
+            return False
+        return max(size - int(end), 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None  # 📎 "bytes=10-5" je neispravan raspon → zaglavlje se ignorira (RFC 9110)
+    if start >= size:
+        return False
+    return start, min(int(end), size - 1) if end else size - 1
+
+
+def _offload(path, fullpath, content_type):
+    # 🔹 _offload() - Prazan odgovor; web server šalje datoteku (uključujući Range)
+    backend = settings.MEDIA_SENDFILE
+    response = HttpResponse(content_type=content_type)
+    if backend == "x-accel-redirect":
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + path
+    elif backend == "x-sendfile":
+        response["X-Sendfile"] = os.path.abspath(fullpath)
+    else:
+        return None
+    return response
+
+
+@require_safe
+def serve(request, path, document_root=None):
+    # 🔹 serve() - Vraća datoteku iz MEDIA_ROOT (GET/HEAD)
+    #    📤 Vraća: 200 / 206 / 304 / 412 / 416
+    path, fullpath, st = _resolve(path, document_root)
+    path, fullpath, st, vary = _negotiate(request, path, fullpath, st)
+    etag = _etag(path, st)
+    last_modified = int(st.st_mtime)
+    validators = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": IMMUTABLE if is_content_addressed(path) else REVALIDATE,
+    }
+    if vary:
+        validators["Vary"] = "Accept"
+
+    # 1️⃣ If-None-Match / If-Modified-Since (i If-Match / If-Unmodified-Since) → 304 / 412
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        for header, value in validators.items():
+            conditional[header] = value
+        return conditional
+
+    content_type = mimetypes.guess_type(fullpath)[0] or "application/octet-stream"
+
+    # 2️⃣ Offload na nginx / Apache ako je konfiguriran
+    response = _offload(path, fullpath, content_type)
+
+    # 3️⃣ Inače FileResponse (cijela datoteka ili raspon)
+    if response is None:
+        byte_range = _byte_range(request, st.st_size, etag, last_modified)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{st.st_size}"
+        elif byte_range is None:
+            response = FileResponse(open(fullpath, "rb"), content_type=content_type)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(
+                _RangeFile(open(fullpath, "rb"), start, length), status=206, content_type=content_type
+            )
+            response["Content-Length"] = length
+            response["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+        response.block_size = BLOCK_SIZE
+        response["Accept-Ranges"] = "bytes"
+
+    for header, value in validators.items():
+        response[header] = value
+    return response
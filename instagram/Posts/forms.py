@@ -7,10 +7,13 @@
 #   - post_image: Slika objave (s custom validacijom veličine)
 #
 # 🛡️ Validacija:
-#   - clean_post_image(): Proverava da slika nije veća od 50MB
+#   - clean_post_image(): Proverava da slika nije veća od POST_IMAGE_MAX_SIZE (50MB)
 # ========================================================================================================
 
 from django import forms
+from django.conf import settings
+
+from Media.uploads import size_message
 from .models import PostModel
 
 from django.core.exceptions import ValidationError
@@ -37,11 +40,12 @@ class PostForm(forms.ModelForm):
         #    💼 Kako radi:
         #       - Dohvaća slike iz cleaned_data
         #       - Ako ima file attribute (tj. ako je uploaded), proverava veličinu
-        #       - Max 50MB = 50 * 1024 * 1024 bajtova
+        #       - Max settings.POST_IMAGE_MAX_SIZE (50MB)
+        #       - Prevelike upload-e obično već prekine Media.uploads.ImageUploadHandler dok se primaju;
+        #         ova provjera ostaje za datoteke koje ne dolaze kroz multipart (npr. testovi, admin skripte)
         #    
         #    ⚠️ Baca iznimku:
-        #       - "Slika je prevelika! Maksimalna dozvoljena veličina je 1MB."
-        #       - (Note: Poruka kaže 1MB ali je limit zapravo 50MB - trebam ispraviti)
+        #       - "Slika je prevelika! Maksimalno 50MB."
         #    
         #    📤 Vraća:
         #       - image: Cleaned slika (ili None)
@@ -49,9 +53,8 @@ class PostForm(forms.ModelForm):
         image = self.cleaned_data.get('post_image')
         
         if image and hasattr(image, 'size'):
-            # 5MB = 5 * 1024 * 1024 bytes
-            max_size = 50 * 1024 * 1024  # 50MB
+            max_size = settings.POST_IMAGE_MAX_SIZE
             if image.size > max_size:
-                raise ValidationError("Slika je prevelika! Maksimalna dozvoljena veličina je 1MB.")
+                raise ValidationError(size_message(max_size))
         
         return image
@@ -0,0 +1,118 @@
+# 🇭🇷 Posts/management/commands/bench_timeline.py - Benchmark home feeda: push vs pull vs hibrid
+# ========================================================================================================
+# Svrha: Usporedba troška pisanja (fan-out) i čitanja (home feed) za tri strategije
+#
+# Kako radi:
+#   1. Kreira privremenu bazu (prava db.sqlite3 se ne dira)
+#   2. Generira sintetički follow graf s power-law raspodjelom (malo jako popularnih korisnika)
+#   3. Za svaki način rada objavi iste objave i pročita iste feedove:
+#      - push:   svaka objava se fan-out-a svim follower-ima (prag = ∞)
+#      - pull:   ništa se ne fan-out-a, sve se čita pri otvaranju feeda (prag = -1)
+#      - hybrid: fan-out samo za autore ispod praga (--threshold)
+#
+# 📝 Primjer:
+#   python manage.py bench_timeline --users 3000 --follows 40 --posts 500 --threshold 150
+# ========================================================================================================
+
+import random
+import sys
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from instagram.bench import Timer, power_law_sampler, throwaway_database
+
+
+class Command(BaseCommand):
+    help = "Benchmark home feeda: pure push vs pure pull vs hibrid na sintetičkom power-law follow grafu"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--follows", type=int, default=30, help="Prosječan broj praćenja po korisniku")
+        parser.add_argument("--alpha", type=float, default=1.1, help="Eksponent power-law raspodjele popularnosti")
+        parser.add_argument("--posts", type=int, default=300)
+        parser.add_argument("--reads", type=int, default=300)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--threshold", type=int, default=100, help="Prag follower-a za hibridni način")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self._run(options)
+
+    def _build_graph(self, options, rng):
+        from Users.models import User
+        from Interactions.models import Follow
+
+        User.objects.bulk_create(
+            [User(username=f"bench{i}", email=f"bench{i}@bench.local", password="!") for i in range(options["users"])],
+            batch_size=1000,
+        )
+        user_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+
+        # 👥 Prvi korisnici su najpopularniji (power-law), svaki korisnik prati ~options["follows"] ljudi
+        sample = power_law_sampler(user_ids, alpha=options["alpha"], rng=rng)
+        edges = set()
+        for follower_id in user_ids:
+            k = max(1, int(rng.expovariate(1 / options["follows"])))
+            edges.update((follower_id, target) for target in sample(k) if target != follower_id)
+        Follow.objects.bulk_create(
+            [Follow(follower_id=a, following_id=b) for a, b in edges], batch_size=2000
+        )
+        # 👥 bulk_create zaobilazi toggle_follow → User.followers_count / following_count iz Follow redova
+        call_command("reconcile_counters", stdout=StringIO())
+        return user_ids, len(edges)
+
+    def _run(self, options):
+        from Users.models import User
+        from Posts.models import PostModel, TimelineEntry
+        from Posts import timeline
+
+        rng = random.Random(options["seed"])
+        user_ids, edge_count = self._build_graph(options, rng)
+        top = User.objects.order_by("-followers_count").values_list("followers_count", flat=True)[:1]
+        self.stdout.write(
+            f"Graf: {len(user_ids)} korisnika, {edge_count} follow veza, najpopularniji ima {top[0]} follower-a"
+        )
+
+        authors = [rng.choice(user_ids) for _ in range(options["posts"])]
+        readers = [User(id=rng.choice(user_ids)) for _ in range(options["reads"])]
+
+        modes = [
+            ("push", sys.maxsize),
+            ("pull", -1),
+            ("hybrid", options["threshold"]),
+        ]
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'način':<8} {'inbox redova':>13} {'write p50':>10} {'write p95':>10} "
+            f"{'read p50':>10} {'read p95':>10} {'upita/read':>11}"
+        )
+        for name, threshold in modes:
+            TimelineEntry.objects.all().delete()
+            PostModel.objects.all().delete()
+
+            writes = Timer()
+            for i, author_id in enumerate(authors):
+                with writes, transaction.atomic():
+                    post = PostModel.objects.create(title=f"bench {i}", content="bench", author_id=author_id)
+                    timeline.fan_out(post, threshold=threshold)
+
+            reads = Timer()
+            queries = 0
+            for reader in readers:
+                with CaptureQueriesContext(connection) as captured, reads:
+                    page = timeline.home_page(reader, None, per_page=options["page_size"], threshold=threshold)
+                    if page.has_next:
+                        timeline.home_page(reader, page.next_cursor, per_page=options["page_size"], threshold=threshold)
+                queries += len(captured.captured_queries)
+
+            w, r = writes.summary(), reads.summary()
+            self.stdout.write(
+                f"{name:<8} {TimelineEntry.objects.count():>13} {w['p50_ms']:>8.2f}ms {w['p95_ms']:>8.2f}ms "
+                f"{r['p50_ms']:>8.2f}ms {r['p95_ms']:>8.2f}ms {queries / max(1, len(readers)):>11.1f}"
+            )
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-16 22:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Posts', '0004_alter_postmodel_post_image'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postmodel',
+            index=models.Index(fields=['-updated_at', '-id'], name='post_updated_id_idx'),
+        ),
+    ]
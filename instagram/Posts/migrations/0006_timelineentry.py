@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-16 22:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+BACKFILL_SIZE = 50
+
+
+def backfill_timelines(apps, schema_editor):
+    # 📰 Popuni home feed postojećih korisnika iz postojećeg Follow grafa
+    PostModel = apps.get_model('Posts', 'PostModel')
+    TimelineEntry = apps.get_model('Posts', 'TimelineEntry')
+    Follow = apps.get_model('Interactions', 'Follow')
+
+    def entries(owner_id, author_id):
+        posts = PostModel.objects.filter(author_id=author_id).order_by('-created_at', '-id')[:BACKFILL_SIZE]
+        return [TimelineEntry(owner_id=owner_id, post_id=p.id, author_id=author_id, created_at=p.created_at) for p in posts]
+
+    for author_id in PostModel.objects.values_list('author_id', flat=True).distinct():
+        TimelineEntry.objects.bulk_create(entries(author_id, author_id), ignore_conflicts=True)
+    for follower_id, following_id in Follow.objects.values_list('follower_id', 'following_id').iterator():
+        TimelineEntry.objects.bulk_create(entries(follower_id, following_id), ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Posts', '0005_postmodel_post_updated_id_idx'),
+        ('Interactions', '0003_follow'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='Posts.postmodel')),
+            ],
+            options={
+                'db_table': 'TimelineEntry',
+                'indexes': [models.Index(fields=['owner', '-created_at', '-id'], name='timeline_owner_created_idx'), models.Index(fields=['owner', 'author'], name='timeline_owner_author_idx')],
+                'unique_together': {('owner', 'post')},
+            },
+        ),
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
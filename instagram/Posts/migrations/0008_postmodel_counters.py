@@ -0,0 +1,49 @@
+# Generated by Django 6.0.1 on 2026-10-16 22:31
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    # 📊 Inicijalno popuni brojače iz postojećih Like/Dislike/Comment redova
+    PostModel = apps.get_model('Posts', 'PostModel')
+
+    def counted(model_name):
+        model = apps.get_model(*model_name.split('.'))
+        rows = model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(n=Count('pk')).values('n')
+        return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+    PostModel.objects.update(
+        likes_count=counted('Interactions.Like'),
+        dislikes_count=counted('Interactions.Dislike'),
+        comments_count=counted('Comments.CommentModel'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Posts', '0007_hybrid_timeline_indexes'),
+        ('Interactions', '0002_commentlike_dislike'),
+        ('Comments', '0002_commentmodel_parent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postmodel',
+            name='comments_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postmodel',
+            name='dislikes_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postmodel',
+            name='likes_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
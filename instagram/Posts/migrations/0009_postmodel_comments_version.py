@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-16 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Posts', '0008_postmodel_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postmodel',
+            name='comments_version',
+            field=models.IntegerField(default=0),
+        ),
+    ]
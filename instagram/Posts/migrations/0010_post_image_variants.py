@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-16 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Posts', '0009_postmodel_comments_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postmodel',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -5,13 +5,15 @@
 #   - title: Naslov objave (max 100 znakova)
 #   - content: Sadržaj objave (max 5000 znakova)
 #   - post_image: Slika koja ide uz objavu
+#   - image_variants: Smanjene varijante slike za feed i grid (generira Media app)
 #   - author: ForeignKey na User (vlasnik objave)
 #   - uuid_field: Jedinstveni UUID za javne URL-ove
 #   - created_at: Vrijeme kreiranja (automatski)
 #   - updated_at: Vrijeme posljednje izmjene (automatski)
+#   - likes_count / dislikes_count / comments_count: Denormalizirani brojači (bez COUNT(*) pri čitanju)
 #
 # 🌄 Upload putanja:
-#   - Slike: media/posts/images/{uuid}.png
+#   - Slike: media/posts/images/<ab>/<cd>/<sha256>.<ext> (content-addressed, vidi Media/storage.py)
 #   - Default: posts/images/egg.png
 # ========================================================================================================
 
@@ -23,14 +25,16 @@ from Users.models import User
 
 
 def generate_image_uuid(n, m):
-    # 🔹 generate_image_uuid() - Generiše jedinstveno ime za sliku objave
+    # 🔹 generate_image_uuid() - Generiše privremeno ime za sliku objave
     #    
     #    💼 Kako radi:
-    #       - Generiše novi UUID4 
-    #       - Sprječava konflikt imena slika
-    #       - Putanja: media/posts/images/{uuid}.png
+    #       - Zadržava stvarnu ekstenziju upload-a (.jpg, .webp...) umjesto uvijek .png
+    #       - Storage (Media.storage.ContentAddressedStorage) ime zamjenjuje hashom sadržaja
+    #       - Konačna putanja: media/posts/images/<ab>/<cd>/<sha256>.<ext>
     #    
-    return os.path.join("posts/images/", f"{uuid.uuid4()}.png")
+    from Media.storage import image_extension
+
+    return os.path.join("posts/images/", f"{uuid.uuid4()}{image_extension(m)}")
 
 
 class PostModel(models.Model):
@@ -40,10 +44,18 @@ class PostModel(models.Model):
     #       - title: Naslov od max 100 znakova (obavezno)
     #       - content: Tekst sadržaja od max 5000 znakova (obavezno)
     #       - post_image: ImageField s upload_to i default slikom
+    #       - image_variants: JSON s imenima i dimenzijama varijanti (original ostaje za detalje)
     #       - author: ForeignKey na User (briše objave ako se korisnik obriše)
     #       - uuid_field: Jedinstveni UUID za URL-ove
     #       - created_at: Vrijeme kreiranja (auto_now_add=True)
     #       - updated_at: Vrijeme posljednje izmjene (auto_now=True)
+    #       - likes_count, dislikes_count, comments_count: Denormalizirani brojači
+    #       - comments_version: Brojač promjena komentara (za inkrementalni polling)
+    #    
+    #    📊 Brojači:
+    #       - Ažuriraju se atomski (F() izrazi) u istoj transakciji kao Like/Dislike/komentar
+    #       - Feed i detalji objave prikazuju brojeve bez dodatnih upita
+    #       - Drift (npr. nakon kaskadnog brisanja korisnika) popravlja: manage.py reconcile_counters
     #    
     #    🔗 Relacije:
     #       - likes: Relacija One-to-Many sa Like modelom (related_name='likes')
@@ -53,6 +65,7 @@ class PostModel(models.Model):
     title = models.CharField(max_length=100, blank=False)
     content = models.TextField(max_length=5000, blank=False)
     post_image = models.ImageField(upload_to=generate_image_uuid, default="posts/images/egg.png")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)  # 🖼️ Vidi Media/images.py
 
     created_at = models.DateTimeField(auto_now_add=True)  # ⏰ Postavi se samo pri kreiranju
     updated_at = models.DateTimeField(auto_now=True)      # ⏰ Osvježava se pri svakoj izmjeni
@@ -61,9 +74,58 @@ class PostModel(models.Model):
 
     author = models.ForeignKey(User, on_delete=models.CASCADE)  # 🔐 Obriši objave s korisnikom
 
+    # 📊 Denormalizirani brojači (održavaju ih Interactions.views i Comments.views)
+    likes_count = models.IntegerField(default=0)
+    dislikes_count = models.IntegerField(default=0)
+    comments_count = models.IntegerField(default=0)
+
+    # 🔄 Verzija komentara: raste pri svakom novom komentaru i like/unlike komentara
+    #    (polling komentara s ?since=&v= vraća 304 ako se verzija nije promijenila)
+    comments_version = models.IntegerField(default=0)
+
     def __str__(self):
         # 🔹 __str__ - Vraća naslov kao string reprezentaciju
         return self.title
 
     class Meta:
         db_table = "Post"  # 💾 Eksplicitno ime tablice u bazi
+        indexes = [
+            # ⚡ Keyset paginacija feeda: ORDER BY updated_at DESC, id DESC
+            models.Index(fields=["-updated_at", "-id"], name="post_updated_id_idx"),
+            # ⚡ Pull popularnih autora u home feedu: WHERE author IN (...) ORDER BY created_at DESC, id DESC
+            models.Index(fields=["author", "-created_at", "-id"], name="post_author_created_idx"),
+        ]
+
+
+class TimelineEntry(models.Model):
+    # 🔹 TimelineEntry - Materijalizirani "inbox" home feeda (fan-out-on-write)
+    #    
+    #    📝 Polja:
+    #       - owner: Korisnik čiji je ovo home feed
+    #       - post: Objava koja se prikazuje u feedu
+    #       - author: Autor objave (kopija post.author - za brzo brisanje kod unfollow-a)
+    #       - created_at: Kopija post.created_at (sortiranje bez JOIN-a na Post)
+    #    
+    #    💼 Kako radi:
+    #       - Posts.views.Create → Posts.timeline.fan_out() upiše jedan red za svakog follower-a
+    #       - Home feed = jedan range scan po indexu (owner, created_at, post)
+    #       - Unfollow briše redove (owner, author); follow dopuni zadnje objave autora
+    #    
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    post = models.ForeignKey(PostModel, on_delete=models.CASCADE, related_name='+')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "TimelineEntry"
+        unique_together = ('owner', 'post')  # 🔒 Objava je u feedu korisnika najviše jednom
+        indexes = [
+            # ⚡ Čitanje feeda: WHERE owner = ? ORDER BY created_at DESC, post_id DESC
+            #    (isti ključ kao pull izvor → inbox i pull se mogu spojiti po (created_at, post id))
+            models.Index(fields=["owner", "-created_at", "-post"], name="timeline_owner_post_idx"),
+            # ✂️ Unfollow: DELETE WHERE owner = ? AND author = ?
+            models.Index(fields=["owner", "author"], name="timeline_owner_author_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.owner_id} ← {self.post_id}"
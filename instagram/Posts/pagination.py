@@ -0,0 +1,234 @@
+# 🇭🇷 Posts/pagination.py - Keyset (cursor) paginacija za feedove
+# ========================================================================================================
+# Svrha: Zamjena za Django Paginator koja ne radi COUNT(*) ni OFFSET
+#
+# Zašto:
+#   - Paginator za svaku stranicu radi COUNT(*) nad cijelom tablicom
+#   - OFFSET N tjera bazu da preskoči N redaka → stranica 20 000 je spora
+#   - Keyset: "daj mi sljedećih N redaka IZA ovog ključa" → uvijek isti trošak (index range scan)
+#
+# Kako radi:
+#   - ordering: npr. ("-updated_at", "-id") - zadnje polje mora biti jedinstveno (tie-breaker)
+#   - cursor: neproziran base64 token s vrijednostima ključa zadnjeg/prvog retka i smjerom
+#   - Dohvaća per_page + 1 redaka → ako postoji višak, postoji i sljedeća stranica (bez COUNT-a)
+#
+# ⚠️ Napomena: Za svaki ordering treba postojati odgovarajući index (vidi PostModel.Meta.indexes)
+# ========================================================================================================
+
+import base64
+import binascii
+import datetime
+import heapq
+import json
+import uuid
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+def _dump(value):
+    # 🔹 _dump() - Pretvara vrijednost ključa u JSON-kompatibilan oblik
+    #    ⚠️ DjangoJSONEncoder reže mikrosekunde → ovdje koristimo puni isoformat()
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(direction, values):
+    # 🔹 encode_cursor() - Pakira smjer i vrijednosti ključa u URL-safe token
+    payload = json.dumps([direction, [_dump(v) for v in values]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    # 🔹 decode_cursor() - Raspakira token; vraća (direction, values) ili None ako je token nevalidan
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class KeysetPage:
+    # 🔹 KeysetPage - Jedna stranica rezultata
+    #
+    #    📝 Atributi:
+    #       - object_list: Objekti na stranici (u traženom redoslijedu)
+    #       - has_next / has_previous: Postoji li stranica iza / ispred
+    #       - next_cursor / previous_cursor: Tokeni za linkove (None ako stranica ne postoji)
+    #
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class _KeysetSource:
+    # 🔹 _KeysetSource - Jedan queryset s keyset redoslijedom (interno)
+    #
+    #    💼 Zna izgraditi "seek" filter i dohvatiti prozor od N redaka iza/ispred ključa
+    #
+    def __init__(self, queryset, ordering):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip("-") for name in self.ordering]
+        self.descending = [name.startswith("-") for name in self.ordering]
+
+    def model_field(self, name):
+        meta = self.queryset.model._meta
+        if name == "pk":
+            return meta.pk
+        return meta.get_field(name)
+
+    def key(self, obj):
+        return [getattr(obj, name) for name in self.fields]
+
+    def seek(self, values, forward):
+        # 🔹 seek() - Gradi Q filter "redak je iza/ispred ključa" za višestruki ključ
+        #
+        #    💼 Za ključ (a, b) silazno i forward=True:
+        #       a < va OR (a = va AND b < vb)
+        #
+        condition = Q()
+        for i, name in enumerate(self.fields):
+            descending = self.descending[i] if forward else not self.descending[i]
+            lookup = "lt" if descending else "gt"
+            term = Q(**{f"{name}__{lookup}": values[i]})
+            for prev_name, prev_value in zip(self.fields[:i], values[:i]):
+                term &= Q(**{prev_name: prev_value})
+            condition |= term
+        return condition
+
+    def window(self, direction, values, limit):
+        # 🔹 window() - Dohvaća do `limit` redaka u redoslijedu skeniranja
+        #    - NEXT / prva stranica: redoslijed = ordering
+        #    - PREVIOUS: obrnuti ordering (najbliži ključu prvi)
+        if direction == PREVIOUS:
+            reversed_ordering = tuple(name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering)
+            qs = self.queryset.filter(self.seek(values, forward=False)).order_by(*reversed_ordering)
+        else:
+            qs = self.queryset
+            if direction == NEXT:
+                qs = qs.filter(self.seek(values, forward=True))
+            qs = qs.order_by(*self.ordering)
+        return list(qs[:limit])
+
+
+class KeysetPaginator:
+    # 🔹 KeysetPaginator - Paginator koji filtrira po ključu umjesto OFFSET-a
+    #
+    #    📝 Parametri:
+    #       - queryset: Osnovni queryset (bez order_by, paginator ga postavlja)
+    #       - per_page: Broj objekata po stranici
+    #       - ordering: Tuple polja, npr. ("-updated_at", "-id"); zadnje polje mora biti jedinstveno
+    #
+    #    💼 Primjer:
+    #       page = KeysetPaginator(PostModel.objects.all(), 3).get_page(request.GET.get("cursor"))
+    #
+    def __init__(self, queryset, per_page, ordering=("-updated_at", "-id")):
+        self.per_page = int(per_page)
+        self.sources = [_KeysetSource(queryset, ordering)]
+
+    def _parse_values(self, raw_values):
+        # 🔹 _parse_values() - Vraća vrijednosti iz tokena u Python tipove (datetime, UUID...)
+        source = self.sources[0]
+        if len(raw_values) != len(source.fields):
+            return None
+        try:
+            return [source.model_field(name).to_python(value) for name, value in zip(source.fields, raw_values)]
+        except (FieldDoesNotExist, ValidationError):
+            return None
+
+    def _key(self, obj):
+        return self.sources[0].key(obj)
+
+    def _fetch(self, direction, values):
+        # 🔹 _fetch() - per_page + 1 redaka u redoslijedu skeniranja
+        return self.sources[0].window(direction, values, self.per_page + 1)
+
+    def get_page(self, cursor=None):
+        # 🔹 get_page() - Dohvaća stranicu za dani cursor (nevalidan ili prazan cursor → prva stranica)
+        #
+        #    📊 Upiti: jedan SELECT s LIMIT per_page + 1 po izvoru, bez COUNT-a
+        #
+        decoded = decode_cursor(cursor)
+        values = self._parse_values(decoded[1]) if decoded else None
+        direction = decoded[0] if values is not None else None
+
+        rows = self._fetch(direction, values)
+        if direction == PREVIOUS:
+            has_previous = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            rows.reverse()
+            has_next = True
+        else:
+            has_next = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            has_previous = direction == NEXT
+
+        next_cursor = encode_cursor(NEXT, self._key(rows[-1])) if has_next and rows else None
+        previous_cursor = encode_cursor(PREVIOUS, self._key(rows[0])) if has_previous and rows else None
+
+        return KeysetPage(rows, bool(next_cursor), bool(previous_cursor), next_cursor, previous_cursor)
+
+
+class MergedKeysetPaginator(KeysetPaginator):
+    # 🔹 MergedKeysetPaginator - Keyset paginacija preko više querysetova (k-way merge)
+    #
+    #    📝 Parametri:
+    #       - sources: Lista (queryset, ordering) parova; svi ordering-i imaju isti broj polja
+    #                  i isti smjer, a vrijednosti ključa su usporedive (npr. created_at, post id)
+    #       - key: Funkcija obj → tuple ključa (zajednički za sve izvore)
+    #
+    #    💼 Kako radi:
+    #       - Svaki izvor vrati najviše per_page + 1 redaka iza cursora (jedan SELECT po izvoru)
+    #       - heapq.merge spoji već sortirane liste u O(n log k)
+    #       - Duplikati (isti ključ u više izvora) se preskaču
+    #
+    def __init__(self, sources, per_page, key):
+        self.per_page = int(per_page)
+        self.sources = [_KeysetSource(queryset, ordering) for queryset, ordering in sources]
+        self.key = key
+
+    def _key(self, obj):
+        return list(self.key(obj))
+
+    def _fetch(self, direction, values):
+        descending = self.sources[0].descending[0]
+        if direction == PREVIOUS:
+            descending = not descending
+
+        windows = [source.window(direction, values, self.per_page + 1) for source in self.sources]
+        rows = []
+        last = None
+        for obj in heapq.merge(*windows, key=self.key, reverse=descending):
+            current = self.key(obj)
+            if current == last:
+                continue
+            last = current
+            rows.append(obj)
+            if len(rows) > self.per_page:
+                break
+        return rows
@@ -1,3 +1,201 @@
-from django.test import TestCase
+import datetime
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from Users.models import User
+from Comments.models import CommentModel
+from Interactions.models import Dislike, Like
+from . import timeline
+from .models import PostModel, TimelineEntry
+from .pagination import KeysetPaginator, MergedKeysetPaginator, decode_cursor, encode_cursor
+
+
+class KeysetPaginatorTests(TestCase):
+    # 🔹 Cursor paginacija: stranice se ne preklapaju i ne preskaču retke, ni kad je ključ jednak
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+        self.posts = [
+            PostModel.objects.create(title=f"Objava {i}", content="Sadržaj", author=self.author) for i in range(7)
+        ]
+        # ⏱️ Isto updated_at za sve → poredak odlučuje tie-breaker (id)
+        PostModel.objects.update(updated_at=timezone.now())
+
+    def _walk(self, paginator, page, attribute):
+        pages = [page]
+        while getattr(page, f"{attribute}_cursor"):
+            page = paginator.get_page(getattr(page, f"{attribute}_cursor"))
+            pages.append(page)
+        return pages
+
+    def test_cursor_round_trip(self):
+        values = [timezone.now(), 42]
+        self.assertEqual(decode_cursor(encode_cursor("n", values)), ("n", [values[0].isoformat(), 42]))
+        self.assertIsNone(decode_cursor("nije-cursor"))
+
+    def test_pages_forward_and_back_on_equal_keys(self):
+        paginator = KeysetPaginator(PostModel.objects.all(), 3)
+        forward = self._walk(paginator, paginator.get_page(), "next")
+        ids = [post.id for page in forward for post in page]
+        self.assertEqual(ids, sorted((p.id for p in self.posts), reverse=True))
+        self.assertEqual([len(page) for page in forward], [3, 3, 1])
+        self.assertFalse(forward[0].has_previous)
+
+        backward = self._walk(paginator, forward[-1], "previous")
+        self.assertEqual(
+            [[post.id for post in page] for page in reversed(backward)],
+            [[post.id for post in page] for page in forward],
+        )
+
+    def test_invalid_cursor_returns_first_page(self):
+        paginator = KeysetPaginator(PostModel.objects.all(), 3)
+        first = [post.id for post in paginator.get_page()]
+        self.assertEqual([post.id for post in paginator.get_page("!!!")], first)
+        self.assertEqual([post.id for post in paginator.get_page(encode_cursor("n", ["nije datum", 1]))], first)
+
+    def test_merge_skips_rows_present_in_both_sources(self):
+        # 👥 Dva izvora s preklapanjem (svaka druga + prvih pet) → svaka objava točno jednom, u redoslijedu ključa
+        base = timezone.now()
+        for i, post in enumerate(self.posts):
+            PostModel.objects.filter(pk=post.pk).update(created_at=base - datetime.timedelta(minutes=i))
+        ids = [post.id for post in self.posts]
+        ordering = ("-created_at", "-id")
+        paginator = MergedKeysetPaginator(
+            [
+                (PostModel.objects.filter(id__in=ids[::2]), ordering),
+                (PostModel.objects.filter(id__in=ids[:5]), ordering),
+            ],
+            2,
+            key=lambda post: (post.created_at, post.id),
+        )
+        pages = self._walk(paginator, paginator.get_page(), "next")
+        self.assertEqual([post.id for page in pages for post in page], [i for i in ids if i in ids[::2] + ids[:5]])
+
+
+class TimelineTestCase(TestCase):
+    # 🔹 Zajednički setup: autor, dva follower-a (kroz toggle_follow → brojači i inboxi kao u produkciji)
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+        self.readers = [
+            User.objects.create_user(username=f"citatelj{i}", email=f"citatelj{i}@example.com", password="lozinka")
+            for i in range(2)
+        ]
+
+    def _toggle_follow(self, reader):
+        self.client.force_login(reader)
+        response = self.client.post(f"/users/profile/{self.author.user_uuid}/follow")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _publish(self, title):
+        post = PostModel.objects.create(title=title, content="Sadržaj", author=self.author)
+        timeline.fan_out(post)
+        return post
+
+    def _home(self, user):
+        return [post.title for post in timeline.home_page(user, per_page=50)]
+
+    def _inbox(self, user):
+        return set(TimelineEntry.objects.filter(owner=user).values_list("post__title", flat=True))
+
+
+class FanOutTimelineTests(TimelineTestCase):
+    # 🔹 Push: objava ide u inbox autora i follower-a; follow dopuni feed, unfollow ga očisti
+
+    def test_fan_out_reaches_author_and_followers(self):
+        follower, stranger = self.readers
+        self._toggle_follow(follower)
+        self._publish("prva")
+        self._publish("prva")  # 🔁 Isti naslov, nova objava
+
+        self.assertEqual(self._inbox(self.author), {"prva"})
+        self.assertEqual(TimelineEntry.objects.filter(owner=follower).count(), 2)
+        self.assertFalse(TimelineEntry.objects.filter(owner=stranger).exists())
+
+        post = PostModel.objects.first()
+        timeline.fan_out(post)  # 🔁 Ponovni fan-out ne udvostručuje upise
+        self.assertEqual(TimelineEntry.objects.filter(post=post).count(), 2)
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        reader = self.readers[0]
+        self._publish("stara")
+        self._toggle_follow(reader)
+        self.assertEqual(self._home(reader), ["stara"])
+
+        self._publish("nova")
+        self.assertEqual(self._home(reader), ["nova", "stara"])
+
+        self._toggle_follow(reader)
+        self.assertEqual(self._home(reader), [])
+        self.assertEqual(self._home(self.author), ["nova", "stara"])
+
+
+@override_settings(TIMELINE_FANOUT_THRESHOLD=1)
+class HybridTimelineTests(TimelineTestCase):
+    # 🔹 Pull iznad praga (više od 1 follower-a); prelazak preko praga ne smije izgubiti objave
+
+    def test_popular_author_is_pulled_not_pushed(self):
+        for reader in self.readers:
+            self._toggle_follow(reader)
+        self.assertTrue(timeline.is_pulled_author(self.author.pk))
+
+        self._publish("popularna")
+        self.assertEqual(TimelineEntry.objects.count(), 1)  # 👤 Samo autorov inbox
+        for reader in self.readers:
+            self.assertEqual(self._home(reader), ["popularna"])
+
+    def test_dropping_below_threshold_pushes_pulled_posts(self):
+        stays, leaves = self.readers
+        self._toggle_follow(stays)
+        self._publish("prije")  # ⬆️ Push (1 follower)
+        self._toggle_follow(leaves)
+        self._publish("za vrijeme pull-a")
+
+        self._toggle_follow(leaves)  # ⬇️ Natrag na prag → autor se više ne pull-a
+        self.assertFalse(timeline.is_pulled_author(self.author.pk))
+        self.assertEqual(self._inbox(stays), {"prije", "za vrijeme pull-a"})
+        self.assertEqual(self._home(stays), ["za vrijeme pull-a", "prije"])
+        self.assertEqual(self._home(leaves), [])
+
+
+class PostCounterTests(TestCase):
+    # 🔹 likes_count / dislikes_count / comments_count prate retke; reconcile_counters popravlja drift
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="autor", email="autor@example.com", password="lozinka")
+        self.reader = User.objects.create_user(username="citatelj", email="citatelj@example.com", password="lozinka")
+        self.post = PostModel.objects.create(title="Objava", content="Sadržaj", author=self.author)
+        self.client.force_login(self.reader)
+
+    def _counters(self):
+        self.post.refresh_from_db()
+        return self.post.likes_count, self.post.dislikes_count, self.post.comments_count
+
+    def test_views_keep_counters_in_step(self):
+        url = f"/{self.post.uuid_field}"
+        self.assertEqual(self.client.post(f"{url}/like").json(), {"liked": True, "likes": 1, "dislikes": 0})
+        self.assertEqual(self.client.post(f"{url}/dislike").json(), {"disliked": True, "likes": 0, "dislikes": 1})
+        self.client.post(f"{url}/comment/add", {"content": "prvi"})
+        self.client.post(f"{url}/comment/add", {"content": "drugi"})
+        self.assertEqual(self._counters(), (0, 1, 2))
+
+        response = self.client.get(f"{url}/")
+        self.assertEqual((response.context["likes_count"], response.context["dislikes_count"]), (0, 1))
+
+    def test_reconcile_restores_corrupted_counters(self):
+        Like.objects.create(user=self.reader, post=self.post)
+        Dislike.objects.create(user=self.author, post=self.post)
+        CommentModel.objects.create(author=self.reader, post=self.post, content="komentar")
+        PostModel.objects.filter(pk=self.post.pk).update(likes_count=7, dislikes_count=-2, comments_count=0)
+
+        output = StringIO()
+        call_command("reconcile_counters", "--dry-run", stdout=output)
+        self.assertIn("Posts.PostModel.likes_count: 1 redaka ima drift", output.getvalue())
+        self.assertEqual(self._counters(), (7, -2, 0))
+
+        call_command("reconcile_counters", stdout=StringIO())
+        self.assertEqual(self._counters(), (1, 1, 1))
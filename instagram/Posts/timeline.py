@@ -0,0 +1,177 @@
+# 🇭🇷 Posts/timeline.py - Personalizirani home feed (hibridni push/pull)
+# ========================================================================================================
+# Svrha: Održavanje materijaliziranih "inbox" feedova (TimelineEntry) iz Follow grafa
+# Funkcionalnosti:
+#   - fan_out(): Nova objava → po jedan TimelineEntry za autora i svakog follower-a (push)
+#   - backfill(): Follow → dopuni feed zadnjim objavama praćenog autora
+#   - prune(): Unfollow → ukloni objave tog autora iz feeda
+#   - repush(): Autor pao ispod praga → zadnje objave (dosad pull-ane) u feed svih follower-a
+#   - home_page(): Čita jednu stranicu home feeda (inbox + pull popularnih autora)
+#
+# ⚡ Zašto:
+#   - Čitanje feeda je jedan indexirani range scan (owner, created_at, post)
+#   - Nema JOIN-a Follow × Post pri svakom otvaranju stranice
+#   - Trošak je prebačen na pisanje (jednom po objavi) umjesto na čitanje (svaki put)
+#
+# 🔀 Hibrid (push/pull):
+#   - Autori s više od TIMELINE_FANOUT_THRESHOLD follower-a se NE fan-out-aju
+#     (jedna objava = stotine tisuća upisa)
+#   - Njihove objave se čitaju (pull) pri otvaranju feeda i spajaju s inboxom
+#     k-way merge-om po (created_at, post id) - vidi MergedKeysetPaginator
+#   - Prelazak preko praga:
+#       - gore: stari upisi ostaju u inboxima, merge preskače duplikate (isti ključ u oba izvora)
+#       - dolje: objave iz vremena pull-a nisu ni u jednom inboxu → repush() iz toggle_follow
+# ========================================================================================================
+
+from django.conf import settings
+
+from .models import PostModel, TimelineEntry
+from .pagination import KeysetPaginator, MergedKeysetPaginator
+
+
+def _threshold(threshold):
+    return settings.TIMELINE_FANOUT_THRESHOLD if threshold is None else threshold
+
+
+def is_pulled_author(author_id, threshold=None):
+    # 🔹 is_pulled_author() - Ima li autor više follower-a od praga (→ pull umjesto push)
+    #    📎 User.followers_count (denormalizirano) → čitanje jednog retka, bez COUNT-a nad Follow
+    from Users.models import User
+
+    return User.objects.filter(pk=author_id, followers_count__gt=_threshold(threshold)).exists()
+
+
+def stopped_pulling(followers_count, threshold=None):
+    # 🔹 stopped_pulling() - Je li unfollow upravo spustio autora na prag (više se ne pull-a)
+    #    📎 followers_count je vrijednost NAKON unfollow-a; brojač se mijenja atomski (-1 po unfollow-u)
+    #       → točno jedan unfollow vidi vrijednost jednaku pragu
+    return followers_count == _threshold(threshold)
+
+
+def pulled_author_ids(user, threshold=None):
+    # 🔹 pulled_author_ids() - ID-evi autora koje korisnik prati, a koji su iznad praga
+    #
+    #    💼 Follow redovi korisnika + JOIN na User.followers_count praćenog autora
+    #
+    from Interactions.models import Follow
+
+    return list(
+        Follow.objects.filter(follower=user, following__followers_count__gt=_threshold(threshold))
+        .values_list('following_id', flat=True)
+    )
+
+
+def _entries(owner_ids, post):
+    return [
+        TimelineEntry(owner_id=owner_id, post_id=post.id, author_id=post.author_id, created_at=post.created_at)
+        for owner_id in owner_ids
+    ]
+
+
+def fan_out(post, threshold=None):
+    # 🔹 fan_out() - Upisuje novu objavu u feed autora i svih njegovih follower-a
+    #
+    #    💼 Kako radi:
+    #       - Popularni autor (iznad praga) → upis samo u vlastiti feed, follower-i ga pull-aju
+    #       - Dohvati ID-eve follower-a (samo ID-evi, bez učitavanja User objekata)
+    #       - bulk_create u batch-evima (TIMELINE_FANOUT_BATCH_SIZE)
+    #       - ignore_conflicts: ponovni fan-out iste objave ne baca IntegrityError
+    #
+    # 🔌 Dinamički import za izbježivanje kružnih uvoza (Interactions uvozi Posts)
+    from Interactions.models import Follow
+
+    if is_pulled_author(post.author_id, threshold):
+        TimelineEntry.objects.bulk_create(_entries([post.author_id], post), ignore_conflicts=True)
+        return
+
+    batch_size = settings.TIMELINE_FANOUT_BATCH_SIZE
+    follower_ids = Follow.objects.filter(following_id=post.author_id).values_list('follower_id', flat=True)
+
+    # 👤 Autor uvijek vidi svoje objave u home feedu
+    batch = [post.author_id]
+    for follower_id in follower_ids.iterator(chunk_size=batch_size):
+        batch.append(follower_id)
+        if len(batch) >= batch_size:
+            TimelineEntry.objects.bulk_create(_entries(batch, post), ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(_entries(batch, post), ignore_conflicts=True)
+
+
+def backfill(owner, author, threshold=None, followers_count=None):
+    # 🔹 backfill() - Nakon follow-a dopuni feed s TIMELINE_BACKFILL_SIZE zadnjih objava autora
+    #    ⚠️ Popularni autori se ne upisuju - njihove objave se ionako pull-aju pri čitanju
+    #    📎 followers_count: već poznat broj (npr. iz toggle-a) → bez čitanja User retka
+    if followers_count is None:
+        if is_pulled_author(author.pk, threshold):
+            return
+    elif followers_count > _threshold(threshold):
+        return
+    posts = PostModel.objects.filter(author=author).order_by('-created_at', '-id')[:settings.TIMELINE_BACKFILL_SIZE]
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(owner=owner, post=p, author_id=p.author_id, created_at=p.created_at) for p in posts],
+        ignore_conflicts=True,
+    )
+
+
+def repush(author):
+    # 🔹 repush() - Zadnjih TIMELINE_BACKFILL_SIZE objava autora u feed svakog follower-a
+    #
+    #    💼 Kad: autor je upravo pao na prag (stopped_pulling) → follower-i ga više ne pull-aju,
+    #       a objave iz vremena pull-a nikad nisu fan-out-ane → bez ovoga nestaju iz home feedova
+    #    ⚡ Najviše prag × TIMELINE_BACKFILL_SIZE redova, u batch-evima od ~TIMELINE_FANOUT_BATCH_SIZE
+    #    📎 ignore_conflicts: objave koje su već u inboxu (push prije prelaska preko praga) se preskaču
+    from Interactions.models import Follow
+
+    posts = list(PostModel.objects.filter(author=author).order_by('-created_at', '-id')[:settings.TIMELINE_BACKFILL_SIZE])
+    if not posts:
+        return
+
+    followers_per_batch = max(1, settings.TIMELINE_FANOUT_BATCH_SIZE // len(posts))
+    follower_ids = Follow.objects.filter(following=author).values_list('follower_id', flat=True)
+    batch = []
+    for follower_id in follower_ids.iterator(chunk_size=followers_per_batch):
+        batch.append(follower_id)
+        if len(batch) >= followers_per_batch:
+            TimelineEntry.objects.bulk_create([e for p in posts for e in _entries(batch, p)], ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create([e for p in posts for e in _entries(batch, p)], ignore_conflicts=True)
+
+
+def prune(owner, author):
+    # 🔹 prune() - Nakon unfollow-a ukloni sve objave autora iz feeda (index owner, author)
+    TimelineEntry.objects.filter(owner=owner, author=author).delete()
+
+
+def _post_key(obj):
+    # 🔑 Zajednički ključ za inbox (TimelineEntry) i pull (PostModel) izvore
+    if isinstance(obj, TimelineEntry):
+        return (obj.created_at, obj.post_id)
+    return (obj.created_at, obj.id)
+
+
+def home_page(user, cursor=None, per_page=3, threshold=None):
+    # 🔹 home_page() - Jedna stranica home feeda za korisnika
+    #
+    #    📊 Upiti:
+    #       - Jedan upit za popularne autore koje korisnik prati
+    #       - Jedan SELECT nad TimelineEntry (inbox) + JOIN na post i autora za prikaz
+    #       - Ako prati popularne autore: još jedan SELECT nad Post (index author, created_at)
+    #    📤 Vraća: KeysetPage čiji object_list sadrži PostModel objekte
+    #
+    entries = TimelineEntry.objects.filter(owner=user).select_related('post', 'post__author')
+    inbox_ordering = ("-created_at", "-post_id")
+
+    pulled = pulled_author_ids(user, threshold)
+    if pulled:
+        posts = PostModel.objects.filter(author_id__in=pulled).select_related('author')
+        paginator = MergedKeysetPaginator(
+            [(entries, inbox_ordering), (posts, ("-created_at", "-id"))], per_page, key=_post_key
+        )
+    else:
+        paginator = KeysetPaginator(entries, per_page, ordering=inbox_ordering)
+
+    page = paginator.get_page(cursor)
+    page.object_list = [obj.post if isinstance(obj, TimelineEntry) else obj for obj in page.object_list]
+    return page
@@ -1,11 +1,12 @@
 from django.urls import path
-from .views import Create, Update, Delete, List, ListDetail
+from .views import Create, Update, Delete, List, ListDetail, Home
 
-from Comments.views import add, get
+from Comments.views import add, get, replies
 from Interactions.views import toggle_like, toggle_dislike, toggle_comment_like
 
 urlpatterns = [
     path("", List, name="list"),
+    path("home/", Home, name="home"),
     path("create/", Create, name="create"),
     path("<uuid:id>/update", Update, name="update"),
     path("<uuid:id>/delete", Update, name="delete"),
@@ -15,4 +16,5 @@ urlpatterns = [
     path("<uuid:id>/like", toggle_like, name="post_like"),
     path("<uuid:id>/dislike", toggle_dislike, name="post_dislike"),
     path("comment/<int:comment_id>/like", toggle_comment_like, name="comment_like"),
+    path("comment/<int:comment_id>/replies", replies, name="comment_replies"),
 ]
@@ -2,7 +2,8 @@
 # ========================================================================================================
 # Svrha: View funkcije za prikaz, stvaranje, ažuriranje i brisanje objava s paginacijom
 # Funkcionalnosti:
-#   - List(): Prikazuje feed svih objava s paginacijom (3 objave po stranici)
+#   - List(): Prikazuje feed svih objava s keyset (cursor) paginacijom (3 objave po stranici)
+#   - Home(): Personalizirani feed objava korisnika koje pratiš (materijalizirani inbox)
 #   - Create(): Forma za stvaranje nove objave s slikom
 #   - Update(): Uređivanje vlastite objave
 #   - Delete(): Brisanje vlastite objave (placeholder)
@@ -10,6 +11,7 @@
 #
 # 📝 Rute:
 #   - GET /posts/ → Feed svih objava
+#   - GET /home/ → Home feed (objave praćenih korisnika)
 #   - GET /posts/create/ → Forma za novu objavu
 #   - POST /posts/create/ → Spremi novu objavu
 #   - POST /posts/<id>/update/ → Ažurira objavu
@@ -21,23 +23,30 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
-from django.core.paginator import Paginator
+from django.db import transaction
 
 from .models import PostModel
+from .pagination import KeysetPaginator
+from . import timeline
 from Users.models import User
+from Media.uploads import add_upload_errors
 from .forms import PostForm
 
 
-# 🔹 List() - Prikazuje feed svih objava s paginacijom
+# 🔹 List() - Prikazuje feed svih objava s keyset (cursor) paginacijom
 #    
 #    📊 Kako radi:
 #       - Dohvaća sve objave iz baze (bez filtriranja)
-#       - Sortira ih po vremenu ažuriranja (najnovije prvo)
-#       - Primjenjuje paginaciju: 3 objave po stranici
-#       - Parametar: page=1,2,3... (automatski se dodaje u GET)
+#       - Sortira ih po vremenu ažuriranja (najnovije prvo), id kao tie-breaker
+#       - Primjenjuje keyset paginaciju: 3 objave po stranici
+#       - Parametar: cursor=<token> (neproziran token iz linkova Sljedeća/Prethodna)
+#    
+#    ⚡ Performanse:
+#       - Nema COUNT(*) ni OFFSET-a → stranica 2 i stranica 20 000 koštaju isto
+#       - Upit koristi index post_updated_id_idx (updated_at, id)
 #    
 #    👁️ Što se prikazuje:
-#       - 3 objave po stranici s informacijom trenutne stranice
+#       - 3 objave po stranici
 #       - Linkovi na prethodnu/sljedeću stranicu (ako postoje)
 #    
 #    ⚠️ Napomena: Ova ruta je JAVNA - ne zahtijeva login
@@ -46,19 +55,36 @@ def List(request):
     if request.method != "GET":
         return HttpResponse("Samo GET metoda je dozvoljena")
     
-    # 📚 Dohvati sve objave i sortiraj po vremenu ažuriranja (najnovije prvo)
-    objects = PostModel.objects.filter().order_by("-updated_at")
-    # 📄 Primijeni paginaciju: 3 objave po stranici
-    p = Paginator(objects, 3)
-
-    # 🔢 Dohvati broj stranice iz GET parametra
-    page = request.GET.get("page")
-    # 📋 Pronađi odgovarajuću stranicu (ili zadanu ako page nije validan)
-    page_obj = p.get_page(page)
+    # 📚 Dohvati objave s autorom u istom upitu (template prikazuje autora za svaku objavu)
+    objects = PostModel.objects.select_related("author")
+    # 📄 Keyset paginacija: 3 objave po stranici, najnovije prvo
+    p = KeysetPaginator(objects, 3, ordering=("-updated_at", "-id"))
+
+    # 🔢 Dohvati cursor iz GET parametra (nevalidan ili prazan → prva stranica)
+    page_obj = p.get_page(request.GET.get("cursor"))
     
     return render(request, "posts/list.html", {"page_obj": page_obj})
 
 
+@login_required
+def Home(request):
+    # 🔹 Home() - Personalizirani feed: objave korisnika koje pratiš + vlastite objave
+    #    
+    #    📊 Kako radi:
+    #       - Čita materijalizirani inbox (TimelineEntry) trenutnog korisnika
+    #       - Jedan indexirani range scan (owner, created_at, id), bez JOIN-a na Follow
+    #       - Keyset paginacija kao i List(): 3 objave po stranici, parametar cursor
+    #    
+    #    💾 Inbox se puni pri Create() (fan-out) i toggle_follow() (backfill/prune)
+    #
+    if request.method != "GET":
+        return HttpResponse("Samo GET metoda je dozvoljena")
+
+    page_obj = timeline.home_page(request.user, request.GET.get("cursor"), per_page=3)
+
+    return render(request, "posts/home.html", {"page_obj": page_obj})
+
+
 @login_required
 def Create(request):
     # 🔹 Create() - Forma i obrada stvaranja nove objave
@@ -76,6 +102,9 @@ def Create(request):
     #       - author automatski se postavlja na request.user
     #       - created_at i updated_at se postavljaju automatski
     #    
+    #    📰 Fan-out:
+    #       - Objava se u istoj transakciji upisuje u home feed svih follower-a
+    #    
     #    ✅ Nakon uspješnog upisa: redirect na feed (/posts/)
     #
     if request.method == "GET":
@@ -83,11 +112,18 @@ def Create(request):
     elif request.method == "POST":
         form = PostForm(request.POST, request.FILES)
 
+        # 🛑 Upload prekinut dok se primao (prevelik / nije slika) - vidi Media/uploads.py
+        if add_upload_errors(form, request):
+            return render(request, "posts/create.html", {"form": form}, status=413)
+
         if form.is_valid():
             # ✅ Forma je validna - spremi objavu
-            post = form.save(commit=False)
-            post.author = request.user  # 🔐 Postavi autora na trenutnog korisnika
-            post.save()
+            with transaction.atomic():
+                post = form.save(commit=False)
+                post.author = request.user  # 🔐 Postavi autora na trenutnog korisnika
+                post.save()
+                # 📰 Upiši objavu u home feed follower-a
+                timeline.fan_out(post)
 
             return redirect("list")
 
@@ -125,6 +161,8 @@ def Update(request, id):
         
         form = PostForm(request.POST, request.FILES, instance=object)
 
+        if add_upload_errors(form, request):
+            return render(request, "posts/update.html", {"form": form}, status=413)
         
         if form.is_valid():
             form.save()
@@ -156,7 +194,7 @@ def ListDetail(request, id):
     #    
     #    📊 Što se prikazuje:
     #       - Naslov, sadržaj i slika objave
-    #       - Broj like-a i dislike-a
+    #       - Broj like-a i dislike-a (PostModel.likes_count / dislikes_count)
     #       - Je li trenutni korisnik dao like/dislike
     #       - Svi komentari na objavu (dohvaćeni AJAX-om)
     #       - Forma za dodavanje novog komentara
@@ -173,17 +211,23 @@ def ListDetail(request, id):
     if request.method != "GET":
         return HttpResponse("Samo GET metoda je dozvoljena")
     
-    obj = PostModel.objects.get(uuid_field=id)
+    obj = PostModel.objects.select_related("author").get(uuid_field=id)
 
-    # ❤️ Brojač likes & dislikes
-    likes_count = obj.likes.count() if hasattr(obj, 'likes') else 0
+    # ❤️ Brojač likes & dislikes - denormalizirana polja na objavi (bez COUNT upita)
     from Interactions.models import Like, Dislike
-    dislikes_count = obj.dislikes.count() if hasattr(obj, 'dislikes') else 0
+    from Interactions.writebehind import DISLIKE, LIKE, get_buffer
+    likes_count = obj.likes_count
+    dislikes_count = obj.dislikes_count
 
     # 👤 Provjeri je li trenutni korisnik dao like/dislike
     user_liked = False
     user_disliked = False
-    if request.user.is_authenticated:
+    buffer = get_buffer()
+    if buffer is not None:
+        # ⏳ Write-behind: baza + like-ovi koji još nisu flushani (korisnik odmah vidi svoj like)
+        state, likes_count, dislikes_count = buffer.post_state(request.user.pk, obj.pk)
+        user_liked, user_disliked = state == LIKE, state == DISLIKE
+    elif request.user.is_authenticated:
         user_liked = Like.objects.filter(user=request.user, post=obj).exists()
         user_disliked = Dislike.objects.filter(user=request.user, post=obj).exists()
     
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-16 23:18
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    # 👥 Inicijalno popuni brojače iz postojećih Follow redova
+    User = apps.get_model('Users', 'User')
+    Follow = apps.get_model('Interactions', 'Follow')
+
+    def counted(fk):
+        rows = Follow.objects.filter(**{fk: OuterRef('pk')}).order_by().values(fk).annotate(n=Count('pk')).values('n')
+        return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+    User.objects.update(followers_count=counted('following'), following_count=counted('follower'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Users', '0004_user_profile_image_variants'),
+        ('Interactions', '0003_follow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
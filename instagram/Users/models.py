@@ -4,16 +4,19 @@
 # Dodatna polja:
 #   - user_uuid: Jedinstveni UUID za javne profile URL-ove
 #   - profile_image: Slika profila s validacijom veličine
+#   - profile_image_variants: Kvadratni avatari (40/80/150/300px) koje generira Media app
 #   - email: Obavezno, jedinstveno
+#   - followers_count / following_count: Denormalizirani broj Follow redova (bez COUNT(*) pri čitanju)
 #
 # 🔐 Validacija:
 #   - validate_size(): Proverava da slika nije veća od 2MB
 #
 # 🌄 Upload putanje:
-#   - Slike se skladište u: media/users/images/{uuid}.png
+#   - Slike se skladište u: media/users/images/<ab>/<cd>/<sha256>.<ext> (vidi Media/storage.py)
 #   - Default slika: egg.png (ako korisnik nema profilnu sliku)
 # ========================================================================================================
 
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
@@ -23,14 +26,16 @@ import os
 
 
 def generate_image_uuid(instance, filename):
-    # 🔹 generate_image_uuid() - Generiše jedinstveno ime za svaku učitanu sliku
+    # 🔹 generate_image_uuid() - Generiše privremeno ime za svaku učitanu sliku
     #    
     #    💼 Kako radi:
-    #       - Generiše novi UUID4 za svaku sliku
-    #       - Sprječava konflikt imena slika
-    #       - Putanja: media/users/images/{uuid}.png
+    #       - Zadržava stvarnu ekstenziju upload-a (.jpg, .webp...) umjesto uvijek .png
+    #       - Storage (Media.storage.ContentAddressedStorage) ime zamjenjuje hashom sadržaja
+    #       - Konačna putanja: media/users/images/<ab>/<cd>/<sha256>.<ext>
     #    
-    return os.path.join("users/images/", f"{uuid.uuid4()}.png")
+    from Media.storage import image_extension
+
+    return os.path.join("users/images/", f"{uuid.uuid4()}{image_extension(filename)}")
 
 
 def validate_size(image):
@@ -38,15 +43,18 @@ def validate_size(image):
     #    
     #    💼 Kako radi:
     #       - Proverava image.size atribut
-    #       - Max 2MB = 2 * 1024 * 1024 bajtova
+    #       - Max settings.PROFILE_IMAGE_MAX_SIZE (2MB) - isti limit provjerava i upload handler
+    #         (Media/uploads.py) dok se datoteka prima
     #       - Baca ValidationError ako je prevelika
     #    
     #    ⚠️ Baca iznimku:
     #       - "Slika je prevelika! Maksimalno 2MB."
     #    
-    max_size = 2 * 1024 * 1024  # 2MB u bajtovima
+    from Media.uploads import size_message
+
+    max_size = settings.PROFILE_IMAGE_MAX_SIZE
     if image.size > max_size:
-        raise ValidationError("Slika je prevelika! Maksimalno 2MB.")
+        raise ValidationError(size_message(max_size))
 
 
 class User(AbstractUser):
@@ -55,14 +63,21 @@ class User(AbstractUser):
     #    📝 Polja:
     #       - email (obavezno, jedinstveno): Emailadresa korisnika
     #       - profile_image: ImageField s upload_to i default vrijednosti
+    #       - profile_image_variants: JSON s imenima i dimenzijama avatara
     #       - user_uuid: UUID za javne profile URL-ove
+    #       - followers_count: Koliko korisnika prati ovog korisnika
+    #       - following_count: Koliko korisnika ovaj korisnik prati
+    #    
+    #    📊 Brojači:
+    #       - toggle_follow ih mijenja atomski (UPDATE ... + 1) u istoj transakciji kao Follow red
+    #       - Kaskadno brisanje korisnika ne prolazi kroz view → python manage.py reconcile_counters
     #    
     #    🛡️ Validacija:
     #       - profile_image koristi validate_size validator
     #       - email mora biti jedinstveno (unique=True)
     #    
     #    📁 Upload:
-    #       - Nove slike: media/users/images/{uuid}.png
+    #       - Nove slike: media/users/images/<ab>/<cd>/<sha256>.<ext> (ista slika = ista datoteka)
     #       - Default: egg.png
     #    
     email = models.EmailField(blank=False, unique=True)
@@ -71,9 +86,14 @@ class User(AbstractUser):
         default="egg.png",
         validators=[validate_size]
     )
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)  # 🖼️ Vidi Media/images.py
 
     user_uuid = models.UUIDField(default=uuid.uuid4, blank=False, unique=True)
 
+    # 👥 Brojači Follow redova (Interactions.Follow) - vidi Interactions/views.toggle_follow
+    followers_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
+
     def __str__(self):
         # 🔹 __str__ - Vraća korisničko ime kao string reprezentaciju
         return self.username
@@ -16,6 +16,8 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
 
+from Media.images import is_processing, srcset, variant_url
+from Media.uploads import upload_errors
 from Posts.models import PostModel
 from .models import User, validate_size
 
@@ -25,12 +27,14 @@ def me(request):
     # 🔹 me() - Prikazuje dashboard korisnika s postama, razgovorima, followerima i following
     #    
     #    💼 Kako radi:
-    #       - POST metoda: Upload profilne slike (validacija veličine do 2MB)
+    #       - POST metoda: Upload profilne slike (limit 2MB i zaglavlje slike provjeravaju se već
+    #         dok se datoteka prima - Media/uploads.py; prekinut upload → HTTP 413)
     #       - GET metoda: Dohvaća sve podatke korisnika za renderiranje template-a
     #    
     #    📊 Što se prikazuje:
     #       - Sve objave autora (sortirane po vremenu ažuriranja)
-    #       - Jedinstveni korisnici s kojima ima razgovora
+    #       - Inbox: razgovori po zadnjoj poruci (isječak, broj nepročitanih) - jedan upit nad
+    #         ConversationMember (indeks user + last_message_at), neovisno o broju poruka
     #       - Lista follower-a (do 100) s avatarima
     #       - Lista following korisnika (do 100) s avatarima
     #       - Brojač follower-a i following
@@ -39,6 +43,11 @@ def me(request):
     #
     # 📸 Obrada upload-a profilne slike
     if request.method == "POST":
+        # 🛑 Upload prekinut dok se primao (prevelik / nije slika) - vidi Media/uploads.py
+        errors = upload_errors(request)
+        if errors:
+            return HttpResponse(f"Greška pri uploadu: {' '.join(errors.values())}", status=413)
+
         image = request.FILES.get("profile_image")
         if image:
             try:
@@ -60,37 +69,41 @@ def me(request):
         return HttpResponse("Metoda nije dozvoljena")
 
     # 🔄 Učitaj dodatne modele dinamički (izbjegni kružne import-e)
-    from Chat.models import Message
+    from Chat.models import ConversationMember
     from Interactions.models import Follow
 
     user = request.user
     # 📝 Dohvati sve objave autora, sortirane po vremenu ažuriranja (najnovije prvo)
     posts = PostModel.objects.filter(author=user).order_by("-updated_at")
 
-    # 💬 Pronađi korisnike s kojima korisnik ima razgovore
-    # Kombinira sve korisnike kojima je poslao poruku + sve koji su mu poslali poruku
-    sent_to = Message.objects.filter(sender=user).values_list('recipient', flat=True).distinct()
-    received_from = Message.objects.filter(recipient=user).values_list('sender', flat=True).distinct()
-    conversation_user_ids = set(sent_to) | set(received_from)  # Unija: izbjegni duplikate
-    conversations = User.objects.filter(id__in=conversation_user_ids).order_by('username')
+    # 💬 Inbox: najnoviji razgovori prvi (sugovornik + zadnja poruka u istom upitu)
+    #    📎 Jedan redak viška umjesto COUNT(*) → broj je "100+" kad ih ima više
+    conversations = list(
+        ConversationMember.objects.filter(user=user)
+        .select_related('other', 'conversation__last_message')
+        .order_by('-last_message_at')[:101]
+    )
+    conversations_count = "100+" if len(conversations) > 100 else len(conversations)
+    conversations = conversations[:100]
 
     # 👥 Dohvati follower-e i following (ograničeno na 100 za performanse)
     followers_qs = Follow.objects.filter(following=user).select_related('follower')[:100]
     following_qs = Follow.objects.filter(follower=user).select_related('following')[:100]
 
-    # 📋 Pretvaranje u jednostavne dictionary strukture za template
-    followers = [{'username': f.follower.username, 'uuid': str(f.follower.user_uuid), 'image': f.follower.profile_image.url if f.follower.profile_image else None} for f in followers_qs]
-    following = [{'username': f.following.username, 'uuid': str(f.following.user_uuid), 'image': f.following.profile_image.url if f.following.profile_image else None} for f in following_qs]
+    # 📋 Pretvaranje u jednostavne dictionary strukture za template (avatar = varijanta od 80px, placeholder dok je u obradi)
+    followers = [{'username': f.follower.username, 'uuid': str(f.follower.user_uuid), 'image': None if is_processing(f.follower) else variant_url(f.follower, 80), 'srcset': srcset(f.follower)} for f in followers_qs]
+    following = [{'username': f.following.username, 'uuid': str(f.following.user_uuid), 'image': None if is_processing(f.following) else variant_url(f.following, 80), 'srcset': srcset(f.following)} for f in following_qs]
 
     # 📦 Pripremi context za template
     context = {
         'posts': posts,
         'user': request.user,
         'conversations': conversations,
+        'conversations_count': conversations_count,
         'followers': followers,
         'following': following,
-        'followers_count': Follow.objects.filter(following=user).count(),
-        'following_count': Follow.objects.filter(follower=user).count()
+        'followers_count': user.followers_count,
+        'following_count': user.following_count,
     }
 
     return render(request, "account/me.html", context)
@@ -147,8 +160,8 @@ def profile(request, user_uuid):
         'is_following': is_following,
         'followers': followers,
         'following': following,
-        'followers_count': Follow.objects.filter(following=target).count(),
-        'following_count': Follow.objects.filter(follower=target).count()
+        'followers_count': target.followers_count,
+        'following_count': target.following_count,
     }
 
     return render(request, 'account/profile.html', context)
\ No newline at end of file
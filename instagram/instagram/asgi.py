@@ -13,4 +13,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'instagram.settings')
 
-application = get_asgi_application()
+# 🌐 HTTP ide kroz Django; get_asgi_application() mora biti prije importa aplikacija (django.setup)
+django_application = get_asgi_application()
+
+from Chat.realtime import chat_socket  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # 🔌 WebSocket (chat) → Chat/realtime.py, sve ostalo (http, lifespan) → Django
+    if scope["type"] == "websocket":
+        return await chat_socket(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,219 @@
+# 🇭🇷 instagram/atomic.py - Atomske operacije bez čitanja (uvjetni insert, brojači)
+# ========================================================================================================
+# Svrha: Toggle-i (like, dislike, like komentara, follow) i brojači bez SELECT-a prije pisanja
+# Funkcionalnosti:
+#   - insert_or_ignore(): INSERT koji preskače postojeći red (unique constraint) umjesto IntegrityError
+#   - increment(): UPDATE brojača s F() izrazom koji odmah vraća nove vrijednosti
+#   - toggle(): Uključi / isključi red i pomakni brojače (SQLite: 2 upita - UPDATE ... RETURNING + INSERT/DELETE)
+#
+# 💼 Zašto:
+#   - "SELECT pa INSERT" je utrka: dva istovremena klika oba ne vide red i drugi INSERT pukne na
+#     unique_together → IntegrityError / 500
+#   - INSERT ... ON CONFLICT DO NOTHING (SQLite: INSERT OR IGNORE, MySQL: INSERT IGNORE) odluku
+#     prepušta bazi; broj upisanih redova (0/1) kaže je li red stvarno dodan
+#   - UPDATE ... RETURNING (PostgreSQL, SQLite 3.35+) = jedan upit umjesto UPDATE + SELECT
+#   - SQLite serijalizira pisanja → UPDATE brojača s EXISTS može odlučiti smjer toggle-a prije INSERT-a / DELETE-a
+#
+# 📝 Primjer:
+#   if insert_or_ignore(Like, user=user, post=post): ...
+#   likes, dislikes = increment(PostModel, post.pk, likes_count=1, dislikes_count=0)
+#   liked, values = toggle(Like, {"user": user, "post": post}, PostModel, {post.pk: "likes_count"}, ("likes_count",))
+# ========================================================================================================
+
+from django.db import connections, router
+from django.db.models import F
+
+
+def insert_or_ignore(model, **values):
+    # 🔹 insert_or_ignore() - Upiše jedan red; ako već postoji (unique constraint) ne radi ništa
+    #
+    #    💼 Kako radi:
+    #       - bulk_create([obj], ignore_conflicts=True) → INSERT ... ON CONFLICT DO NOTHING / INSERT OR IGNORE
+    #       - bulk_create ne kaže je li red upisan → execute_wrapper (javni API za instrumentaciju upita)
+    #         pročita rowcount kursora nakon INSERT-a (1 = upisan, 0 = preskočen)
+    #       - Istovremeni INSERT istog reda (PostgreSQL) čeka commit prvoga i zatim se preskoči
+    #
+    #    📤 Vraća: True ako je red upisan, False ako je već postojao
+    #
+    using = router.db_for_write(model)
+    rowcounts = []
+
+    def count_rows(execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        rowcounts.append(context["cursor"].rowcount)
+        return result
+
+    with connections[using].execute_wrapper(count_rows):
+        model._default_manager.using(using).bulk_create([model(**values)], ignore_conflicts=True)
+    return sum(rowcounts) == 1
+
+
+def _supports_update_returning(connection):
+    # 📎 MariaDB ima RETURNING samo za INSERT/DELETE, MySQL nema ga uopće
+    return connection.vendor in ("postgresql", "sqlite") and connection.features.can_return_columns_from_insert
+
+
+def increment(model, pk, assign=None, **deltas):
+    # 🔹 increment() - UPDATE polje = polje + delta za jedan red i vrati nove vrijednosti
+    #
+    #    📥 Parametri:
+    #       - deltas: polje=pomak (npr. likes_count=1, dislikes_count=-1)
+    #       - assign: dodatna polja koja se samo postavljaju (npr. {"version": 7})
+    #
+    #    ⚡ PostgreSQL / SQLite 3.35+: jedan upit (UPDATE ... RETURNING); ostale baze: UPDATE + SELECT
+    #       u istoj transakciji
+    #
+    #    📤 Vraća: tuple novih vrijednosti u redoslijedu deltas (None ako red ne postoji)
+    #
+    assign = assign or {}
+    using = router.db_for_write(model)
+    connection = connections[using]
+
+    if not _supports_update_returning(connection):
+        updated = model._base_manager.using(using).filter(pk=pk).update(
+            **{name: F(name) + delta for name, delta in deltas.items()}, **assign
+        )
+        if not updated:
+            return None
+        return model._base_manager.using(using).filter(pk=pk).values_list(*deltas).get()
+
+    opts = model._meta
+    qn = connection.ops.quote_name
+    columns = [opts.get_field(name).column for name in deltas]
+    sets = [f"{qn(column)} = {qn(column)} + %s" for column in columns]
+    params = list(deltas.values())
+    for name, value in assign.items():
+        field = opts.get_field(name)
+        sets.append(f"{qn(field.column)} = %s")
+        params.append(field.get_db_prep_save(value, connection))
+
+    sql = (
+        f"UPDATE {qn(opts.db_table)} SET {', '.join(sets)} WHERE {qn(opts.pk.column)} = %s "
+        f"RETURNING {', '.join(qn(column) for column in columns)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, opts.pk.get_db_prep_value(pk, connection)])
+        return cursor.fetchone()
+
+
+def _exists_sql(model, filters, connection):
+    # 📎 EXISTS(SELECT 1 ...) po jednakostima (unique indeks) → 0/1 unutar drugog upita
+    qn = connection.ops.quote_name
+    where, params = [], []
+    for name, value in filters.items():
+        field = model._meta.get_field(name)
+        where.append(f"{qn(field.column)} = %s")
+        params.append(field.get_db_prep_value(getattr(value, "pk", value), connection))
+    return f"EXISTS(SELECT 1 FROM {qn(model._meta.db_table)} WHERE {' AND '.join(where)})", params
+
+
+def toggle(model, filters, target, counters, returning, exclusive=None, assign=None):
+    # 🔹 toggle() - Uključi / isključi red (like, follow) i pomakni brojače za +1 / -1
+    #
+    #    📥 Parametri:
+    #       - model, filters: Red koji se uključuje (jednakosti po poljima, npr. {"user": user, "post": post})
+    #       - target, counters: Redci s brojačima {pk: polje}
+    #         npr. follow: {target.pk: "followers_count", user.pk: "following_count"}
+    #       - returning: Polja targeta koja se vraćaju (uključuje polja iz counters i exclusive)
+    #       - exclusive: (model, polje) međusobno isključivog reda (npr. (Dislike, "dislikes_count") za like):
+    #         uključivanje ga briše i smanji mu brojač na redcima iz counters
+    #       - assign: dodatna polja koja se samo postavljaju (npr. {"version": 7})
+    #
+    #    ⚡ SQLite (jedan pisač u bazi → pisanja u transakciji su serijalizirana):
+    #       1. UPDATE brojača ... RETURNING - EXISTS po unique indeksu u istom upitu odluči smjer
+    #       2. INSERT ili DELETE reda
+    #       → 2 upita; 3 kad uključivanje briše i isključivi red (dislike → like), jer SQLite ne može
+    #         pisati u dvije tablice jednim upitom
+    #    ⚠️ Ostale baze: pod READ COMMITTED EXISTS u UPDATE-u ne vidi istovremeni commit → smjer se
+    #       odlučuje po stvarno upisanim / obrisanim redovima: INSERT koji preskače postojeći red ili DELETE,
+    #       pa increment() po retku u redoslijedu pk → INSERT (+ DELETE) + jedan UPDATE po retku iz counters
+    #
+    #    🔒 Poziva se unutar transaction.atomic()
+    #
+    #    📤 Vraća: (uključeno True/False, {pk: tuple vrijednosti u redoslijedu returning});
+    #       {} ako target redak ne postoji
+    #
+    using = router.db_for_write(target)
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return _toggle_in_steps(model, filters, target, counters, returning, exclusive, assign, using)
+
+    opts = target._meta
+    qn = connection.ops.quote_name
+    pk_column = qn(opts.pk.column)
+    pks = {opts.pk.get_db_prep_value(pk, connection): pk for pk in counters}
+    is_on, is_on_params = _exists_sql(model, filters, connection)
+
+    # 📊 Uključivanje +1, isključivanje -1 (1 - 2 * EXISTS), samo na redcima kojima brojač pripada
+    by_field = {}
+    for pk, name in counters.items():
+        by_field.setdefault(name, []).append(opts.pk.get_db_prep_value(pk, connection))
+    sets, params = [], []
+    for name, field_pks in by_field.items():
+        column = qn(opts.get_field(name).column)
+        sets.append(
+            f"{column} = {column} + CASE WHEN {pk_column} IN ({', '.join(['%s'] * len(field_pks))}) "
+            f"THEN 1 - 2 * {is_on} ELSE 0 END"
+        )
+        params.extend([*field_pks, *is_on_params])
+    returned = [is_on]
+    returned_params = list(is_on_params)
+    if exclusive:
+        other, name = exclusive
+        other_on, other_params = _exists_sql(other, filters, connection)
+        column = qn(opts.get_field(name).column)
+        sets.append(f"{column} = {column} - (1 - {is_on}) * {other_on}")
+        params.extend([*is_on_params, *other_params])
+        returned.append(other_on)
+        returned_params.extend(other_params)
+    for name, value in (assign or {}).items():
+        field = opts.get_field(name)
+        sets.append(f"{qn(field.column)} = %s")
+        params.append(field.get_db_prep_save(value, connection))
+
+    # 📎 EXISTS u RETURNING vidi stanje prije koraka 2 (isti upit kao SET) → smjer bez zasebnog SELECT-a
+    sql = (
+        f"UPDATE {qn(opts.db_table)} SET {', '.join(sets)} "
+        f"WHERE {pk_column} IN ({', '.join(['%s'] * len(pks))}) "
+        f"RETURNING {pk_column}, {', '.join(qn(opts.get_field(name).column) for name in returning)}, "
+        f"{', '.join(returned)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, *pks, *returned_params])
+        rows = cursor.fetchall()
+    if not rows:
+        return False, {}
+
+    was_on, *other_was_on = rows[0][len(returning) + 1:]
+    if was_on:
+        model._base_manager.using(using).filter(**filters).delete()
+    else:
+        insert_or_ignore(model, **filters)
+        if exclusive and other_was_on[0]:
+            exclusive[0]._base_manager.using(using).filter(**filters).delete()
+    values = {pks[row[0]]: tuple(row[1:len(returning) + 1]) for row in rows}
+    return not was_on, values
+
+
+def _toggle_in_steps(model, filters, target, counters, returning, exclusive, assign, using):
+    # 🔹 _toggle_in_steps() - toggle() bez čitanja: odluka po broju upisanih / obrisanih redova
+    on = insert_or_ignore(model, **filters)
+    removed = 0
+    if on:
+        delta = 1
+        if exclusive:
+            removed, _ = exclusive[0]._base_manager.using(using).filter(**filters).delete()
+    else:
+        delta = -model._base_manager.using(using).filter(**filters).delete()[0]
+
+    # 🔒 Redoslijed po pk: A prati B dok B prati A → isti redoslijed zaključavanja, nema deadlocka
+    values = {}
+    for pk in sorted(counters):
+        deltas = dict.fromkeys(returning, 0)
+        deltas[counters[pk]] += delta
+        if exclusive:
+            deltas[exclusive[1]] -= removed
+        values[pk] = increment(target, pk, assign, **deltas)
+    if None in values.values():
+        return on, {}
+    return on, values
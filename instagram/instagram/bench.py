@@ -0,0 +1,77 @@
+# 🇭🇷 instagram/bench.py - Pomoćni alati za benchmark management komande
+# ========================================================================================================
+# Svrha: Zajednički kod za `python manage.py bench_*` komande
+# Funkcionalnosti:
+#   - throwaway_database(): Privremena test baza u datoteci test_db.sqlite3 (prava db.sqlite3 se NIKAD ne dira)
+#   - Timer: Mjerenje vremena s percentilima
+#   - power_law_sampler(): Sintetički "power-law" odabir (mali broj jako popularnih korisnika)
+# ========================================================================================================
+
+import itertools
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def throwaway_database(verbosity=0):
+    # 🔹 throwaway_database() - Kreira praznu test bazu s migracijama i briše je na kraju
+    #
+    #    💼 Kako radi:
+    #       - Koristi isti mehanizam kao `manage.py test`: SQLite baza je datoteka iz
+    #         DATABASES['default']['TEST']['NAME'] (test_db.sqlite3), ne baza u memoriji
+    #       - Postojeća test_db.sqlite3 (npr. od prekinutog pokretanja) se prepiše bez pitanja
+    #       - Nakon izlaska iz bloka briše datoteku i vraća konekciju na originalnu bazu
+    #
+    from django.db import connection
+
+    old_name = connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity)
+
+
+class Timer:
+    # 🔹 Timer - Skuplja trajanja (u sekundama) i vraća sažetak
+    #
+    #    💼 Primjer:
+    #       timer = Timer()
+    #       with timer:
+    #           do_work()
+    #       timer.summary() → {'n': 1, 'total_ms': ..., 'p50_ms': ..., 'p95_ms': ...}
+    #
+    def __init__(self):
+        self.samples = []
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self._start)
+        return False
+
+    def summary(self):
+        if not self.samples:
+            return {'n': 0, 'total_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0}
+        ordered = sorted(self.samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return {
+            'n': len(ordered),
+            'total_ms': sum(ordered) * 1000,
+            'p50_ms': statistics.median(ordered) * 1000,
+            'p95_ms': p95 * 1000,
+        }
+
+
+def power_law_sampler(population, alpha=1.2, rng=random):
+    # 🔹 power_law_sampler() - Vraća funkciju sample(k) koja bira k elemenata s vjerojatnošću ∝ 1 / rang^alpha
+    #    (populacija je poredana po "popularnosti": prvi element je najpopularniji)
+    cum_weights = list(itertools.accumulate(1.0 / (rank ** alpha) for rank in range(1, len(population) + 1)))
+
+    def sample(k):
+        return rng.choices(population, cum_weights=cum_weights, k=k)
+
+    return sample
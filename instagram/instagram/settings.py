@@ -47,7 +47,8 @@ INSTALLED_APPS = [
     'Posts',
     'Comments',
     'Interactions',
-    'Chat'
+    'Chat',
+    'Media',
 ]
 
 AUTH_USER_MODEL = "Users.User"
@@ -63,6 +64,7 @@ LOGIN_URL = "/users/"
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'Media.middleware.upload_limit_middleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -99,6 +101,19 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # 🔒 BEGIN IMMEDIATE: transakcija odmah uzima write lock → istovremeni toggle-i (like, follow)
+            #    čekaju red umjesto "database is locked" pri nadogradnji read → write locka
+            'transaction_mode': 'IMMEDIATE',
+            # ⏳ Koliko dugo (s) pisanje čeka da druga transakcija otpusti lock
+            'timeout': 20,
+        },
+        # 🧪 Test baza u datoteci (ne u memoriji): SQLite baza u memoriji dijeljena između threadova
+        #    odmah javlja "table is locked" umjesto čekanja → Interactions/tests.py istovremene klikove
+        #    mora testirati na pravim lockovima (datoteka se briše nakon testova)
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -141,3 +156,74 @@ MEDIA_ROOT = "media/uploads/"
 # MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024
+
+# Limiti slika provjeravaju se DOK se upload prima (Media/uploads.py) - prevelik upload se prekida odmah
+POST_IMAGE_MAX_SIZE = 50 * 1024 * 1024
+PROFILE_IMAGE_MAX_SIZE = 2 * 1024 * 1024
+IMAGE_MAX_PIXELS = 50_000_000
+
+FILE_UPLOAD_HANDLERS = [
+    "Media.uploads.ImageUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# Serviranje medija (Media/views.py): None = FileResponse (wsgi.file_wrapper / sendfile),
+# "x-accel-redirect" = nginx (internal location na MEDIA_ACCEL_REDIRECT_PREFIX), "x-sendfile" = Apache/lighttpd
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_REDIRECT_PREFIX = "/_protected_media/"
+
+# Upload-i se imenuju po SHA-256 sadržaja (deduplikacija + sharding), vidi Media/storage.py
+STORAGES = {
+    "default": {"BACKEND": "Media.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# Komentari (Comments/views.py): stranica top-level komentara, pregled odgovora po komentaru
+# i najviše promjena po jednom pollu (ostatak stiže u sljedećim pollovima)
+COMMENTS_PAGE_SIZE = 20
+COMMENT_REPLIES_PREVIEW = 3
+COMMENTS_DELTA_LIMIT = 100
+
+# Real-time chat (Chat/broker.py, Chat/realtime.py - WebSocket kroz instagram/asgi.py)
+# InProcessBroker = jedan ASGI worker; "Chat.broker.RedisBroker" = više workera (pip install "instagram-clone[redis]")
+CHAT_BROKER = "Chat.broker.InProcessBroker"
+CHAT_REDIS_URL = "redis://127.0.0.1:6379/0"
+# Najviše neposlanih poruka po WebSocketu (spori klijent) - višak dohvati polling
+CHAT_SUBSCRIBER_QUEUE_SIZE = 100
+# Poruka po stranici povijesti razgovora (Chat/views.get_messages: zadnja stranica, after_id / before_id)
+CHAT_PAGE_SIZE = 50
+# Long-poll (Chat/views.poll_messages): najdulje čekanje na novu poruku prije praznog odgovora (sekunde)
+CHAT_LONG_POLL_TIMEOUT = 25
+
+# Write-behind like-ova (Interactions/writebehind.py): toggle-i idu u lokalni journal, a flusher ih
+# skupno upisuje (bulk_create / delete + jedan UPDATE brojača po objavi) - za viralne objave
+LIKE_WRITE_BEHIND = False
+# Direktorij journala (jedna datoteka po procesu; mora preživjeti restart procesa)
+LIKE_JOURNAL_DIR = BASE_DIR / 'like_journal'
+# Koliko često (s) flusher upisuje u bazu; ranije ako se nakupi LIKE_FLUSH_MAX_PENDING parova
+LIKE_FLUSH_INTERVAL = 1.0
+LIKE_FLUSH_MAX_PENDING = 5000
+# fsync nakon svakog zapisa: like preživi i pad servera (False = samo pad procesa, brže)
+LIKE_JOURNAL_FSYNC = True
+
+# Home timeline (fan-out-on-write)
+# Koliko zadnjih objava autora se upiše u feed kad ga korisnik zaprati
+TIMELINE_BACKFILL_SIZE = 50
+
+# Veličina batch-a za bulk_create pri fan-out-u na follower-e
+TIMELINE_FANOUT_BATCH_SIZE = 1000
+
+# Hibridni timeline: autori s više follower-a od praga se ne fan-out-aju (push),
+# nego se njihove objave čitaju (pull) pri otvaranju home feeda
+TIMELINE_FANOUT_THRESHOLD = 10000
+
+# "Predloženi za tebe" (Interactions/graph.py): follow graf u memoriji svakog procesa (CSR nizovi)
+# Broj prijedloga po zahtjevu
+SUGGESTIONS_LIMIT = 20
+# Najviše praćenih računa koji se obilaze po zahtjevu (korisnik koji prati tisuće ljudi)
+SUGGESTIONS_MAX_SOURCES = 1000
+# Graf se ponovno učita iz baze (u pozadini) kad je stariji od ovoga (s) - follow-ovi drugih workera
+SUGGESTIONS_GRAPH_MAX_AGE = 600
+# ... ili kad se nakupi ovoliko inkrementalnih promjena iz toggle_follow
+SUGGESTIONS_GRAPH_MAX_CHANGES = 50000
@@ -15,17 +15,21 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from Media.views import serve as serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("", include("Posts.urls"), name="posts"),
     path("users/", include("Users.urls"), name="users"),
     path("chat/", include("Chat.urls"), name="chat"),
+    # 🖼️ Mediji se serviraju uvijek (ne samo uz DEBUG) - Range, ETag, sendfile offload (Media/views.py)
+    re_path(
+        rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.*)$",
+        serve_media,
+        name="media",
+    ),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     
\ No newline at end of file